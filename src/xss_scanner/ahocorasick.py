@@ -0,0 +1,84 @@
+"""
+순수 파이썬 Aho-Corasick 다중 문자열 매칭 모듈.
+
+리터럴 목록(싱크 함수, JS/속성 힌트, DB API, DOM 토큰 등)을 한 번에
+오토마톤으로 만들어 두고, 텍스트를 한 번 훑어서 모든 리터럴 등장
+위치를 얻는다. 실패 링크를 미리 펼쳐 완전한 전이표(DFA)로 만들어
+문자당 dict 조회 한 번으로 동작한다.
+"""
+
+import re
+
+
+class AhoCorasick:
+    """
+    patterns 의 모든 등장 위치를 찾는 오토마톤.
+
+    iter_matches(text) 는 (시작 오프셋, 패턴 인덱스) 를 끝 위치 순서대로
+    내보낸다. 겹치는 매치도 모두 보고한다.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        goto = [{}]
+        out = [()]
+        for idx, pat in enumerate(self.patterns):
+            if not pat:
+                continue
+            state = 0
+            for ch in pat:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append(())
+                state = nxt
+            out[state] = out[state] + (idx,)
+
+        # BFS 로 실패 링크를 구하면서 전이표를 완성한다.
+        fail = [0] * len(goto)
+        delta = [dict(g) for g in goto]
+        queue = list(goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            out[state] = out[state] + out[fail[state]]
+            for ch, f_next in delta[fail[state]].items():
+                if ch not in goto[state]:
+                    delta[state][ch] = f_next
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                fail[nxt] = delta[fail[state]].get(ch, 0) if state else 0
+
+        self._delta = delta
+        self._out = out
+        self._lengths = [len(p) for p in self.patterns]
+        first_chars = sorted(goto[0])
+        self._first_re = re.compile(
+            '[' + ''.join(re.escape(c) for c in first_chars) + ']'
+        ) if first_chars else None
+
+    def iter_matches(self, text: str):
+        if self._first_re is None:
+            return
+        delta = self._delta
+        out = self._out
+        lengths = self._lengths
+        first_search = self._first_re.search
+        n = len(text)
+        state = 0
+        i = 0
+        while i < n:
+            if state == 0:
+                # 루트에서는 패턴의 첫 글자가 나올 때까지 건너뛴다.
+                m = first_search(text, i)
+                if m is None:
+                    return
+                i = m.start()
+            state = delta[state].get(text[i], 0)
+            if out[state]:
+                for idx in out[state]:
+                    yield i - lengths[idx] + 1, idx
+            i += 1
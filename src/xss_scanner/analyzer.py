@@ -3,155 +3,574 @@ XSS 후보 라인 추출, taint 분석, 컨텍스트/가드 판정 등
 "파일 단위 정적 분석"을 담당하는 모듈.
 """
 
+import mmap
 import os
 import re
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from contextlib import contextmanager
 from datetime import datetime
 
+from .dataflow import analyze_taint, match_brackets, split_call_args
+from .findings import (
+    Finding,
+    FLAG_DIRECT_SUPERGLOBAL,
+    FLAG_GUARD_PRESENT,
+    format_code_context,
+)
+from .lexer import (
+    tokenize_php,
+    MASKED_KINDS,
+    TRIVIA_KINDS,
+    T_CLOSE_TAG,
+    T_INLINE_HTML,
+    T_IDENT,
+    T_OP,
+    T_VARIABLE,
+)
 from .patterns import (
-    SINK_TOKENS,
-    SINK_FUNCS,
-    SOURCE_PATTERNS,
     GUARD_FUNCS,
-    ATTR_CONTEXT_HINT,
-    JS_SINK_HINT,
     CONTEXT_LINES,
+    COMBINED_RULE_RE,
+    SOURCE_RE,
+    SANITIZER_FUNCS,
+    SANITIZER_CASTS,
+    LITERAL_AUTOMATON,
+    LITERAL_KEYS,
+    LITERAL_CATEGORIES,
+    FUNC_CALL_RE,
+    GUARD_CONTEXTS,
+    GUARD_RANK,
+    GUARD_MISMATCH,
+    DOM_SOURCES,
+    SCAN_POLICIES,
+    MINIFIED_LINE_LENGTH,
+    SHALLOW_WINDOW,
+    SHALLOW_PROXIMITY,
+    SHALLOW_MAX_FINDINGS,
+    SHALLOW_SOURCE_RE,
+    SHALLOW_SINK_RE,
+)
+
+# 분석 단계별 누적 소요 시간(초). scanner 가 요약 출력에 사용한다.
+STAGE_TIMINGS = defaultdict(float)
+
+
+@contextmanager
+def stage_timer(name: str):
+    """
+    with 블록의 소요 시간을 STAGE_TIMINGS[name] 에 누적한다.
+    """
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_TIMINGS[name] += time.perf_counter() - t0
+
+
+def get_stage_timings() -> dict:
+    return dict(STAGE_TIMINGS)
+
+
+def reset_stage_timings():
+    STAGE_TIMINGS.clear()
+
+
+def merge_stage_timings(timings: dict):
+    """다른 프로세스에서 측정한 단계별 시간을 합산한다."""
+    for k, v in timings.items():
+        STAGE_TIMINGS[k] += v
+
+
+_NON_NEWLINE_RE = re.compile(r'[^\n]')
+_VAR_RE = re.compile(r'\$[A-Za-z_][A-Za-z0-9_]*')
+# build_line_taint: 대입문 / 정화 함수·캐스트
+_ASSIGN_RE = re.compile(r'(\$[A-Za-z_][A-Za-z0-9_]*)\s*(?:\[[^\]\n]*\]\s*)*(\.?=)(?![=>])\s*([^;]*)')
+_SANITIZE_RE = re.compile(
+    r'\b(?:' + '|'.join(SANITIZER_FUNCS) + r')\s*\('
+    r'|\(\s*(?:' + '|'.join(SANITIZER_CASTS) + r')\s*\)',
+    re.IGNORECASE,
 )
+_SCRIPT_OPEN_RE = re.compile(r'<script\b', re.IGNORECASE)
+_SCRIPT_CLOSE_RE = re.compile(r'</script\s*>', re.IGNORECASE)
+_ASCII_LOWER = {c: c + 32 for c in range(ord('A'), ord('Z') + 1)}
+_STMT_OPEN = frozenset('([{')
+_STMT_CLOSE = frozenset(')]}')
+# 싱크 문장이 이어진다고 보는 최대 라인 수(heredoc 등)
+STATEMENT_LINE_LIMIT = 50
+
+
+def _mask_text(text: str) -> str:
+    if '\n' in text:
+        # 라인 번호/오프셋이 어긋나지 않도록 줄바꿈은 유지
+        return _NON_NEWLINE_RE.sub(' ', text)
+    return ' ' * len(text)
 
 
 def strip_strings_and_comments(src: str) -> str:
     """
     문자열과 주석을 공백으로 치환하여 토큰 검출 시 노이즈를 줄인다.
+    (여는 태그가 없으면 코드 조각으로 보고 PHP 모드로 토큰화한다.)
+    """
+    return MaskedSource(src, start_in_php='<?' not in src).masked
+
+
+def _script_state(html: str, in_script: bool) -> bool:
+    """inline HTML 조각을 지난 뒤 <script> 블록 안인지 여부."""
+    last_open = -1
+    for m in _SCRIPT_OPEN_RE.finditer(html):
+        last_open = m.start()
+    last_close = -1
+    for m in _SCRIPT_CLOSE_RE.finditer(html):
+        last_close = m.start()
+    if last_open == -1 and last_close == -1:
+        return in_script
+    return last_open > last_close
+
+
+class MaskedSource:
+    """
+    파일 하나에 대한 원본 텍스트, 마스킹된 텍스트, 라인 시작 오프셋 배열과
+    코드 토큰 목록을 묶은 객체.
+
+    lexer.tokenize_php 의 토큰 스트림을 한 번 훑어서 만든다. 문자열/주석/
+    attribute/heredoc/inline HTML 은 공백으로 마스킹되며(줄바꿈 유지),
+    길이를 보존하므로 두 텍스트의 오프셋은 같다. "..." 와 heredoc 안의
+    $var / {$...} 보간은 코드 토큰이므로 마스킹되지 않는다.
+    find_candidates / build_taint_map / detect_context_for_line /
+    get_code_context / classify_vulnerability 가 함께 사용한다.
+    """
+
+    __slots__ = ('content', 'masked', 'line_starts', 'tokens', 'js_lines', '_lower', '_literals', '_token_lines')
+
+    def __init__(self, content: str, start_in_php: bool = False):
+        self.content = content
+        pieces = []
+        tokens = []
+        js_lines = set()
+        in_script = False
+        for tok in tokenize_php(content, start_in_php=start_in_php):
+            kind = tok.kind
+            if kind in MASKED_KINDS:
+                pieces.append(_mask_text(tok.text))
+                if kind == T_INLINE_HTML:
+                    in_script = _script_state(tok.text, in_script)
+                    continue
+            else:
+                pieces.append(tok.text)
+            if kind in TRIVIA_KINDS:
+                continue
+            tokens.append(tok)
+            if in_script:
+                js_lines.add(tok.line)
+        self.masked = ''.join(pieces)
+        self.tokens = tokens
+        self.js_lines = js_lines
+
+        starts = [0]
+        pos = content.find('\n')
+        while pos != -1:
+            starts.append(pos + 1)
+            pos = content.find('\n', pos + 1)
+        self.line_starts = starts
+        self._lower = None
+        self._literals = None
+        self._token_lines = None
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_starts)
+
+    @property
+    def lower(self) -> str:
+        """원본 텍스트의 소문자 버전(처음 요청 시 한 번만 계산)."""
+        if self._lower is None:
+            lower = self.content.lower()
+            if len(lower) != len(self.content):
+                # 일부 유니코드 문자는 소문자 변환 시 길이가 바뀌므로
+                # 오프셋이 유지되도록 ASCII 만 변환한다.
+                lower = self.content.translate(_ASCII_LOWER)
+            self._lower = lower
+        return self._lower
+
+    @property
+    def literals(self) -> 'LiteralIndex':
+        """리터럴 규칙 히트 인덱스(처음 요청 시 한 번만 계산)."""
+        if self._literals is None:
+            with stage_timer('literals'):
+                self._literals = LiteralIndex(self)
+        return self._literals
+
+    def line_of(self, offset: int) -> int:
+        """오프셋이 속한 라인 번호(1부터)."""
+        return bisect_right(self.line_starts, offset)
+
+    def line_span(self, line_num: int):
+        """라인의 [start, end) 오프셋 (줄바꿈 문자 제외)."""
+        start = self.line_starts[line_num - 1]
+        if line_num < len(self.line_starts):
+            end = self.line_starts[line_num] - 1
+        else:
+            end = len(self.content)
+        return start, end
+
+    def raw_line(self, line_num: int) -> str:
+        start, end = self.line_span(line_num)
+        return self.content[start:end]
+
+    def masked_line(self, line_num: int) -> str:
+        start, end = self.line_span(line_num)
+        return self.masked[start:end]
+
+    def statement_end_line(self, line_num: int) -> int:
+        """
+        line_num 에서 시작한 문장이 끝나는(;, 블록 시작 또는 닫는 태그) 라인.
+        heredoc 이나 여러 줄 문자열 인자의 보간까지 싱크 문장으로 보기 위해 쓴다.
+        """
+        if self._token_lines is None:
+            self._token_lines = [t.line for t in self.tokens]
+        toks = self.tokens
+        k = bisect_left(self._token_lines, line_num)
+        end = line_num
+        depth = 0
+        while k < len(toks):
+            tok = toks[k]
+            if tok.line > line_num + STATEMENT_LINE_LIMIT or tok.kind == T_CLOSE_TAG:
+                break
+            end = tok.line
+            if tok.kind == T_OP:
+                if tok.text == '{' and depth == 0:
+                    # 블록 시작: 블록 본문은 이 문장이 아니다.
+                    break
+                if tok.text in _STMT_OPEN:
+                    depth += 1
+                elif tok.text in _STMT_CLOSE:
+                    depth -= 1
+                    if depth < 0:
+                        break
+                elif tok.text == ';' and depth == 0:
+                    break
+            k += 1
+        return end
+
+    def masked_statement(self, line_num: int) -> str:
+        """line_num 부터 그 라인에서 시작한 문장 끝 라인까지의 마스킹된 텍스트."""
+        start, _ = self.line_span(line_num)
+        _, end = self.line_span(self.statement_end_line(line_num))
+        return self.masked[start:end]
+
+
+class LiteralIndex:
+    """
+    patterns.LITERAL_TABLE 의 모든 리터럴을 Aho-Corasick 오토마톤으로
+    파일 전체에서 한 번에 찾아, 라인별/카테고리별로 모아 둔 인덱스.
+    """
+
+    __slots__ = ('by_line', 'file_categories')
+
+    def __init__(self, src: MaskedSource):
+        by_line = {}
+        file_categories = set()
+        content = src.content
+        masked = src.masked
+        for start, idx in LITERAL_AUTOMATON.iter_matches(src.lower):
+            key = LITERAL_KEYS[idx]
+            end = start + len(key)
+            ln = None
+            for category, mode, lit in LITERAL_CATEGORIES[idx]:
+                if mode == 'code' and (content[start:end] != lit or masked[start:end] != lit):
+                    continue
+                if ln is None:
+                    ln = src.line_of(start)
+                by_line.setdefault(ln, {}).setdefault(category, set()).add(lit)
+                file_categories.add(category)
+        self.by_line = by_line
+        self.file_categories = file_categories
+
+    def on_line(self, line_num: int, category: str):
+        """해당 라인에서 찾은 category 리터럴 집합."""
+        return self.by_line.get(line_num, {}).get(category, frozenset())
+
+    def lines(self, category: str):
+        """category 리터럴이 하나라도 있는 라인 번호들."""
+        return [ln for ln, cats in self.by_line.items() if category in cats]
+
+    def in_file(self, category: str) -> bool:
+        return category in self.file_categories
+
+
+class FileFacts:
+    """
+    분류(classify_vulnerability)에 필요한 파일 단위 사실들을
+    scan_file_for_xss 에서 파일당 한 번만 계산해 둔 레코드.
+
+    - db_reads / db_writes : DB 읽기/쓰기 API -> 등장 라인 목록
+    - dom_lines            : DOM 토큰이 있는 라인 -> 토큰 집합
+    - js_dom_lines         : js 컨텍스트에서 DOM-based 로 보는 토큰이 있는 라인
     """
-    def _replacer(m):
-        return ' ' * (len(m.group(0)))
 
-    # /* ... */ 스타일 주석
-    src = re.sub(r'/\*.*?\*/', _replacer, src, flags=re.DOTALL)
-    # //, # 한 줄 주석
-    src = re.sub(r'//.*?$', _replacer, src, flags=re.MULTILINE)
-    src = re.sub(r'#.*?$', _replacer, src, flags=re.MULTILINE)
-    # '...' / "..." 문자열
-    src = re.sub(r"'(?:\\.|[^'])*'", _replacer, src)
-    src = re.sub(r'\"(?:\\.|[^\"])*\"', _replacer, src)
-    return src
+    __slots__ = ('db_reads', 'db_writes', 'dom_lines', 'js_dom_lines')
+
+    def __init__(self, src: MaskedSource):
+        literals = src.literals
+        db_reads = {}
+        db_writes = {}
+        dom_lines = {}
+        js_dom_lines = set()
+        for ln in sorted(literals.by_line):
+            cats = literals.by_line[ln]
+            for api in cats.get('db_read', ()):
+                db_reads.setdefault(api, []).append(ln)
+            for api in cats.get('db_write', ()):
+                db_writes.setdefault(api, []).append(ln)
+            if 'dom' in cats:
+                dom_lines[ln] = frozenset(cats['dom'])
+            if 'js_dom' in cats:
+                js_dom_lines.add(ln)
+        self.db_reads = db_reads
+        self.db_writes = db_writes
+        self.dom_lines = dom_lines
+        self.js_dom_lines = js_dom_lines
+
+    @property
+    def has_db_api(self) -> bool:
+        return bool(self.db_reads or self.db_writes)
+
+
+def _as_masked_source(src) -> MaskedSource:
+    """라인 리스트/문자열도 받을 수 있도록 MaskedSource 로 변환."""
+    if isinstance(src, MaskedSource):
+        return src
+    if not isinstance(src, str):
+        src = '\n'.join(src)
+    return MaskedSource(src, start_in_php='<?' not in src)
+
+
+def rule_lines(src):
+    """
+    (소스 라인 집합, 싱크 라인 집합).
+    COMBINED_RULE_RE 를 마스킹된 파일 전체에 한 번 finditer 하고,
+    SINK_FUNCS 는 리터럴 오토마톤 결과를 쓴다.
+    """
+    src = _as_masked_source(src)
+    source_lines = set()
+    sink_lines = set()
+    for m in COMBINED_RULE_RE.finditer(src.masked):
+        ln = src.line_of(m.start())
+        if m.lastgroup == 'source':
+            source_lines.add(ln)
+        else:
+            sink_lines.add(ln)
+    sink_lines.update(src.literals.lines('sink_func'))
+    return source_lines, sink_lines
 
 
-def find_candidates(lines, window: int = 3):
+def find_candidates(src, window: int = 3):
     """
     후보 축소:
     - 소스(SOURCE_PATTERNS)와 싱크(SINK_TOKENS/SINK_FUNCS)가
       ±window 라인 이내에 같이 등장하는 라인을 후보로 반환.
+
+    소스/싱크 여부는 rule_lines() 로 라인별로 얻는다.
     """
-    stripped = [strip_strings_and_comments(l) for l in lines]
-    source_lines = set()
-    sink_lines = set()
+    src = _as_masked_source(src)
+    with stage_timer('find_candidates'):
+        source_lines, sink_lines = rule_lines(src)
 
-    for i, line in enumerate(stripped):
-        for sp in SOURCE_PATTERNS:
-            if re.search(sp, line, re.IGNORECASE):
-                source_lines.add(i + 1)
-                break
-        for sk in SINK_TOKENS:
-            if re.search(sk, line, re.IGNORECASE):
-                sink_lines.add(i + 1)
-                break
-        for func in SINK_FUNCS:
-            if func in line:
-                sink_lines.add(i + 1)
-
-    candidates = set()
-    # 소스 기준으로 주변 싱크 라인 후보 추가
-    for s in source_lines:
-        for i in range(s - window, s + window + 1):
-            if i in sink_lines:
-                candidates.add(i)
-
-    # 동일 라인에서 소스/싱크 같이 있는 경우
-    for sk in sink_lines:
-        if any(re.search(sp, stripped[sk - 1], re.IGNORECASE) for sp in SOURCE_PATTERNS):
-            candidates.add(sk)
-
-    # 후보가 하나도 없으면 싱크 상위 10개라도 본다.
-    if not candidates:
-        candidates = set(list(sink_lines)[:10])
+        candidates = set()
+        # 소스 기준으로 주변 싱크 라인 후보 추가
+        for s in source_lines:
+            for i in range(s - window, s + window + 1):
+                if i in sink_lines:
+                    candidates.add(i)
+
+        # 동일 라인에서 소스/싱크 같이 있는 경우
+        candidates.update(sink_lines & source_lines)
+
+        # 후보가 하나도 없으면 싱크 상위 10개라도 본다.
+        if not candidates:
+            candidates = set(list(sink_lines)[:10])
 
     return sorted(candidates)
 
 
-def build_taint_map(lines, max_hops: int = 3):
+def analyze_file_taint(src, max_hops: int = 3, summaries=None, seed=None):
     """
-    얕은 데이터 플로(1~3 hop) 추적: 변수 -> taint source mapping.
-    '$var = $_GET[...]', '$b = $a', ... 형태를 간단히 추적한다.
+    흐름을 따르는 taint 분석(dataflow.TaintEngine) 결과.
+    반복문을 통한 역방향 흐름, 정화 함수 재할당에 의한 taint 제거를 반영하며,
+    결과의 lookup(라인, 변수) 로 그 라인 시점의 taint 정보를 얻는다.
+    summaries 가 주어지면 그 함수들의 반환값 흐름을 반영한다.
+    seed({변수: (소스, 라인, hop)}) 는 파일 최상위 진입 시점에 이미 tainted 인
+    변수다(이 파일을 include 하는 파일에서 넘어온 taint).
     """
-    taint = {}
-    assign_re = re.compile(r'\$[A-Za-z_][A-Za-z0-9_]*')
+    src = _as_masked_source(src)
+    with stage_timer('taint'):
+        return analyze_taint(src.tokens, max_hops=max_hops, summaries=summaries, seed=seed)
 
-    for line_num, raw in enumerate(lines, 1):
-        line = strip_strings_and_comments(raw)
-        m = re.search(r'(\$[A-Za-z_][A-Za-z0-9_]*)\s*=\s*(.+);', line)
-        if not m:
-            continue
-        left = m.group(1)
-        right = m.group(2)
 
-        # 오른쪽에 직접 superglobal이 있으면 taint 시작
-        for sp in SOURCE_PATTERNS:
-            if re.search(sp, right, re.IGNORECASE):
-                taint[left] = {'source': sp.lower(), 'line': line_num, 'hops': 0}
-                break
-        else:
-            # 이미 tainted 변수에서 전파
-            vars_in_right = re.findall(r'(\$[A-Za-z_][A-Za-z0-9_]*)', right)
-            for v in vars_in_right:
-                if v in taint and taint[v]['hops'] < max_hops:
-                    taint[left] = {
-                        'source': taint[v]['source'],
-                        'line': taint[v]['line'],
-                        'hops': taint[v]['hops'] + 1,
-                    }
-                    break
-    return taint
+def build_taint_map(src, max_hops: int = 3):
+    """
+    변수 -> taint source mapping (파일 전체 요약).
+    analyze_file_taint 결과에서 파일 어디에서든 tainted 인 변수를
+    가장 작은 hop 수 기준으로 모은다.
+    """
+    return analyze_file_taint(src, max_hops=max_hops).summary()
 
 
-def detect_context_for_line(line: str) -> str:
+class LineTaint:
+    """
+    build_line_taint 결과. 변수마다 대입 라인 순으로 (라인, taint 정보 또는 None)
+    기록을 들고 있고, lookup 은 그 라인까지의 마지막 기록을 돌려준다
+    (dataflow.TaintResult.lookup 과 같은 모양).
+    """
+
+    __slots__ = ('_events',)
+
+    def __init__(self, events: dict):
+        self._events = events  # 변수 -> ([라인], [taint 정보 또는 None])
+
+    def lookup(self, line_num: int, var: str):
+        events = self._events.get(var)
+        if events is None:
+            return None
+        k = bisect_right(events[0], line_num)
+        return events[1][k - 1] if k else None
+
+
+def build_line_taint(src, max_hops: int = 3) -> LineTaint:
+    """
+    흐름 분석 없이 라인 순서대로만 따라가는 얕은 taint(fast 프로필용).
+    마스킹된 라인의 '$var = ...' / '$var .= ...' 대입을 위에서 아래로 훑으며
+    - 오른쪽에 입력 소스가 있으면 0 hop 으로 taint 를 시작하고,
+    - tainted 변수를 쓰면 hop 을 하나 늘려 전파하고(max_hops 까지),
+    - 정화 함수/캐스트를 거치거나 깨끗한 값을 '=' 로 대입하면 taint 를 끊는다.
+    가드 함수를 거친 값은 그 가드 이름을 guards 에 달고 tainted 로 남긴다.
+    """
+    src = _as_masked_source(src)
+    state = {}
+    events = {}
+    with stage_timer('line_taint'):
+        for ln in range(1, src.line_count + 1):
+            line = src.masked_line(ln)
+            if '=' not in line:
+                continue
+            for m in _ASSIGN_RE.finditer(line):
+                left, op, right = m.group(1), m.group(2), m.group(3)
+                info = None
+                if not _SANITIZE_RE.search(right):
+                    src_m = SOURCE_RE.search(right)
+                    if src_m is not None:
+                        info = {'source': src_m.group(0).lower(), 'line': ln, 'hops': 0, 'guards': None}
+                    else:
+                        for v in _VAR_RE.findall(right):
+                            prev = state.get(v)
+                            if prev is not None and prev['hops'] < max_hops:
+                                info = dict(prev, hops=prev['hops'] + 1)
+                                break
+                    guards = _guard_names(right)
+                    if info is not None and guards:
+                        info['guards'] = tuple(sorted(guards | set(info['guards'] or ())))
+                    if info is None and op == '.=':
+                        # 이어 붙이기는 기존 taint 를 지우지 않는다.
+                        continue
+                state[left] = info
+                lines, infos = events.setdefault(left, ([], []))
+                lines.append(ln)
+                infos.append(info)
+    return LineTaint(events)
+
+
+def detect_context_for_line(src, line_num: int) -> str:
     """
     싱크가 속한 컨텍스트( html / attr / js / url ) 추정.
     """
-    lower = line.lower()
-    if any(h in lower for h in JS_SINK_HINT):
+    src = _as_masked_source(src)
+    # inline HTML 의 <script> 블록 안에 박힌 PHP 코드
+    if line_num in src.js_lines:
+        return 'js'
+    literals = src.literals
+    if literals.on_line(line_num, 'js_hint'):
         return 'js'
-    if any(h in lower for h in ATTR_CONTEXT_HINT):
+    if literals.on_line(line_num, 'attr_hint'):
         return 'attr'
+    start, end = src.line_span(line_num)
+    lower = src.lower[start:end]
     if 'location.href' in lower or 'window.location' in lower or 'href=' in lower:
         return 'url'
     return 'html'
 
 
-def check_guard_in_expression(expr: str, context: str):
+def _judge_guards(found, context: str):
     """
-    가드 함수(esc_html, esc_attr, esc_url, esc_js 등) 존재 및
-    컨텍스트와의 매칭 여부 검사.
+    expr 에서 찾은 가드 호출 이름 집합으로 (guard_present, guard_name, mismatch) 판정.
     """
-    guards = GUARD_FUNCS.get(context, [])
-    # 우선 해당 컨텍스트에 맞는 가드 함수 탐색
-    for g in guards:
-        if re.search(rf'\b{g}\s*\(', expr):
-            return True, g, None
+    if not found:
+        return False, None, None
+
+    # 해당 컨텍스트에 맞는 가드 (목록 앞쪽 우선)
+    rank = GUARD_RANK.get(context, {})
+    best = None
+    for g in found:
+        r = rank.get(g)
+        if r is not None and (best is None or r < best[0]):
+            best = (r, g)
+    if best is not None:
+        return True, best[1], None
 
     # JS 컨텍스트에서 wp_json_encode도 허용
-    if context == 'js' and re.search(r'wp_json_encode\s*\(', expr):
+    if context == 'js' and 'wp_json_encode' in found:
         return True, 'wp_json_encode', None
 
     # 다른 컨텍스트용 가드가 쓰인 경우 guard mismatch
-    for ctx, funcs in GUARD_FUNCS.items():
-        for f in funcs:
-            if re.search(rf'\b{f}\s*\(', expr):
-                if ctx != context:
-                    return False, f, f'guard_mismatch: used {f} for {context} but maps to {ctx}'
+    table = GUARD_MISMATCH.get(context, GUARD_MISMATCH[None])
+    worst = None
+    for g in found:
+        hit = table.get(g)
+        if hit is not None and (worst is None or hit[0] < worst[0]):
+            worst = (hit[0], g, hit[1])
+    if worst is not None:
+        _, f, ctx = worst
+        return False, f, f'guard_mismatch: used {f} for {context} but maps to {ctx}'
 
     return False, None, None
 
 
+def _guard_names(text: str):
+    return {name for name in FUNC_CALL_RE.findall(text) if name in GUARD_CONTEXTS}
+
+
+def check_guard_in_expression(expr: str, context: str):
+    """
+    가드 함수(esc_html, esc_attr, esc_url, esc_js 등) 존재 및
+    컨텍스트와의 매칭 여부 검사.
+    """
+    return _judge_guards(_guard_names(expr), context)
+
+
+def check_guards_for_lines(src, line_contexts: dict) -> dict:
+    """
+    여러 후보 라인의 가드 판정을 한 번에 수행한다.
+    line_contexts: {라인 번호: 컨텍스트} -> {라인 번호: (present, name, mismatch)}
+
+    마스킹된 파일 전체에서 FUNC_CALL_RE 를 한 번 돌려 가드 호출을
+    라인별로 모은 뒤 판정한다.
+    """
+    src = _as_masked_source(src)
+    calls = {}
+    if line_contexts:
+        for m in FUNC_CALL_RE.finditer(src.masked):
+            name = m.group(1)
+            if name in GUARD_CONTEXTS:
+                ln = src.line_of(m.start())
+                if ln in line_contexts:
+                    calls.setdefault(ln, set()).add(name)
+    return {
+        ln: _judge_guards(calls.get(ln), ctx)
+        for ln, ctx in line_contexts.items()
+    }
+
+
 def calculate_confidence_score(vuln: dict) -> int:
     """
     취약점 신뢰도 점수(0~100)를 계산.
@@ -186,57 +605,35 @@ def calculate_confidence_score(vuln: dict) -> int:
     return min(100, max(0, int(score)))
 
 
-def get_code_context(lines, line_num: int, context_size: int = CONTEXT_LINES) -> str:
+def get_code_context(src, line_num: int, context_size: int = CONTEXT_LINES) -> str:
     """
     라인 주변 코드 문맥을 예쁘게 문자열로 만든다.
+    src 는 MaskedSource 또는 라인 리스트.
     """
-    start = max(0, line_num - context_size - 1)
-    end = min(len(lines), line_num + context_size)
-    context_lines = []
-    for i in range(start, end):
-        marker = '>>>' if i == line_num - 1 else '   '
-        context_lines.append(f"{marker}{i + 1}: {lines[i].rstrip()}")
-    return '\n'.join(context_lines)
+    if isinstance(src, MaskedSource):
+        return format_code_context(src.raw_line, src.line_count, line_num, context_size)
+    lines = src.split('\n') if isinstance(src, str) else src
+    return format_code_context(lambda n: lines[n - 1], len(lines), line_num, context_size)
 
 
-def classify_vulnerability(vuln: dict, raw_line: str, full_file_content: str) -> str:
+def classify_vulnerability(vuln: dict, facts, line_num: int) -> str:
     """
     취약점을 Reflected / DOM-based / Stored / Possible 로 분류.
+    facts 는 FileFacts (MaskedSource/라인 리스트를 주면 만들어서 쓴다).
     """
-    line_lower = raw_line.lower()
-    content_lower = full_file_content.lower()
+    if not isinstance(facts, FileFacts):
+        facts = FileFacts(_as_masked_source(facts))
 
     # DB 관련 소스(서버 저장 값) -> Stored XSS 가능성
-    for db_pattern in [
-        'get_option',
-        'get_post_meta',
-        'get_user_meta',
-        'update_option',
-        'add_post_meta',
-        'update_post_meta',
-        'add_option',
-    ]:
-        if db_pattern in line_lower or db_pattern in content_lower:
-            return 'Stored XSS'
+    if facts.has_db_api:
+        return 'Stored XSS'
 
     # DOM 관련 토큰이 보이면 DOM-based
-    dom_tokens = [
-        'document.write',
-        'innerhtml',
-        'eval(',
-        'setattribute(',
-        'location.hash',
-        'location.href',
-        'window.location',
-        '.outerhtml',
-    ]
-    if any(tok in line_lower for tok in dom_tokens):
+    if line_num in facts.dom_lines:
         return 'DOM-based XSS'
 
     # js context + inline script / DOM 토큰
-    if vuln.get('context') == 'js' and any(
-        tok in line_lower for tok in ['<script', 'document.write', 'innerhtml', 'eval(']
-    ):
+    if vuln.get('context') == 'js' and line_num in facts.js_dom_lines:
         return 'DOM-based XSS'
 
     # 직접 superglobal이 sink에 들어가면 Reflected XSS 가능성
@@ -245,18 +642,271 @@ def classify_vulnerability(vuln: dict, raw_line: str, full_file_content: str) ->
 
     # tainted 변수가 superglobal에서 왔다면 Reflected 가능성
     if vuln.get('tainted_var') and vuln.get('taint_hops') is not None:
-        src = vuln.get('taint_source', '')
-        if src and any(sg in src for sg in ['$_get', '$_post', '$_request', '$_cookie', '$_files']):
+        taint_src = vuln.get('taint_source', '')
+        if taint_src and any(sg in taint_src for sg in ['$_get', '$_post', '$_request', '$_cookie', '$_files']):
             return 'Reflected XSS'
 
     # 그 외는 애매 → Possible
     return 'Possible XSS (unknown)'
 
 
-def scan_file_for_xss(file_path: str):
+def resolve_scan_policy(file_path: str, size: int, policies=None) -> str:
+    """
+    파일명/크기로 스캔 정책('full' / 'heuristic' / 'shallow' / 'skip')을 정한다.
+    policies 는 (접미사, 최소 크기, 정책) 목록이며 처음 맞는 규칙을 쓴다.
+    """
+    name = file_path.lower()
+    for suffix, min_size, policy in (policies or SCAN_POLICIES):
+        if name.endswith(suffix) and size >= min_size:
+            return policy
+    return 'full'
+
+
+def has_long_lines(content: str, limit: int = MINIFIED_LINE_LENGTH) -> bool:
+    """minified 처럼 limit 글자를 넘는 라인이 있는지."""
+    if len(content) <= limit:
+        return False
+    return any(len(line) > limit for line in content.split('\n'))
+
+
+def _shallow_category(source: str) -> str:
+    if source in DOM_SOURCES:
+        return 'DOM-based XSS'
+    if source.startswith('$_'):
+        return 'Reflected XSS'
+    return 'Possible XSS (unknown)'
+
+
+def scan_file_shallow(
+    file_path: str,
+    window: int = SHALLOW_WINDOW,
+    proximity: int = SHALLOW_PROXIMITY,
+    max_findings: int = SHALLOW_MAX_FINDINGS,
+):
+    """
+    큰 파일/minified 파일용 얕은 스캔.
+
+    파일을 mmap 으로 열어 window 바이트씩(앞뒤 proximity 만큼 겹치게) 훑으며,
+    같은 라인에서 싱크 앞뒤 proximity 글자 안에 입력 소스가 있는 위치만 보고한다.
+    lexer/taint 분석은 하지 않고, 위치는 (라인, 라인 안 바이트 column) 으로 남긴다.
+    위험도/신뢰도는 findings_from_sites 와 같은 규칙으로 매긴다.
+    """
+    findings = []
+    is_js = file_path.lower().endswith('.js')
+    with stage_timer('shallow_scan'), open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return findings
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            line = 1         # pos 위치의 라인 번호
+            line_start = 0   # 그 라인의 시작 오프셋(파일 기준)
+            for off in range(0, size, window):
+                lo = max(0, off - proximity)
+                # latin-1 로 읽으면 글자 오프셋 == 바이트 오프셋
+                text = mm[lo:min(size, off + window + proximity)].decode('latin-1')
+                pos = off - lo
+                end = min(off + window, size) - lo
+                for m in SHALLOW_SINK_RE.finditer(text, pos):
+                    s = m.start()
+                    if s >= end:
+                        break
+                    nl = text.count('\n', pos, s)
+                    if nl:
+                        line += nl
+                        line_start = lo + text.rfind('\n', pos, s) + 1
+                    pos = s
+
+                    # 같은 라인 안, 싱크 앞뒤 proximity 글자
+                    eol = text.find('\n', m.end(), m.end() + proximity)
+                    near = text[max(0, line_start - lo, s - proximity):eol if eol != -1 else m.end() + proximity]
+                    src_m = SHALLOW_SOURCE_RE.search(near)
+                    if src_m is None:
+                        continue
+
+                    context = 'js' if (is_js or m.group('js')) else 'html'
+                    source = src_m.group(0).lower()
+                    guard = _judge_guards(_guard_names(near), context)
+                    # 위험도/신뢰도는 전체 스캔과 같은 규칙(findings_from_sites)으로 매긴다.
+                    # PHP 입력 소스는 직접 사용, DOM 소스는 0 hop tainted 값으로 본다.
+                    if SOURCE_RE.fullmatch(src_m.group(0)):
+                        site = (line, context, True, None, guard)
+                    else:
+                        site = (line, context, False, (source, {'source': source, 'line': line, 'hops': 0}), guard)
+                    vulns = findings_from_sites(file_path, [site], None, category=_shallow_category(source))
+                    if not vulns:
+                        continue
+                    vuln = vulns[0]
+                    vuln.taint_source = source
+                    vuln.column = lo + s - line_start
+                    findings.append(vuln)
+                    if len(findings) >= max_findings:
+                        return findings
+
+                nl = text.count('\n', pos, end)
+                if nl:
+                    line += nl
+                    line_start = lo + text.rfind('\n', pos, end) + 1
+    return findings
+
+
+def _tainted_hit(taint, uses):
+    """
+    [(라인, 변수)] 중 tainted 인 변수 -> (변수, taint 정보) 또는 None.
+    가드 없이 온 값(guards 가 None)을 가드를 거친 값보다 먼저 고른다.
+    """
+    guarded = None
+    for ln, v in uses:
+        info = taint.lookup(ln, v)
+        if info is None:
+            continue
+        if not info.get('guards'):
+            return (v, info)
+        if guarded is None:
+            guarded = (v, info)
+    return guarded
+
+
+def _carried_guard(guard, hit, context: str):
+    """싱크 식에 가드 호출이 없으면 tainted 값이 대입될 때 거친 가드로 판정한다."""
+    if guard[1] is None and hit is not None and hit[1].get('guards'):
+        return _judge_guards(set(hit[1]['guards']), context)
+    return guard
+
+
+def find_call_site_flows(src, taint, summaries) -> dict:
+    """
+    요약상 인자가 싱크로 흐르는 함수(summaries[f]['sinks'])를 호출하면서
+    그 인자에 입력 소스나 tainted 변수를 넘기는 지점.
+
+    함수/메서드는 이름(소문자)으로만 찾는다.
+    -> {라인: (direct_super, (변수, taint 정보) 또는 None, 컨텍스트, 가드 판정, 함수 이름)}
+    """
+    flows = {}
+    if not summaries:
+        return flows
+    src = _as_masked_source(src)
+    toks = src.tokens
+    match = None
+    for k in range(len(toks) - 1):
+        tok = toks[k]
+        if tok.kind != T_IDENT:
+            continue
+        summary = summaries.get(tok.text.lower())
+        if not summary or not summary.get('sinks'):
+            continue
+        nxt = toks[k + 1]
+        if nxt.kind != T_OP or nxt.text != '(':
+            continue
+        if k and toks[k - 1].kind == T_IDENT and toks[k - 1].text.lower() in ('function', 'new'):
+            continue
+        if match is None:
+            match = match_brackets(toks)
+        args = split_call_args(toks, k + 1, match)
+        for idx, context in summary['sinks']:
+            if idx >= len(args) or tok.line in flows:
+                continue
+            a, b = args[idx]
+            text = ' '.join(t.text for t in toks[a:b] if t.kind not in MASKED_KINDS)
+            direct = SOURCE_RE.search(text) is not None
+            hit = None
+            if not direct:
+                hit = _tainted_hit(taint, [(t.line, t.text) for t in toks[a:b] if t.kind == T_VARIABLE])
+            if direct or hit is not None:
+                guard = _carried_guard(_judge_guards(_guard_names(text), context), hit, context)
+                flows[tok.line] = (direct, hit, context, guard, tok.text)
+    return flows
+
+
+def findings_from_sites(file_path: str, sites, facts, category: str = None) -> list:
+    """
+    싱크 지점 목록 -> 위험도/신뢰도를 매기고 걸러낸 Finding 리스트.
+    sites: [(라인, 컨텍스트, 직접 소스 여부, (변수, taint 정보) 또는 None, 가드 판정)]
+    category 가 주어지면 classify_vulnerability 대신 그 분류를 쓴다(facts 불필요).
+    (정규식 엔진, AST 엔진(astengine), JS 분석기(jsanalyzer)가 함께 쓴다)
+    """
+    vulnerabilities = []
+    for ln, context, direct_super, hit, guard in sites:
+        tainted = None
+        taint_hops = None
+        taint_origin_line = None
+        taint_source = None
+        if hit is not None:
+            tainted, info = hit
+            taint_hops = info['hops']
+            taint_origin_line = info['line']
+            taint_source = info['source']
+
+        guard_present, guard_name, guard_mismatch = guard
+
+        if direct_super and not guard_present:
+            risk = 'CRITICAL'
+        elif (tainted is not None) and not guard_present:
+            risk = 'HIGH'
+        elif guard_mismatch:
+            risk = 'HIGH'
+        else:
+            risk = 'LOW'
+
+        # attr 컨텍스트에서 html용 guard 사용 시 mismatch 처리
+        if context == 'attr' and guard_present and guard_name and guard_name in GUARD_FUNCS.get('html', []):
+            guard_mismatch = f'used {guard_name} for attr but it maps to html'
+            risk = 'HIGH'
+
+        flags = 0
+        if direct_super:
+            flags |= FLAG_DIRECT_SUPERGLOBAL
+        if guard_present:
+            flags |= FLAG_GUARD_PRESENT
+
+        vuln = Finding(
+            file_path,
+            ln,
+            flags=flags,
+            risk_level=risk,
+            context=context,
+            tainted_var=tainted,
+            taint_hops=taint_hops,
+            taint_origin_line=taint_origin_line,
+            taint_source=taint_source,
+            guard_name=guard_name,
+            guard_mismatch=guard_mismatch,
+        )
+
+        # 신뢰도 계산
+        vuln.confidence = calculate_confidence_score(vuln)
+
+        # 너무 낮은 신뢰도 & LOW 위험도는 버림
+        if vuln.risk_level == 'LOW' and vuln.confidence < 50:
+            continue
+
+        # 분류
+        vuln.vulnerability_category = category or classify_vulnerability(vuln, facts, ln)
+        vulnerabilities.append(vuln)
+    return vulnerabilities
+
+
+def scan_file_for_xss(file_path: str, policies=None, summaries=None, entry_taint=None):
     """
     단일 파일(PHP/JS)에 대해 XSS 후보를 스캔하고,
-    'vulnerability' 딕셔너리 리스트를 반환.
+    Finding 리스트를 반환.
+
+    후보마다 위험도/신뢰도까지만 계산해 걸러내고, 스니펫/설명 등은
+    Finding 을 조회할 때 만들어진다.
+
+    파일 크기/종류별 정책(policies, 기본 SCAN_POLICIES)에 따라 건너뛰거나
+    scan_file_shallow 로 얕게 스캔한다. 정책상 full 이어도 라인이 지나치게
+    긴(minified) 파일은 얕은 스캔으로 돌린다. 정책이 'heuristic'(fast 프로필)
+    이면 흐름 분석(dataflow) 대신 build_line_taint 의 라인 순 taint 로
+    같은 후보/규칙 판정을 한다.
+
+    summaries 는 플러그인 전체의 함수 요약(interproc.build_summary_table)
+    중 이 파일이 호출하는 함수들이다. 주어지면 반환값 흐름을 taint 분석에
+    반영하고, 싱크로 이어지는 인자에 tainted 값을 넘기는 호출 지점도 보고한다.
+
+    entry_taint 는 이 파일을 include 하는 파일들에서 넘어온 전역 taint
+    ({변수: (소스, 라인, hop)}, includes 모듈 참고)다. 주어지면 파일 진입
+    시점에 그 변수들이 tainted 인 것으로 보고, 소스 토큰이 근처에 없어도
+    그 변수를 출력하는 싱크를 후보에 넣는다.
     """
     vulnerabilities = []
 
@@ -264,93 +914,51 @@ def scan_file_for_xss(file_path: str):
         if not (file_path.lower().endswith('.php') or file_path.lower().endswith('.js')):
             return vulnerabilities
 
+        policy = resolve_scan_policy(file_path, os.path.getsize(file_path), policies)
+        if policy == 'skip':
+            return vulnerabilities
+        if policy == 'shallow':
+            return scan_file_shallow(file_path)
+
         with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
             content = f.read()
-            lines = content.split('\n')
 
-        candidate_sink_lines = find_candidates(lines, window=3)
-        taint_map = build_taint_map(lines, max_hops=3)
+        if has_long_lines(content):
+            return scan_file_shallow(file_path)
 
+        src = MaskedSource(content, start_in_php=file_path.lower().endswith('.js'))
+        candidate_sink_lines = find_candidates(src, window=3)
+        if policy == 'heuristic':
+            taint = build_line_taint(src, max_hops=3)
+        else:
+            taint = analyze_file_taint(src, max_hops=3, summaries=summaries, seed=entry_taint)
+        if entry_taint:
+            _, sink_lines = rule_lines(src)
+            extra = [
+                ln for ln in sink_lines
+                if any(taint.lookup(ln, v) is not None for v in _VAR_RE.findall(src.masked_line(ln)))
+            ]
+            candidate_sink_lines = sorted(set(candidate_sink_lines).union(extra))
+
+        facts = FileFacts(src)
+        contexts = {ln: detect_context_for_line(src, ln) for ln in candidate_sink_lines}
+        guards = check_guards_for_lines(src, contexts)
+
+        # (라인, 컨텍스트, 직접 소스 여부, (변수, taint 정보) 또는 None, 가드 판정)
+        sites = []
         for ln in candidate_sink_lines:
-            raw_line = lines[ln - 1]
-            stripped = strip_strings_and_comments(raw_line)
-            context = detect_context_for_line(raw_line)
-
-            direct_super = any(re.search(sp, stripped, re.IGNORECASE) for sp in SOURCE_PATTERNS)
-
-            vars_used = re.findall(r'(\$[A-Za-z_][A-Za-z0-9_]*)', stripped)
-            tainted = None
-            taint_hops = None
-            taint_origin_line = None
-            taint_source = None
-            for v in vars_used:
-                if v in taint_map:
-                    tainted = v
-                    taint_hops = taint_map[v]['hops']
-                    taint_origin_line = taint_map[v].get('line')
-                    taint_source = taint_map[v].get('source')
-                    break
-
-            risk = 'LOW'
-            guard_present = False
-            guard_name = None
-            guard_mismatch = None
-
-            gp, gname, gm = check_guard_in_expression(stripped, context)
-            guard_present = gp
-            guard_name = gname
-            guard_mismatch = gm
-
-            if direct_super and not guard_present:
-                risk = 'CRITICAL'
-            elif (tainted is not None) and not guard_present:
-                risk = 'HIGH'
-            elif guard_mismatch:
-                risk = 'HIGH'
-            else:
-                risk = 'LOW'
-
-            # attr 컨텍스트에서 html용 guard 사용 시 mismatch 처리
-            if context == 'attr' and guard_present and guard_name and guard_name in GUARD_FUNCS.get('html', []):
-                guard_mismatch = f'used {guard_name} for attr but it maps to html'
-                risk = 'HIGH'
-
-            vuln = {
-                'file': file_path,
-                'line_num': ln,
-                'line_content': raw_line.strip()[:300],
-                'context': context,
-                'tainted_var': tainted,
-                'taint_hops': taint_hops,
-                'taint_origin_line': taint_origin_line,
-                'taint_source': taint_source,
-                'direct_superglobal': direct_super,
-                'guard_present': guard_present,
-                'guard_name': guard_name,
-                'guard_mismatch': guard_mismatch,
-                'vulnerability_type': 'XSS - '
-                + ('Direct Input Output' if direct_super else ('Tainted Output' if tainted else 'Suspicious Output')),
-                'risk_level': risk,
-                'description': '',
-                'context_snippet': get_code_context(lines, ln, context_size=CONTEXT_LINES),
-            }
-
-            if direct_super:
-                vuln['description'] = 'Sink directly outputs superglobal input.'
-            elif tainted:
-                vuln['description'] = f'Variable {tainted} is tainted (source at line {taint_origin_line}).'
-            else:
-                vuln['description'] = 'Sink found near source token but taint not resolved — 추가 분석 권장.'
-
-            # 신뢰도 계산
-            vuln['confidence'] = calculate_confidence_score(vuln)
-
-            # 분류
-            vuln['vulnerability_category'] = classify_vulnerability(vuln, raw_line, content)
-
-            # 너무 낮은 신뢰도 & LOW 위험도는 버림
-            if vuln['risk_level'] != 'LOW' or vuln['confidence'] >= 50:
-                vulnerabilities.append(vuln)
+            stripped = src.masked_statement(ln)
+            direct_super = SOURCE_RE.search(stripped) is not None
+            hit = _tainted_hit(taint, [(ln, v) for v in _VAR_RE.findall(stripped)])
+            sites.append((ln, contexts[ln], direct_super, hit, _carried_guard(guards[ln], hit, contexts[ln])))
+
+        # 요약상 싱크로 이어지는 함수 호출 지점
+        for ln, (direct_super, hit, context, guard, _) in find_call_site_flows(src, taint, summaries).items():
+            if ln not in contexts:
+                sites.append((ln, context, direct_super, hit, guard))
+        sites.sort(key=lambda site: site[0])
+
+        vulnerabilities = findings_from_sites(file_path, sites, facts)
 
     except Exception as e:
         print(f"Error scanning {file_path}: {e}")
@@ -0,0 +1,601 @@
+"""
+phply AST 기반 분석 엔진 모듈(scan --engine ast).
+
+PHP 파일을 phply 로 파싱해 소스/싱크/가드/taint 를 라인 정규식 대신
+AST 노드에서 판정한다.
+    - 소스 : SOURCE_PATTERNS 에 맞는 변수($_GET 등)와 함수 호출(get_option 등)
+    - 싱크 : echo / print / <?= 와 SINK_TOKENS, SINK_FUNCS 함수 호출,
+             함수 요약상 인자가 싱크로 흐르는 호출(--interprocedural)
+    - 가드 : 싱크 식 안에서 호출한 GUARD_FUNCS (판정은 정규식 엔진과 같은 규칙)
+    - taint: 문장 순서대로 변수 환경을 갱신하고, 분기는 합치며 반복문은
+             고정점까지 돈다. 정화 함수/캐스트로 재할당하면 taint 를 지우고,
+             가드로 감싼 값은 그 가드를 단 채 tainted 로 남긴다.
+출력 컨텍스트(html/attr/js/url)는 주변 HTML 에 달려 있으므로 기존 lexer
+기반 detect_context_for_line 을 그대로 쓴다.
+
+파싱은 비싸므로 AST 를 pickle 로 디스크에 캐시한다(내용 해시 + phply 버전
+키). 파싱에 실패하거나 파일당 시간 예산(AST_PARSE_BUDGET)을 넘기면 그
+파일만 정규식 엔진(scan_file_for_xss)으로 되돌아간다. 파싱 캐시 적중률과
+되돌아간 파일 수는 PARSE_STATS 에 모아 스캔 요약에 보여준다.
+"""
+
+import hashlib
+import os
+import pickle
+import re
+from collections import defaultdict
+
+try:
+    from phply import phpast
+    from phply.phplex import lexer as _phply_lexer
+    from phply.phpparse import make_parser
+except ImportError:  # phply 가 없으면 --engine ast 를 쓸 수 없다.
+    phpast = None
+
+from .analyzer import (
+    FileFacts,
+    MaskedSource,
+    detect_context_for_line,
+    findings_from_sites,
+    has_long_lines,
+    resolve_scan_policy,
+    scan_file_for_xss,
+    stage_timer,
+    _judge_guards,
+)
+from .patterns import (
+    GUARD_CONTEXTS,
+    SANITIZER_CASTS,
+    SANITIZER_FUNCS,
+    SINK_FUNCS,
+    SINK_TOKENS,
+    SOURCE_PATTERNS,
+)
+from .watchdog import time_budget
+
+ENGINES = ('regex', 'ast')
+AST_CACHE_DIRNAME = '.ast_cache'
+# 파일 하나의 파싱 시간 예산(초). 넘기면 정규식 엔진으로 되돌아간다.
+AST_PARSE_BUDGET = 5.0
+# 반복문 본문을 다시 도는 최대 횟수(보통 2번 안에 고정점에 닿는다)
+_LOOP_ROUNDS = 4
+MAX_HOPS = 3
+
+_SOURCE_RES = [(sp.lower(), re.compile(sp, re.IGNORECASE)) for sp in SOURCE_PATTERNS]
+_SANITIZERS = frozenset(SANITIZER_FUNCS) - frozenset(GUARD_CONTEXTS)
+_CASTS = frozenset(SANITIZER_CASTS)
+# echo/print 외에 함수 호출 형태의 싱크(printf, sprintf, SINK_FUNCS)
+_SINK_CALLS = frozenset(
+    [t.replace(r'\b', '') for t in SINK_TOKENS if re.fullmatch(r'[a-z_]+\\b', t)] + SINK_FUNCS
+) - {'echo', 'print'}
+
+# 파싱 캐시 통계: hits / misses / parsed / failed / timeouts / fallback
+PARSE_STATS = defaultdict(int)
+
+_PARSER = None
+
+
+def get_parse_stats() -> dict:
+    return dict(PARSE_STATS)
+
+
+def reset_parse_stats():
+    PARSE_STATS.clear()
+
+
+def merge_parse_stats(stats: dict):
+    """다른 프로세스에서 센 파싱 통계를 합산한다."""
+    for k, v in stats.items():
+        PARSE_STATS[k] += v
+
+
+def phply_available() -> bool:
+    return phpast is not None
+
+
+def phply_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version('phply')
+    except Exception:
+        return 'unknown'
+
+
+class ParseTimeout(Exception):
+    pass
+
+
+def _parser():
+    global _PARSER
+    if _PARSER is None:
+        _PARSER = make_parser()
+    return _PARSER
+
+
+class ParseCache:
+    """
+    내용 해시 -> pickle 된 AST (또는 파싱 실패 표시) 디스크 캐시.
+    <cache_dir>/phply-<버전>/<해시 앞 2자>/<해시>.pickle 에 저장하므로
+    phply 버전이 바뀌면 자연히 다른 디렉터리를 쓴다.
+    여러 워커 프로세스가 함께 쓰도록 임시 파일에 쓴 뒤 os.replace 한다.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.root = os.path.join(cache_dir, f"phply-{phply_version()}")
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest + '.pickle')
+
+    def get(self, digest: str):
+        """('ok', AST) / ('error', 메시지) 또는 None."""
+        try:
+            with open(self._path(digest), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None
+
+    def put(self, digest: str, entry):
+        path = self._path(digest)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except (OSError, pickle.PicklingError, RecursionError):
+            # 너무 깊은 AST 등은 캐시하지 않는다.
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+
+class AstEngine:
+    """
+    --engine ast 설정(워커 프로세스로 넘어갈 수 있도록 값만 들고 있다).
+    cache_dir 가 None 이면 파싱 캐시를 쓰지 않는다.
+    """
+
+    def __init__(self, cache_dir: str = None, budget: float = AST_PARSE_BUDGET):
+        self.cache_dir = cache_dir
+        self.budget = budget
+
+    def parse(self, content: str, digest: str):
+        """AST(문장 노드 리스트) 또는 None(파싱 실패/시간 초과)."""
+        cache = ParseCache(self.cache_dir) if self.cache_dir else None
+        entry = cache.get(digest) if cache is not None else None
+        if entry is not None:
+            PARSE_STATS['hits'] += 1
+        else:
+            PARSE_STATS['misses'] += 1
+            try:
+                with stage_timer('ast_parse'), time_budget(self.budget, ParseTimeout):
+                    tree = _parser().parse(content, lexer=_phply_lexer.clone(), tracking=True)
+                entry = ('ok', tree)
+                PARSE_STATS['parsed'] += 1
+            except ParseTimeout:
+                # 시간 초과는 예산에 따라 달라지므로 캐시하지 않는다.
+                PARSE_STATS['timeouts'] += 1
+                return None
+            except Exception as e:
+                entry = ('error', str(e)[:200])
+                PARSE_STATS['failed'] += 1
+            if cache is not None:
+                cache.put(digest, entry)
+        return entry[1] if entry[0] == 'ok' else None
+
+    def scan(self, file_path: str, policies=None, summaries=None, entry_taint=None):
+        """
+        PHP 파일을 AST 로 분석한다. PHP 가 아니거나, 정책상 full 스캔이 아니거나,
+        파싱하지 못하면 정규식 엔진(scan_file_for_xss)으로 분석한다.
+        """
+        if not file_path.lower().endswith('.php'):
+            return scan_file_for_xss(file_path, policies, summaries, entry_taint)
+        try:
+            if resolve_scan_policy(file_path, os.path.getsize(file_path), policies) != 'full':
+                return scan_file_for_xss(file_path, policies, summaries, entry_taint)
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+        except OSError as e:
+            print(f"Error scanning {file_path}: {e}")
+            return []
+        content = raw.decode('utf-8', errors='ignore')
+        if has_long_lines(content):
+            return scan_file_for_xss(file_path, policies, summaries, entry_taint)
+
+        tree = self.parse(content, hashlib.sha256(raw).hexdigest())
+        if tree is None:
+            PARSE_STATS['fallback'] += 1
+            return scan_file_for_xss(file_path, policies, summaries, entry_taint)
+        try:
+            with stage_timer('ast_scan'):
+                return scan_tree(file_path, content, tree, summaries, entry_taint)
+        except Exception as e:
+            print(f"AST scan failed for {file_path}, falling back to regex engine: {e}")
+            PARSE_STATS['fallback'] += 1
+            return scan_file_for_xss(file_path, policies, summaries, entry_taint)
+
+
+# --- AST 분석 ---
+
+
+def _children(node):
+    for field in node.fields:
+        value = getattr(node, field, None)
+        if isinstance(value, list):
+            for item in value:
+                if isinstance(item, phpast.Node):
+                    yield item
+        elif isinstance(value, phpast.Node):
+            yield value
+
+
+def _kind(node) -> str:
+    return type(node).__name__
+
+
+# 값이 아니라 참/거짓만 남기는 연산자
+_BOOL_OPS = frozenset(
+    ['==', '===', '!=', '!==', '<>', '<', '>', '<=', '>=', '&&', '||', 'and', 'or', 'xor', 'instanceof']
+)
+
+
+def _value_children(node):
+    """식의 값에 섞여 들어가는 하위 식(조건/인덱스/isset 등은 뺀다)."""
+    kind = _kind(node)
+    if kind in ('Isset', 'Empty', 'Closure', 'Function'):
+        return []
+    if kind == 'BinaryOp' and str(node.op).lower() in _BOOL_OPS:
+        return []
+    if kind == 'UnaryOp' and node.op == '!':
+        return []
+    if kind == 'TernaryOp':
+        first = node.iftrue if node.iftrue is not None else node.expr
+        return [c for c in (first, node.iffalse) if isinstance(c, phpast.Node)]
+    if kind in ('ArrayOffset', 'ObjectProperty', 'StaticProperty'):
+        return [node.node] if isinstance(node.node, phpast.Node) else []
+    return list(_children(node))
+
+
+def _call_name(node):
+    name = getattr(node, 'name', None)
+    return name.lower() if isinstance(name, str) else None
+
+
+def _args(node):
+    return [getattr(p, 'node', p) for p in (getattr(node, 'params', None) or [])]
+
+
+def _source_of(node):
+    """소스 노드면 SOURCE_PATTERNS 표기(소문자), 아니면 None."""
+    kind = _kind(node)
+    if kind == 'Variable' and isinstance(node.name, str):
+        text = node.name
+    elif kind == 'FunctionCall' and isinstance(node.name, str):
+        text = node.name
+    else:
+        return None
+    for sp, sp_re in _SOURCE_RES:
+        if sp_re.match(text):
+            return sp
+    return None
+
+
+def _base_var(node):
+    """$a / $a[..] / $a->b 대입 대상의 변수 이름과 통째 대입 여부."""
+    strong = True
+    while _kind(node) in ('ArrayOffset', 'ObjectProperty', 'StaticProperty'):
+        node = node.node
+        strong = False
+    if _kind(node) == 'Variable' and isinstance(node.name, str):
+        return node.name, strong
+    return None, False
+
+
+def _join(a: dict, b: dict) -> dict:
+    """두 환경의 합(같은 변수는 hop 이 작은 쪽)."""
+    out = dict(a)
+    for var, t in b.items():
+        out[var] = _best(out.get(var), t)
+    return out
+
+
+class _Walker:
+    """문장 순서대로 taint 환경을 갱신하며 싱크 지점을 모은다."""
+
+    def __init__(self, src: MaskedSource, summaries=None):
+        self.src = src
+        self.summaries = summaries or {}
+        self.sites = {}  # 라인 -> site
+
+    # --- 식 ---
+
+    def value_taint(self, node, env):
+        """식의 값이 대입될 때의 taint (소스, 라인, hop) 또는 None."""
+        if not isinstance(node, phpast.Node):
+            return None
+        kind = _kind(node)
+        source = _source_of(node)
+        if source is not None:
+            return (source, getattr(node, 'lineno', None), 0, None)
+        if kind == 'Variable':
+            t = env.get(node.name) if isinstance(node.name, str) else None
+            if t is None or t[2] >= MAX_HOPS:
+                return None
+            return (t[0], t[1], t[2] + 1, t[3])
+        if kind == 'Cast' and str(node.type).lower() in _CASTS:
+            return None
+        if kind in ('FunctionCall', 'MethodCall', 'StaticMethodCall'):
+            name = _call_name(node)
+            if name in _SANITIZERS:
+                return None
+            if name in GUARD_CONTEXTS:
+                # 가드는 컨텍스트에 따라 안전 여부가 달라 taint 에 가드를 붙여 남긴다.
+                best = None
+                for child in _value_children(node):
+                    best = _best(best, self.value_taint(child, env))
+                return _guarded(best, name)
+            summary = self.summaries.get(name) if name else None
+            if summary is not None:
+                if summary.get('returns_source'):
+                    best = (summary['returns_source'], getattr(node, 'lineno', None), 0, None)
+                else:
+                    args = _args(node)
+                    best = None
+                    for i in summary.get('returns', []):
+                        if i < len(args):
+                            best = _best(best, self.value_taint(args[i], env))
+                return _guarded(best, summary.get('returns_guard'))
+        best = None
+        for child in _value_children(node):
+            best = _best(best, self.value_taint(child, env))
+        return best
+
+    def inspect_sink(self, node, env):
+        """
+        싱크로 나가는 식 -> (직접 소스 여부, (변수, taint 정보) 또는 None, 가드 이름 집합).
+        정화 함수/캐스트 안의 값은 보지 않는다.
+        """
+        state = {'direct': False, 'hit': None, 'guards': set()}
+
+        def visit(n):
+            if not isinstance(n, phpast.Node):
+                return
+            kind = _kind(n)
+            if _source_of(n) is not None:
+                state['direct'] = True
+            hit = state['hit']
+            if kind == 'Variable' and isinstance(n.name, str) and (hit is None or hit[1]['guards']):
+                t = env.get(n.name)
+                # 가드 없이 온 값을 가드를 거친 값보다 먼저 고른다.
+                if t is not None and (hit is None or t[3] is None):
+                    guards = tuple(sorted(t[3])) if t[3] else None
+                    state['hit'] = (n.name, {'source': t[0], 'line': t[1], 'hops': t[2], 'guards': guards})
+            if kind == 'Cast' and str(n.type).lower() in _CASTS:
+                return
+            if kind in ('FunctionCall', 'MethodCall', 'StaticMethodCall'):
+                name = _call_name(n)
+                if name in _SANITIZERS:
+                    return
+                if name in GUARD_CONTEXTS:
+                    state['guards'].add(name)
+            for child in _value_children(n):
+                visit(child)
+
+        visit(node)
+        return state['direct'], state['hit'], state['guards']
+
+    def add_site(self, line, exprs, env, context=None):
+        if not line:
+            return
+        direct, hit, guards = False, None, set()
+        for expr in exprs:
+            d, h, g = self.inspect_sink(expr, env)
+            direct = direct or d
+            hit = hit or h
+            guards |= g
+        if context is None:
+            context = detect_context_for_line(self.src, line)
+        if not guards and hit is not None and hit[1]['guards']:
+            # 싱크 식에 가드가 없으면 값이 대입될 때 거친 가드로 판정한다.
+            guards = set(hit[1]['guards'])
+        site = (line, context, direct, hit, _judge_guards(guards, context))
+        cur = self.sites.get(line)
+        # 같은 라인의 싱크가 여럿이면 더 위험한 쪽을 남긴다.
+        if cur is None or (direct, hit is not None) > (cur[2], cur[3] is not None):
+            self.sites[line] = site
+
+    def expr(self, node, env, line):
+        """식 안의 대입/싱크 호출을 처리한다."""
+        if not isinstance(node, phpast.Node):
+            return
+        kind = _kind(node)
+        line = getattr(node, 'lineno', None) or line
+        if kind in ('Function', 'Method', 'Class', 'Closure'):
+            self.stmt(node, env, line)
+            return
+        for child in _children(node):
+            self.expr(child, env, line)
+        if kind == 'Assignment':
+            var, strong = _base_var(node.node)
+            if var is not None:
+                self.assign(env, var, self.value_taint(node.expr, env), strong)
+        elif kind == 'AssignOp':
+            var, _ = _base_var(node.left)
+            if var is not None:
+                self.assign(env, var, self.value_taint(node.right, env), False)
+        elif kind == 'ListAssignment':
+            t = self.value_taint(node.expr, env)
+            for item in node.nodes:
+                var, strong = _base_var(item) if isinstance(item, phpast.Node) else (None, False)
+                if var is not None:
+                    self.assign(env, var, t, strong)
+        elif kind in ('FunctionCall', 'MethodCall', 'StaticMethodCall'):
+            name = _call_name(node)
+            args = _args(node)
+            if kind == 'FunctionCall' and name in _SINK_CALLS:
+                self.add_site(line, args, env)
+            summary = self.summaries.get(name) if name else None
+            for idx, context in (summary or {}).get('sinks', []):
+                if idx < len(args):
+                    direct, hit, _ = self.inspect_sink(args[idx], env)
+                    if direct or hit is not None:
+                        self.add_site(line, [args[idx]], env, context)
+
+    @staticmethod
+    def assign(env, var, taint, strong):
+        if taint is not None:
+            cur = env.get(var)
+            env[var] = taint if strong else _best(cur, taint)
+        elif strong:
+            env.pop(var, None)
+
+    # --- 문장 ---
+
+    def block(self, nodes, env, line):
+        for node in nodes or []:
+            env = self.stmt(node, env, line)
+        return env
+
+    def loop(self, body, env, line, before=None):
+        """반복문 본문: 환경이 더 바뀌지 않을 때까지(최대 _LOOP_ROUNDS) 돈다."""
+        for _ in range(_LOOP_ROUNDS):
+            if before is not None:
+                before(env)
+            out = _join(env, self.stmt(body, dict(env), line))
+            if out == env:
+                break
+            env = out
+        return env
+
+    def stmt(self, node, env, line):
+        """문장 하나를 처리하고 바뀐 환경을 돌려준다."""
+        if isinstance(node, list):
+            return self.block(node, env, line)
+        if not isinstance(node, phpast.Node):
+            return env
+        kind = _kind(node)
+        line = getattr(node, 'lineno', None) or line
+
+        if kind == 'Block':
+            return self.block(node.nodes, env, line)
+        if kind == 'Echo':
+            for expr in node.nodes:
+                self.expr(expr, env, line)
+            self.add_site(line, node.nodes, env)
+            return env
+        if kind == 'Print':
+            self.expr(node.node, env, line)
+            self.add_site(line, [node.node], env)
+            return env
+        if kind == 'If':
+            self.expr(node.expr, env, line)
+            outs = [self.stmt(node.node, dict(env), line)]
+            for elif_ in node.elseifs or []:
+                self.expr(elif_.expr, env, line)
+                outs.append(self.stmt(elif_.node, dict(env), line))
+            if node.else_ is not None:
+                outs.append(self.stmt(node.else_.node, dict(env), line))
+            else:
+                outs.append(env)
+            out = outs[0]
+            for o in outs[1:]:
+                out = _join(out, o)
+            return out
+        if kind in ('While', 'DoWhile'):
+            self.expr(node.expr, env, line)
+            return self.loop(node.node, env, line)
+        if kind == 'For':
+            for expr in node.start or []:
+                self.expr(expr, env, line)
+
+            def _step(e):
+                for expr in (node.test or []) + (node.count or []):
+                    self.expr(expr, e, line)
+            return self.loop(node.node, env, line, _step)
+        if kind == 'Foreach':
+            self.expr(node.expr, env, line)
+            taint = self.value_taint(node.expr, env)
+
+            def _bind(e):
+                for target in (node.keyvar, node.valvar):
+                    name = getattr(target, 'name', None)
+                    if isinstance(name, phpast.Node):
+                        name, _ = _base_var(name)
+                    if isinstance(name, str):
+                        self.assign(e, name, taint, True)
+            return self.loop(node.node, env, line, _bind)
+        if kind == 'Switch':
+            self.expr(node.expr, env, line)
+            out = dict(env)
+            cur = dict(env)
+            for case in node.nodes:
+                # fallthrough 를 고려해 앞 case 의 결과에 이어서 분석한다.
+                cur = self.block(case.nodes, _join(dict(env), cur), line)
+                out = _join(out, cur)
+            return out
+        if kind == 'Try':
+            out = self.block(node.nodes, dict(env), line)
+            for catch in node.catches or []:
+                out = _join(out, self.block(catch.nodes, _join(dict(env), out), line))
+            final = getattr(node, 'finally', None)
+            if final is not None:
+                out = self.stmt(final, out, line)
+            return out
+        if kind == 'Finally':
+            return self.block(node.nodes, env, line)
+        if kind == 'Declare':
+            return self.stmt(node.node, env, line)
+        if kind in ('Function', 'Method'):
+            # 함수 본문은 파라미터 외에는 빈 환경에서 시작한다.
+            self.block(node.nodes, {}, line)
+            return env
+        if kind == 'Closure':
+            inner = {}
+            for var in node.vars or []:
+                name = getattr(var, 'name', None)
+                if isinstance(name, str) and name in env:
+                    inner[name] = env[name]
+            self.block(node.nodes, inner, line)
+            return env
+        if kind in ('Class', 'Trait', 'Interface'):
+            for member in node.nodes or []:
+                self.stmt(member, {}, line)
+            return env
+        if kind == 'Namespace':
+            return self.block(node.nodes, env, line)
+        if kind in ('InlineHTML', 'Global', 'Static', 'Constant', 'ClassConstants', 'ClassVariables'):
+            return env
+        self.expr(node, env, line)
+        return env
+
+
+def _best(a, b):
+    """
+    두 taint (소스, 라인, hop, 가드) 의 합: hop 이 작은 쪽을 고르고, 가드는
+    어느 한쪽이라도 가드 없이(None) 왔으면 None, 아니면 합집합.
+    """
+    if a is None:
+        return b
+    if b is None:
+        return a
+    t = b if b[2] < a[2] else a
+    guards = None if a[3] is None or b[3] is None else a[3] | b[3]
+    return t if guards == t[3] else t[:3] + (guards,)
+
+
+def _guarded(t, guard):
+    """taint t 를 guard 로 감싼 값의 taint (guard 가 None 이면 그대로)."""
+    if t is None or guard is None:
+        return t
+    return t[:3] + (frozenset([guard]),)
+
+
+def scan_tree(file_path: str, content: str, tree, summaries=None, entry_taint=None) -> list:
+    """phply AST 로 파일 하나를 분석해 Finding 리스트를 돌려준다."""
+    src = MaskedSource(content)
+    walker = _Walker(src, summaries)
+    env = {var: (t[0], t[1], t[2], None) for var, t in (entry_taint or {}).items()}
+    walker.block(tree, env, 1)
+    sites = [walker.sites[ln] for ln in sorted(walker.sites)]
+    return findings_from_sites(file_path, sites, FileFacts(src))
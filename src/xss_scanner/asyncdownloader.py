@@ -0,0 +1,413 @@
+"""
+asyncio 기반 플러그인 다운로드 엔진(download --engine async).
+
+downloader 의 스레드 엔진은 키워드마다 스레드 풀을 중첩해 만들고, 하나의
+requests.Session 을 스레드끼리 나눠 쓰며, 스레드 풀 크기(3)에 묶여
+처리량이 초당 몇 개에 그친다. 이 엔진은
+
+- aiohttp ClientSession 하나(연결 풀 공유)로 모든 요청을 보내고,
+- 전체 동시 연결 수(concurrency)와 호스트별 동시 연결 수(per_host)를
+  TCPConnector 로 제한하며,
+- zip 은 청크 단위로 .part 파일에 쓰고(끊기면 Range 로 이어받는다),
+  크기와 CRC 를 확인한 뒤 os.replace 로 옮긴다.
+
+플러그인 검색은 스레드 엔진처럼 plugins info API(query_plugins)를 먼저
+쓰고, 첫 페이지부터 쓸 수 없으면 검색 페이지 스크래핑으로 대체한다.
+검색/상세 페이지 파싱과 압축해제는 downloader 의 함수를 그대로 쓰고,
+압축해제처럼 블로킹인 작업은 기본 스레드 풀에서 돌린다.
+요청 속도는 스레드 엔진처럼 적응형 속도 제한기(ratelimit)가 정한다.
+429/503 은 속도를 줄여 다시 보내고, 그 밖의 5xx 와 연결 오류는 스레드
+엔진(urllib3 Retry)과 같은 지수 백오프로 재시도한다.
+"""
+
+import asyncio
+import os
+import shutil
+import time
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp 가 없으면 --engine async 를 쓸 수 없다.
+    aiohttp = None
+
+from . import downloader
+from .downloader import (
+    API_PER_PAGE,
+    API_URL,
+    MAX_SEARCH_PAGES,
+    RESET,
+    SEARCH_URL,
+    USER_AGENT,
+    PluginApiError,
+    colors,
+    ensure_directory,
+    find_download_link,
+    finish_zip,
+    get_existing_folders,
+    parse_query_plugins,
+    parse_search_links,
+    plugin_file_names,
+    print_keywords,
+    query_plugins_params,
+)
+from .manifest import PluginManifest, plugin_slug, plugin_version
+from .ratelimit import (
+    INITIAL_RATE,
+    MAX_RATE,
+    THROTTLE_STATUSES,
+    AdaptiveRateLimiter,
+    parse_retry_after,
+)
+from .resume import RESUME_ATTEMPTS, IncompleteDownload, PartFile
+
+DOWNLOAD_ENGINES = ('threads', 'async')
+# 전체 / 호스트별 동시 연결 수 기본값
+DOWNLOAD_CONCURRENCY = 16
+DOWNLOAD_PER_HOST = 8
+CHUNK_SIZE = 256 * 1024
+# 재시도 (스레드 엔진의 Retry(total=5, backoff_factor=1, ...) 와 같은 규칙).
+# THROTTLE_STATUSES(429/503)는 속도 제한기가 따로 처리한다.
+RETRY_STATUSES = (500, 502, 504)
+MAX_RETRIES = 5
+BACKOFF_FACTOR = 1.0
+# 연결 / 소켓 읽기 시간 제한(초)
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 30
+
+
+def aiohttp_available() -> bool:
+    return aiohttp is not None
+
+
+class AsyncDownloader:
+    """
+    키워드 목록 -> 검색 페이지 -> 상세 페이지 -> zip 을 하나의 이벤트 루프에서
+    받는 다운로더. 키워드끼리, 그리고 한 페이지의 플러그인끼리 동시에 받는다.
+    """
+
+    def __init__(
+        self,
+        dest_dir: str = None,
+        concurrency: int = DOWNLOAD_CONCURRENCY,
+        per_host: int = DOWNLOAD_PER_HOST,
+        search_url: str = SEARCH_URL,
+        max_pages: int = MAX_SEARCH_PAGES,
+        discovery: str = 'api',
+        api_url: str = API_URL,
+        rate: float = INITIAL_RATE,
+        max_rate: float = MAX_RATE,
+        update: bool = False,
+    ):
+        self.dest_dir = dest_dir or downloader.save_dir
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.search_url = search_url
+        self.max_pages = max_pages
+        self.discovery = discovery
+        self.api_url = api_url
+        self.limiter = AdaptiveRateLimiter(rate, max_rate)
+        self.manifest = PluginManifest(self.dest_dir, update=update)
+        self.existing = set()
+        self.stats = {'downloaded': 0, 'skipped': 0, 'unchanged': 0, 'failed': 0, 'bytes': 0}
+
+    async def _request(self, session, url: str, handler, params=None, headers=None, retry_body: bool = True):
+        """
+        속도 제한기 토큰을 얻어 GET url 을 재시도 규칙대로 보내고
+        handler(resp) 결과를 돌려준다.
+        retry_body 가 False 이면 handler 가 본문을 읽다 난 연결 오류/시간 초과는
+        다시 보내지 않고 그대로 올린다(.part 에 이어 쓰는 _stream_to 는 받은
+        크기로 Range 를 다시 만들어야 한다).
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            await self.limiter.acquire_async()
+            in_body = False
+            try:
+                async with session.get(url, params=params, headers=headers) as resp:
+                    if resp.status in THROTTLE_STATUSES:
+                        self.limiter.on_throttle(parse_retry_after(resp.headers.get('Retry-After')))
+                        print(f"[rate] HTTP {resp.status} from {url}: slowing down to {self.limiter.describe()}")
+                        if attempt < MAX_RETRIES:
+                            continue
+                    elif resp.status in RETRY_STATUSES and attempt < MAX_RETRIES:
+                        await asyncio.sleep(BACKOFF_FACTOR * (2 ** attempt))
+                        continue
+                    resp.raise_for_status()
+                    self.limiter.on_success()
+                    in_body = True
+                    return await handler(resp)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= MAX_RETRIES or (in_body and not retry_body):
+                    raise
+                await asyncio.sleep(BACKOFF_FACTOR * (2 ** attempt))
+
+    async def _fetch(self, session, url: str) -> bytes:
+        async def _read(resp):
+            return await resp.read()
+
+        return await self._request(session, url, _read)
+
+    async def _query_plugins(self, session, keyword: str, page: int, per_page: int):
+        """plugins info API 검색 한 페이지. 실패하면 PluginApiError."""
+
+        async def _json(resp):
+            return await resp.json(content_type=None)
+
+        try:
+            data = await self._request(session, self.api_url, _json, query_plugins_params(keyword, page, per_page))
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            raise PluginApiError(str(e))
+        return parse_query_plugins(data)
+
+    async def _stream_to(self, session, url: str, part: PartFile, headers=None):
+        """
+        url 응답 본문을 청크 단위로 part(.part 파일)에 쓴다. 연결이 끊기면
+        받은 데까지 남겨 두고 Range 로 이어받는다(RESUME_ATTEMPTS 번까지).
+        -> 이번에 받은 바이트 수. 304 이면 None.
+        """
+        received = 0
+
+        async def _write(resp):
+            nonlocal received
+            if resp.status == 304:
+                return False
+            with part.begin(resp.status, resp.headers) as f:
+                async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                    f.write(chunk)
+                    received += len(chunk)
+            return True
+
+        for attempt in range(RESUME_ATTEMPTS):
+            if part.complete:
+                return received
+            req_headers = dict(headers or {})
+            req_headers.update(part.request_headers())
+            try:
+                if not await self._request(session, url, _write, headers=req_headers, retry_body=False):
+                    return None
+                part.check_size()
+                return received
+            except aiohttp.ClientResponseError as e:
+                if e.status != 416:
+                    raise
+                # 남은 .part 가 서버 파일과 맞지 않는다: 처음부터 다시 받는다.
+                part.discard()
+            except (aiohttp.ClientPayloadError, aiohttp.ClientConnectionError, asyncio.TimeoutError,
+                    IncompleteDownload) as e:
+                part.refresh()
+                if attempt + 1 >= RESUME_ATTEMPTS:
+                    raise
+                print(f"[resume] {url}: {e!r} (resuming at {part.offset} bytes)")
+        raise IncompleteDownload(f"range not satisfiable: {url}")
+
+    async def download_plugin(self, session, link: str) -> int:
+        """상세 페이지 링크 하나 -> zip 링크를 찾아 download_zip."""
+        try:
+            page = await self._fetch(session, link)
+        except Exception as e:
+            print(f"Error fetching plugin page {link}: {e}")
+            self.stats['failed'] += 1
+            return 0
+
+        download_link = find_download_link(page)
+        if not download_link:
+            print(f"Download link not found for {link}")
+            self.stats['failed'] += 1
+            return 0
+        return await self.download_zip(session, download_link)
+
+    async def download_zip(self, session, download_link: str, version=None) -> int:
+        """
+        zip 링크 하나 -> 다운로드 & 압축해제. 받았으면 1.
+        update 모드이면 스레드 엔진(downloader.download_zip)처럼 버전 비교 /
+        조건부 GET 으로 바뀐 것만 받고, 최신이라 건너뛴 것도 1 로 센다.
+        """
+        manifest = self.manifest
+        file_name, folder_name = plugin_file_names(download_link)
+        slug = plugin_slug(file_name)
+        version = version or plugin_version(file_name)
+        headers = {}
+        old_folder = None
+        # 이벤트 루프는 스레드 하나이므로 확인과 등록 사이에 끼어들 작업이 없다.
+        if manifest.update:
+            if not manifest.claim(slug):
+                return 0
+            if manifest.is_current(slug, folder_name, version, self.existing):
+                print(f"Up to date: {slug} {version}")
+                manifest.mark_unchanged()
+                self.stats['unchanged'] += 1
+                return 1
+            old_folder = manifest.installed_folder(slug, self.existing)
+            if old_folder:
+                headers = manifest.request_headers(slug, download_link)
+        else:
+            if folder_name in self.existing:
+                print(f"Skipping {folder_name} as it already exists.")
+                self.stats['skipped'] += 1
+                return 0
+            self.existing.add(folder_name)
+
+        final_path = os.path.join(self.dest_dir, file_name)
+        temp_path = final_path + downloader._tmp_suffix
+        extract_dir = os.path.join(self.dest_dir, folder_name)
+        loop = asyncio.get_running_loop()
+        part = PartFile(temp_path, download_link)
+        try:
+            size = await self._stream_to(session, download_link, part, headers)
+            if size is None:
+                print(f"Not modified: {slug}")
+                part.discard()
+                manifest.mark_unchanged()
+                self.stats['unchanged'] += 1
+                return 1
+            sha256 = await loop.run_in_executor(None, part.verify)
+            validators = part.validators()
+            if old_folder and manifest.same_content(slug, sha256):
+                part.discard()
+                manifest.record_download(slug, old_folder, version, download_link, validators, sha256)
+                print(f"Unchanged: {slug}")
+                manifest.mark_unchanged()
+                self.stats['unchanged'] += 1
+                return 1
+            part.finish(final_path)
+        except Exception as e:
+            kept = f" (kept {part.offset} bytes in {os.path.basename(temp_path)} to resume)" if part.offset else ""
+            print(f"Error downloading plugin from {download_link}: {e}{kept}")
+            if manifest.update:
+                manifest.release(slug)
+            else:
+                self.existing.discard(folder_name)
+            self.stats['failed'] += 1
+            return 0
+        print('Downloaded:', file_name)
+        self.stats['downloaded'] += 1
+        self.stats['bytes'] += size
+
+        if not await loop.run_in_executor(None, finish_zip, final_path, extract_dir):
+            if manifest.update:
+                manifest.release(slug)
+            else:
+                self.existing.discard(folder_name)
+            self.stats['failed'] += 1
+            return 0
+        if old_folder and old_folder != folder_name:
+            # 버전이 이름에 들어간 옛 폴더(slug.1.0 -> slug.1.1)
+            await loop.run_in_executor(
+                None, shutil.rmtree, os.path.join(self.dest_dir, old_folder), True
+            )
+        manifest.record_download(slug, folder_name, version, download_link, validators, sha256)
+        if manifest.update:
+            manifest.mark_changed(slug)
+        return 1
+
+    async def _download_from_api(self, session, target: str, color_code: str, max_plugins=None) -> bool:
+        """
+        키워드 하나를 plugins info API 로 검색해 받는다(상세 페이지를 열지 않는다).
+        첫 페이지부터 API 를 쓸 수 없으면 False.
+        """
+        per_page = min(API_PER_PAGE, max_plugins) if max_plugins else API_PER_PAGE
+        count = 0
+        for page in range(1, self.max_pages + 1):
+            try:
+                plugins, pages = await self._query_plugins(session, target, page, per_page)
+            except PluginApiError as e:
+                if page == 1:
+                    print(f"[warn] plugins API 를 쓸 수 없어 HTML 검색으로 전환합니다 ({target}): {e}")
+                    return False
+                print(f"Error querying plugins API page {page} for {target}: {e}")
+                break
+            plugins = [p for p in plugins if p['download_link']]
+            if max_plugins:
+                plugins = plugins[:max_plugins - count]
+            if not plugins:
+                break
+            results = await asyncio.gather(*(
+                self.download_zip(session, p['download_link'], p['version']) for p in plugins
+            ))
+            count += sum(results)
+            print(f'{color_code}Downloaded {len(plugins)} plugins from API page {page} for {target}. ({self.limiter.describe()}){RESET}')
+            if (max_plugins and count >= max_plugins) or page >= pages:
+                break
+        return True
+
+    async def download_target(self, session, target: str, color_code: str, max_plugins=None):
+        """
+        키워드 하나: API(discovery='api')로 찾거나, 검색 페이지를 차례로 넘기며
+        페이지의 플러그인을 동시에 받는다.
+        """
+        if self.discovery == 'api' and await self._download_from_api(session, target, color_code, max_plugins):
+            return
+        count = 0
+        for page in range(1, self.max_pages + 1):
+            url = self.search_url.format(target=target, page=page)
+            try:
+                links = parse_search_links(await self._fetch(session, url))
+            except Exception as e:
+                print(f"Error fetching search page {url}: {e}")
+                break
+            if max_plugins:
+                links = links[:max_plugins - count]
+            if not links:
+                break
+            results = await asyncio.gather(*(self.download_plugin(session, link) for link in links))
+            count += sum(results)
+            print(f'{color_code}Downloaded {len(links)} plugins from page {page} for {target}. ({self.limiter.describe()}){RESET}')
+            if max_plugins and count >= max_plugins:
+                break
+
+    async def run(self, keywords, max_plugins=None) -> dict:
+        ensure_directory(self.dest_dir)
+        self.existing = set(get_existing_folders(self.dest_dir))
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host)
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT)
+        async with aiohttp.ClientSession(
+            connector=connector, headers={'User-Agent': USER_AGENT}, timeout=timeout
+        ) as session:
+            await asyncio.gather(*(
+                self.download_target(session, t, colors[i % len(colors)], max_plugins)
+                for i, t in enumerate(keywords)
+            ))
+        self.manifest.save()
+        return self.stats
+
+
+def download_plugins_async(
+    keywords,
+    max_plugins=None,
+    concurrency: int = DOWNLOAD_CONCURRENCY,
+    per_host: int = DOWNLOAD_PER_HOST,
+    dest_dir: str = None,
+    search_url: str = SEARCH_URL,
+    discovery: str = 'api',
+    api_url: str = API_URL,
+    rate: float = INITIAL_RATE,
+    max_rate: float = MAX_RATE,
+    update: bool = False,
+    changed_out: str = None,
+) -> dict:
+    """
+    download_plugins_for_keywords 의 asyncio 버전.
+    max_plugins 는 스레드 엔진처럼 키워드당 개수다. 다운로드 통계를 돌려준다
+    (update 모드이면 stats['changed'] 에 바뀐 slug 목록).
+    """
+    if aiohttp is None:
+        raise RuntimeError("--engine async 에는 aiohttp 가 필요합니다 (pip install aiohttp)")
+    print_keywords(keywords)
+    started = time.monotonic()
+    dl = AsyncDownloader(dest_dir, concurrency=concurrency, per_host=per_host, search_url=search_url,
+                         discovery=discovery, api_url=api_url, rate=rate, max_rate=max_rate, update=update)
+    stats = asyncio.run(dl.run(keywords, max_plugins))
+    elapsed = time.monotonic() - started
+    throughput = stats['downloaded'] / elapsed if elapsed > 0 else 0.0
+    print(
+        f"[async] downloaded={stats['downloaded']}, skipped={stats['skipped']}, "
+        f"unchanged={stats['unchanged']}, failed={stats['failed']}, "
+        f"{stats['bytes'] / (1024 * 1024):.1f} MB in {elapsed:.1f}s ({throughput:.1f} plugins/s)"
+    )
+    print(
+        f"[rate] requests={dl.limiter.requests}, throttled={dl.limiter.throttled}, "
+        f"final rate {dl.limiter.describe()}"
+    )
+    if update:
+        dl.manifest.report(changed_out)
+        stats['changed'] = sorted(dl.manifest.changed)
+    return stats
@@ -0,0 +1,209 @@
+"""
+파일 내용 해시 기반의 영구 스캔 결과 캐시 모듈.
+
+SQLite 파일 하나(기본: reports/.scan_cache.sqlite3)에
+- file_meta : 경로 -> (size, mtime_ns, sha256)   (해시 생략용 사전 검사)
+- findings  : (sha256, 규칙 버전, 종류) -> scan_file_for_xss 결과(Finding 레코드 JSON)
+              (종류 = 확장자 + 스캔 옵션 해시)
+- summaries : (sha256, 규칙 버전) -> 파일의 함수 지역 요약(interproc.summarize_file)
+- exports   : (sha256, 진입 키, 규칙 버전) -> include 지점별 taint(includes.include_exports)
+를 저장한다.
+
+규칙 버전은 패키지 버전과 분석 규칙 모듈(patterns.py 등)의 소스 내용으로
+계산하므로, 규칙을 수정하면 예전 결과는 자동으로 무효화된다.
+스캔 옵션(--engine, 파일 크기 정책)은 규칙 버전이 아니라 findings 의
+종류에 붙이므로, 옵션을 바꿔 가며 실행해도 서로의 결과를 지우지 않는다.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+
+from .__version__ import __version__
+from .findings import Finding
+
+CACHE_FILENAME = ".scan_cache.sqlite3"
+
+# 이 모듈들의 내용이 바뀌면 분석 결과도 바뀔 수 있다.
+RULE_MODULES = (
+    "patterns.py",
+    "analyzer.py",
+    "lexer.py",
+    "ahocorasick.py",
+    "findings.py",
+    "dataflow.py",
+    "interproc.py",
+    "includes.py",
+    "astengine.py",
+    "jslexer.py",
+    "jsanalyzer.py",
+)
+
+
+def compute_rules_version() -> str:
+    """패키지 버전 + 규칙/분석 모듈 소스의 해시."""
+    h = hashlib.sha256(__version__.encode("utf-8"))
+    base = os.path.dirname(os.path.abspath(__file__))
+    for name in RULE_MODULES:
+        h.update(name.encode("utf-8"))
+        try:
+            with open(os.path.join(base, name), "rb") as f:
+                h.update(f.read())
+        except OSError:
+            pass
+    return h.hexdigest()[:16]
+
+
+RULES_VERSION = compute_rules_version()
+
+
+def options_key(options=None) -> str:
+    """
+    결과에 영향을 주는 스캔 옵션(파일 크기 정책 등)의 해시. findings 의
+    종류(kind) 뒤에 붙인다. 옵션이 기본값(None)이면 빈 문자열.
+    """
+    if not options:
+        return ""
+    h = hashlib.sha256(repr(options).encode("utf-8"))
+    return f"~{h.hexdigest()[:8]}"
+
+
+def hash_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def file_kind(path: str) -> str:
+    """분석 방식이 확장자에 따라 달라지므로 캐시 키에 포함한다."""
+    return os.path.splitext(path)[1].lower()
+
+
+class ScanCache:
+    """
+    (내용 해시, 규칙 버전) -> 파일 단위 스캔 결과 캐시.
+
+    결과에는 파일 경로를 저장하지 않고, 꺼낼 때 요청한 경로를 채워 넣는다.
+    options 는 이번 실행의 스캔 옵션(options_key 참고)이며, findings 는
+    옵션마다 따로 저장된다. 함수 요약/include taint 는 옵션과 무관하다.
+    """
+
+    def __init__(self, path: str, rules_version: str = RULES_VERSION, options=None):
+        self.path = path
+        self.rules_version = rules_version
+        self.options = options_key(options)
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS file_meta ("
+            " path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, digest TEXT)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS findings ("
+            " digest TEXT, rules_version TEXT, kind TEXT, payload TEXT,"
+            " PRIMARY KEY (digest, rules_version, kind))"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            " digest TEXT, rules_version TEXT, payload TEXT,"
+            " PRIMARY KEY (digest, rules_version))"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS exports ("
+            " digest TEXT, entry TEXT, rules_version TEXT, payload TEXT,"
+            " PRIMARY KEY (digest, entry, rules_version))"
+        )
+        # 규칙 버전이 다른 결과는 더 이상 쓰이지 않으므로 정리
+        # (다른 스캔 옵션의 결과는 규칙 버전이 같으면 남겨 둔다)
+        self.conn.execute("DELETE FROM findings WHERE rules_version != ?", (rules_version,))
+        self.conn.execute("DELETE FROM summaries WHERE rules_version != ?", (rules_version,))
+        self.conn.execute("DELETE FROM exports WHERE rules_version != ?", (rules_version,))
+        self.conn.commit()
+        self.stats = {"hits": 0, "misses": 0, "hashed": 0, "meta_hits": 0}
+
+    def digest_for(self, path: str) -> str:
+        """
+        파일의 sha256. (size, mtime_ns) 가 지난번과 같으면 해시를 다시
+        계산하지 않고 저장된 값을 쓴다.
+        """
+        key = os.path.abspath(path)
+        st = os.stat(path)
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, digest FROM file_meta WHERE path = ?", (key,)
+        ).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            self.stats["meta_hits"] += 1
+            return row[2]
+
+        digest = hash_file(path)
+        self.stats["hashed"] += 1
+        self.conn.execute(
+            "INSERT OR REPLACE INTO file_meta (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+            (key, st.st_size, st.st_mtime_ns, digest),
+        )
+        return digest
+
+    def get(self, digest: str, kind: str, file_path: str):
+        """캐시된 Finding 리스트(경로를 file_path 로 채움) 또는 None."""
+        row = self.conn.execute(
+            "SELECT payload FROM findings WHERE digest = ? AND rules_version = ? AND kind = ?",
+            (digest, self.rules_version, kind + self.options),
+        ).fetchone()
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return [Finding.from_record(file_path, rec) for rec in json.loads(row[0])]
+
+    def put(self, digest: str, kind: str, vulns):
+        payload = json.dumps([v.to_record() for v in vulns], ensure_ascii=False)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO findings (digest, rules_version, kind, payload) VALUES (?, ?, ?, ?)",
+            (digest, self.rules_version, kind + self.options, payload),
+        )
+
+    def get_summary(self, digest: str):
+        """캐시된 함수 지역 요약 레코드 또는 None."""
+        row = self.conn.execute(
+            "SELECT payload FROM summaries WHERE digest = ? AND rules_version = ?",
+            (digest, self.rules_version),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_summary(self, digest: str, record: dict):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO summaries (digest, rules_version, payload) VALUES (?, ?, ?)",
+            (digest, self.rules_version, json.dumps(record, ensure_ascii=False)),
+        )
+
+    def get_export(self, digest: str, entry: str):
+        """캐시된 include 지점별 taint(진입 키 entry 기준) 또는 None."""
+        row = self.conn.execute(
+            "SELECT payload FROM exports WHERE digest = ? AND entry = ? AND rules_version = ?",
+            (digest, entry, self.rules_version),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_export(self, digest: str, entry: str, exports: dict):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO exports (digest, entry, rules_version, payload) VALUES (?, ?, ?, ?)",
+            (digest, entry, self.rules_version, json.dumps(exports, ensure_ascii=False)),
+        )
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def summary(self) -> str:
+        s = self.stats
+        return (
+            f"cache hits={s['hits']}, misses={s['misses']}, "
+            f"hashed={s['hashed']}, unchanged(size/mtime)={s['meta_hits']}"
+        )
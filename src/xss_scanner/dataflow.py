@@ -0,0 +1,1037 @@
+"""
+토큰 스트림 위의 함수 내(intraprocedural) taint 데이터플로 분석 모듈.
+
+1. 토큰을 문장(statement) 단위로 나누고 if / while / for / foreach /
+   do-while / switch / try 구조와 break / continue / return 을 따라
+   기본 블록(basic block) 그래프를 만든다. 반복문에는 back edge 가 생긴다.
+   이름 있는 함수/메서드와 익명 함수(function () {...}, fn () => ...)
+   본문은 별도의 진입 블록(빈 상태)에서 시작한다. 익명 함수 본문 토큰은
+   scope 수준이 하나 깊어, 둘러싼 문장의 효과/라인 상태에서 빠진다.
+2. 문장마다 할당 효과(assign / append / sanitize)를 한 번만 미리 계산한다.
+3. worklist 로 고정점에 도달할 때까지 블록 상태를 전파한다.
+
+상태는 hop 수준별 비트셋(정수) 리스트다. 변수마다 정수 ID 를 주고,
+levels[h] 의 비트 i 는 "변수 i 가 h hop 만에 입력 소스에서 왔다"는 뜻이다.
+변수는 항상 가장 작은 hop 수준 하나에만 남긴다(join = hop 최솟값).
+taint 의 출처(소스 문자열, 라인)는 (변수, hop) 별 보조 테이블에 둔다.
+
+hop 수준 뒤에는 tainted 값이 어떤 출력 가드를 거쳤는지 나타내는 비트셋이
+더 붙는다. raw 슬롯은 "가드 없이 온 값일 수 있다", 가드 슬롯 g 는 "가드
+g(esc_html 등)로 감싼 값일 수 있다"는 뜻이다. 가드는 출력 컨텍스트에
+따라 안전 여부가 달라서 taint 를 지우지 않고, 싱크에서 lookup 이 돌려준
+guards 로 컨텍스트 판정(analyzer._judge_guards)을 한다.
+"""
+
+import re
+from bisect import bisect_right
+from collections import deque
+
+from .lexer import (
+    T_CLOSE_TAG,
+    T_IDENT,
+    T_OP,
+    T_OPEN_TAG,
+    T_OPEN_TAG_WITH_ECHO,
+    T_VARIABLE,
+    MASKED_KINDS,
+)
+from .patterns import GUARD_CONTEXTS, SANITIZER_CASTS, SANITIZER_FUNCS, SOURCE_PATTERNS, SOURCE_RE
+
+_SOURCE_RES = [(sp, re.compile(sp, re.IGNORECASE)) for sp in SOURCE_PATTERNS]
+_SANITIZERS = frozenset(f.lower() for f in SANITIZER_FUNCS)
+_CASTS = frozenset(SANITIZER_CASTS)
+# 가드 슬롯 순서
+GUARD_NAMES = tuple(sorted(GUARD_CONTEXTS))
+_GUARD_IDS = {g: i for i, g in enumerate(GUARD_NAMES)}
+
+_OPEN = {'(': ')', '[': ']', '{': '}'}
+_CLOSE = frozenset(_OPEN.values())
+_TAGS = (T_CLOSE_TAG, T_OPEN_TAG, T_OPEN_TAG_WITH_ECHO)
+
+# 선언 앞에 올 수 있는 수식어
+_MODIFIERS = frozenset(
+    ['public', 'private', 'protected', 'static', 'abstract', 'final', 'readonly', 'var']
+)
+_CLASS_KEYWORDS = frozenset(['class', 'interface', 'trait', 'enum'])
+_CLOSURE_KEYWORDS = frozenset(['function', 'fn'])
+# 앞에 오면 function / fn 이 메서드/상수 이름인 연산자
+_MEMBER_OPS = frozenset(['->', '?->', '::'])
+_TERMINATORS = frozenset(['return', 'exit', 'die', 'throw'])
+
+# 할당 효과 종류
+ASSIGN = 0    # $x = rhs        (강한 갱신)
+APPEND = 1    # $x .= rhs, $x[..] = rhs  (약한 갱신)
+SANITIZE = 2  # $x = intval(..) 등 (taint 제거)
+# $x = esc_html(..) 등 가드 호출은 ASSIGN 에 가드를 붙인 효과다.
+
+
+def match_brackets(tokens):
+    """각 여는/닫는 괄호 토큰의 짝 인덱스(짝이 없으면 -1)."""
+    match = [-1] * len(tokens)
+    stack = []
+    for i, tok in enumerate(tokens):
+        if tok.kind != T_OP:
+            continue
+        t = tok.text
+        if t in _OPEN:
+            stack.append(i)
+        elif t in _CLOSE:
+            # 짝이 맞는 여는 괄호까지 되감는다(깨진 코드 방어)
+            while stack and _OPEN[tokens[stack[-1]].text] != t:
+                stack.pop()
+            if stack:
+                j = stack.pop()
+                match[i] = j
+                match[j] = i
+    return match
+
+
+def split_call_args(tokens, open_idx: int, match):
+    """
+    tokens[open_idx] 의 '(' 로 시작하는 호출 인자 목록 -> [(시작, 끝), ...].
+    괄호 안 최상위 ',' 로 나눈다.
+    """
+    close = match[open_idx]
+    if close < 0:
+        return []
+    args = []
+    start = k = open_idx + 1
+    while k < close:
+        tok = tokens[k]
+        if tok.kind == T_OP:
+            if tok.text in _OPEN and match[k] > k:
+                k = match[k]
+            elif tok.text == ',':
+                args.append((start, k))
+                start = k + 1
+        k += 1
+    if start < close or args:
+        args.append((start, close))
+    return args
+
+
+def guard_call(tokens, a: int, b: int, match):
+    """식 tokens[a:b] 전체가 출력 가드 한 번의 호출이면 그 가드 이름(아니면 None)."""
+    if (
+        b - a >= 3
+        and tokens[a].kind == T_IDENT and tokens[a + 1].kind == T_OP and tokens[a + 1].text == '('
+        and match[a + 1] == b - 1
+    ):
+        name = tokens[a].text.lower()
+        if name in _GUARD_IDS:
+            return name
+    return None
+
+
+def is_sanitizing_expr(tokens, a: int, b: int, match) -> bool:
+    """식 tokens[a:b] 전체가 정화 함수 한 번의 호출이거나 숫자/불리언 캐스트인지."""
+    if (
+        b - a >= 3
+        and tokens[a].kind == T_IDENT and tokens[a + 1].kind == T_OP and tokens[a + 1].text == '('
+        and match[a + 1] == b - 1
+    ):
+        return tokens[a].text.lower() in _SANITIZERS
+    return (
+        b - a >= 4
+        and tokens[a].kind == T_OP and tokens[a].text == '('
+        and tokens[a + 1].kind == T_IDENT and tokens[a + 1].text.lower() in _CASTS
+        and tokens[a + 2].kind == T_OP and tokens[a + 2].text == ')'
+    )
+
+
+class _Effect:
+    __slots__ = ('kind', 'left', 'source', 'rhs_mask', 'line', 'guard')
+
+    def __init__(self, kind, left, source, rhs_mask, line, guard=None):
+        self.kind = kind
+        self.left = left
+        self.source = source
+        self.rhs_mask = rhs_mask
+        self.line = line
+        self.guard = guard   # 우변을 감싼 가드의 슬롯 번호(GUARD_NAMES 순서) 또는 None
+
+
+class _CFGBuilder:
+    """토큰 리스트에서 기본 블록 그래프를 만든다."""
+
+    def __init__(self, tokens):
+        self.toks = tokens
+        self.match = match_brackets(tokens)
+        self.blocks = []   # 블록 -> 문장 리스트 [(시작, 끝), ...]
+        self.succ = []
+        self.jumps = []    # (continue 대상, break 대상, switch 헤드 또는 None)
+        # 토큰별 익명 함수 중첩 수준(본문 안이면 1 이상)
+        self.scope = [0] * len(tokens)
+
+    # --- 그래프 ---
+
+    def new_block(self) -> int:
+        self.blocks.append([])
+        self.succ.append([])
+        return len(self.blocks) - 1
+
+    def edge(self, a: int, b: int):
+        if b not in self.succ[a]:
+            self.succ[a].append(b)
+
+    def add_stmt(self, blk: int, i: int, j: int, kind: str = 'stmt'):
+        if i < j:
+            self.blocks[blk].append((i, j, kind))
+            self._closures(i, j)
+
+    # --- 토큰 도우미 ---
+
+    def word(self, i: int):
+        if i < len(self.toks) and self.toks[i].kind == T_IDENT:
+            return self.toks[i].text.lower()
+        return None
+
+    def is_op(self, i: int, text: str) -> bool:
+        return i < len(self.toks) and self.toks[i].kind == T_OP and self.toks[i].text == text
+
+    def close_of(self, i: int, end: int) -> int:
+        """i 의 여는 괄호와 짝인 닫는 괄호(없으면 end)."""
+        j = self.match[i] if i < len(self.toks) else -1
+        return j if 0 <= j < end else end
+
+    def skip_terminator(self, i: int, end: int) -> int:
+        if i < end and (self.is_op(i, ';') or self.toks[i].kind == T_CLOSE_TAG):
+            return i + 1
+        return i
+
+    def stmt_end(self, i: int, end: int) -> int:
+        """i 에서 시작한 일반 문장의 끝(다음 문장 시작 인덱스)."""
+        toks = self.toks
+        k = i
+        while k < end:
+            tok = toks[k]
+            if tok.kind == T_OP:
+                t = tok.text
+                if t in _OPEN:
+                    k = self.close_of(k, end) + 1
+                    continue
+                if t == ';':
+                    return k + 1
+                if t in _CLOSE:
+                    return k
+            elif tok.kind == T_CLOSE_TAG:
+                return k + 1
+            k += 1
+        return end
+
+    # --- 문장 ---
+
+    def parse_list(self, i: int, end: int, cur: int, stop=frozenset()):
+        while i < end:
+            if self.word(i) in stop:
+                break
+            nxt, cur = self.parse_stmt(i, end, cur)
+            i = max(nxt, i + 1)
+        return i, cur
+
+    def parse_body(self, i: int, end: int, cur: int, stop):
+        """제어 구조 본문: `: ... endXXX;` 대체 문법이면 stop 단어까지, 아니면 문장 하나."""
+        if self.is_op(i, ':'):
+            i, cur = self.parse_list(i + 1, end, cur, stop)
+            if self.word(i) in stop and self.word(i).startswith('end'):
+                i = self.skip_terminator(i + 1, end)
+            return i, cur
+        return self.parse_stmt(i, end, cur)
+
+    def parse_stmt(self, i: int, end: int, cur: int):
+        if i >= end:
+            # 본문 없이 끝난 제어 구조 헤더(`while ($a)` 가 파일 끝)
+            return i, cur
+        tok = self.toks[i]
+        if tok.kind in (T_OPEN_TAG, T_CLOSE_TAG):
+            return i + 1, cur
+        if tok.kind == T_OP:
+            if tok.text == ';' or tok.text in _CLOSE:
+                return i + 1, cur
+            if tok.text == '{':
+                j = self.close_of(i, end)
+                _, cur = self.parse_list(i + 1, j, cur)
+                return j + 1, cur
+
+        w = self.word(i)
+        if w is not None:
+            handler = getattr(self, '_kw_' + w, None)
+            if handler is not None:
+                return handler(i, end, cur)
+            k = i
+            while self.word(k) in _MODIFIERS:
+                k += 1
+            w2 = self.word(k)
+            if w2 == 'function' and (self.word(k + 1) is not None or self.is_op(k + 1, '&')):
+                return self._function_decl(k, end, cur)
+            if w2 in _CLASS_KEYWORDS and self.word(k + 1) is not None:
+                return self._class_decl(k, end, cur)
+
+        j = self.stmt_end(i, end)
+        self.add_stmt(cur, i, j)
+        if w in _TERMINATORS:
+            cur = self.new_block()
+        return j, cur
+
+    def _cond(self, i: int, end: int, blk: int):
+        """i 가 '(' 이면 괄호 안을 blk 의 문장으로 넣고 닫는 괄호 다음 인덱스를 돌려준다."""
+        if not self.is_op(i, '('):
+            return i
+        j = self.close_of(i, end)
+        self.add_stmt(blk, i + 1, j)
+        return j + 1
+
+    def _kw_if(self, i: int, end: int, cur: int):
+        cond_blk = self.new_block()
+        self.edge(cur, cond_blk)
+        k = self._cond(i + 1, end, cond_blk)
+        exits = []
+        alt = self.is_op(k, ':')
+        stop = frozenset(['elseif', 'else', 'endif'])
+        while True:
+            then_blk = self.new_block()
+            self.edge(cond_blk, then_blk)
+            if alt:
+                k, then_end = self.parse_list(k + 1, end, then_blk, stop)
+            else:
+                k, then_end = self.parse_stmt(k, end, then_blk) if k < end else (k, then_blk)
+            exits.append(then_end)
+
+            w = self.word(k)
+            if w == 'elseif' or (w == 'else' and self.word(k + 1) == 'if' and not alt):
+                nxt_cond = self.new_block()
+                self.edge(cond_blk, nxt_cond)
+                cond_blk = nxt_cond
+                k = self._cond(k + (1 if w == 'elseif' else 2), end, cond_blk)
+                continue
+            if w == 'else':
+                else_blk = self.new_block()
+                self.edge(cond_blk, else_blk)
+                k += 1
+                if alt:
+                    k, else_end = self.parse_list(k + 1 if self.is_op(k, ':') else k, end, else_blk, stop)
+                else:
+                    k, else_end = self.parse_stmt(k, end, else_blk) if k < end else (k, else_blk)
+                exits.append(else_end)
+            else:
+                exits.append(cond_blk)
+            break
+
+        if alt and self.word(k) == 'endif':
+            k = self.skip_terminator(k + 1, end)
+        join = self.new_block()
+        for b in exits:
+            self.edge(b, join)
+        return k, join
+
+    def _loop(self, head: int, body_start: int, end: int, stop, cont: int = None):
+        """head 에서 본문으로 들어갔다 cont(기본 head)로 되돌아오는 반복문."""
+        exit_blk = self.new_block()
+        body = self.new_block()
+        self.edge(head, body)
+        self.edge(head, exit_blk)
+        self.jumps.append((cont if cont is not None else head, exit_blk, None))
+        k, body_end = self.parse_body(body_start, end, body, stop)
+        self.jumps.pop()
+        self.edge(body_end, cont if cont is not None else head)
+        return k, body_end, exit_blk
+
+    def _kw_while(self, i: int, end: int, cur: int):
+        head = self.new_block()
+        self.edge(cur, head)
+        k = self._cond(i + 1, end, head)
+        k, _, exit_blk = self._loop(head, k, end, frozenset(['endwhile']))
+        return k, exit_blk
+
+    def _kw_for(self, i: int, end: int, cur: int):
+        if not self.is_op(i + 1, '('):
+            return self.stmt_end(i, end), cur
+        close = self.close_of(i + 1, end)
+        parts = []
+        start = i + 2
+        k = start
+        while k < close:
+            if self.is_op(k, ';'):
+                parts.append((start, k))
+                start = k + 1
+            elif self.toks[k].kind == T_OP and self.toks[k].text in _OPEN:
+                k = self.close_of(k, close)
+            k += 1
+        parts.append((start, close))
+        while len(parts) < 3:
+            parts.append((close, close))
+        (a0, a1), (b0, b1), (c0, c1) = parts[:3]
+
+        self.add_stmt(cur, a0, a1)
+        head = self.new_block()
+        self.edge(cur, head)
+        self.add_stmt(head, b0, b1)
+        step = self.new_block()
+        self.add_stmt(step, c0, c1)
+        self.edge(step, head)
+        k, _, exit_blk = self._loop(head, close + 1, end, frozenset(['endfor']), cont=step)
+        return k, exit_blk
+
+    def _kw_foreach(self, i: int, end: int, cur: int):
+        head = self.new_block()
+        self.edge(cur, head)
+        if self.is_op(i + 1, '('):
+            close = self.close_of(i + 1, end)
+            self.add_stmt(head, i + 2, close, 'foreach')
+            k = close + 1
+        else:
+            k = i + 1
+        k, _, exit_blk = self._loop(head, k, end, frozenset(['endforeach']))
+        return k, exit_blk
+
+    def _kw_do(self, i: int, end: int, cur: int):
+        body = self.new_block()
+        self.edge(cur, body)
+        cond_blk = self.new_block()
+        exit_blk = self.new_block()
+        self.jumps.append((cond_blk, exit_blk, None))
+        k, body_end = self.parse_stmt(i + 1, end, body) if i + 1 < end else (i + 1, body)
+        self.jumps.pop()
+        self.edge(body_end, cond_blk)
+        if self.word(k) == 'while':
+            k = self.skip_terminator(self._cond(k + 1, end, cond_blk), end)
+        self.edge(cond_blk, body)
+        self.edge(cond_blk, exit_blk)
+        return k, exit_blk
+
+    def _kw_switch(self, i: int, end: int, cur: int):
+        head = self.new_block()
+        self.edge(cur, head)
+        k = self._cond(i + 1, end, head)
+        exit_blk = self.new_block()
+        self.edge(head, exit_blk)
+        body = self.new_block()
+        self.edge(head, body)
+        self.jumps.append((exit_blk, exit_blk, head))
+        if self.is_op(k, '{'):
+            j = self.close_of(k, end)
+            _, body_end = self.parse_list(k + 1, j, body)
+            k = j + 1
+        else:
+            k, body_end = self.parse_body(k, end, body, frozenset(['endswitch']))
+        self.jumps.pop()
+        self.edge(body_end, exit_blk)
+        return k, exit_blk
+
+    def _kw_case(self, i: int, end: int, cur: int):
+        # case 식 ':' (또는 ';') 까지 건너뛰고, switch 헤드에서 들어오는 새 블록을 연다.
+        k = i + 1
+        while k < end and not (self.is_op(k, ':') or self.is_op(k, ';')):
+            if self.toks[k].kind == T_OP and self.toks[k].text in _OPEN:
+                k = self.close_of(k, end)
+            k += 1
+        blk = self.new_block()
+        self.edge(cur, blk)
+        if self.jumps and self.jumps[-1][2] is not None:
+            self.edge(self.jumps[-1][2], blk)
+        return k + 1, blk
+
+    _kw_default = _kw_case
+
+    def _kw_try(self, i: int, end: int, cur: int):
+        entry = self.new_block()
+        self.edge(cur, entry)
+        k, try_end = self.parse_stmt(i + 1, end, entry) if i + 1 < end else (i + 1, entry)
+        exits = [try_end]
+        while self.word(k) == 'catch':
+            catch_blk = self.new_block()
+            self.edge(entry, catch_blk)
+            self.edge(try_end, catch_blk)
+            k = self._cond(k + 1, end, catch_blk)
+            k, catch_end = self.parse_stmt(k, end, catch_blk) if k < end else (k, catch_blk)
+            exits.append(catch_end)
+        join = self.new_block()
+        for b in exits:
+            self.edge(b, join)
+        if self.word(k) == 'finally':
+            k, join = self.parse_stmt(k + 1, end, join) if k + 1 < end else (k + 1, join)
+        return k, join
+
+    def _jump(self, i: int, end: int, cur: int, which: int):
+        j = self.stmt_end(i, end)
+        level = 1
+        if i + 1 < j and self.toks[i + 1].text.isdigit():
+            level = max(1, int(self.toks[i + 1].text))
+        if self.jumps:
+            target = self.jumps[-min(level, len(self.jumps))][which]
+            self.edge(cur, target)
+        return j, self.new_block()
+
+    def _kw_break(self, i: int, end: int, cur: int):
+        return self._jump(i, end, cur, 1)
+
+    def _kw_continue(self, i: int, end: int, cur: int):
+        return self._jump(i, end, cur, 0)
+
+    def _block_or_stmt_end(self, k: int, end: int):
+        """k 이후 처음 나오는 '{' (또는 ';') 위치."""
+        while k < end and not (self.is_op(k, '{') or self.is_op(k, ';')):
+            if self.is_op(k, '('):
+                k = self.close_of(k, end)
+            k += 1
+        return k
+
+    def _function_decl(self, i: int, end: int, cur: int):
+        """이름 있는 함수/메서드: 본문은 빈 상태에서 시작하는 별도 진입 블록."""
+        k = self._block_or_stmt_end(i + 1, end)
+        if not self.is_op(k, '{'):
+            return k + 1, cur
+        j = self.close_of(k, end)
+        saved, self.jumps = self.jumps, []
+        self.parse_list(k + 1, j, self.new_block())
+        self.jumps = saved
+        return j + 1, cur
+
+    def _closures(self, i: int, j: int):
+        """
+        문장 [i, j) 안의 익명 함수 본문을 별도 진입 블록으로 분석하고
+        본문 토큰의 scope 수준을 올린다(이름 있는 함수처럼 빈 상태에서 시작).
+        """
+        toks = self.toks
+        scope = self.scope
+        base = scope[i]
+        k = i
+        while k < j:
+            if (
+                scope[k] != base
+                or self.word(k) not in _CLOSURE_KEYWORDS
+                or not (self.is_op(k + 1, '(') or (self.is_op(k + 1, '&') and self.is_op(k + 2, '(')))
+                or (k > i and toks[k - 1].kind == T_OP and toks[k - 1].text in _MEMBER_OPS)
+            ):
+                k += 1
+                continue
+            if self.word(k) == 'function':
+                b = self._block_or_stmt_end(k + 1, j)
+                if not self.is_op(b, '{'):
+                    k = b
+                    continue
+                a, b = b + 1, self.close_of(b, j)
+            else:
+                a = k + 1
+                while a < j and not self.is_op(a, '=>'):
+                    if self.is_op(a, '('):
+                        a = self.close_of(a, j)
+                    a += 1
+                if a >= j:
+                    k += 1
+                    continue
+                a += 1
+                b = self._expr_end(a, j)
+            for t in range(a, b):
+                scope[t] += 1
+            saved, self.jumps = self.jumps, []
+            if self.word(k) == 'function':
+                self.parse_list(a, b, self.new_block())
+            else:
+                self.add_stmt(self.new_block(), a, b)
+            self.jumps = saved
+            k = b + 1
+
+    def _expr_end(self, i: int, end: int) -> int:
+        """i 에서 시작한 식의 끝(최상위 ',' ';' 또는 둘러싼 닫는 괄호)."""
+        k = i
+        while k < end:
+            tok = self.toks[k]
+            if tok.kind == T_OP:
+                t = tok.text
+                if t in _OPEN:
+                    k = self.close_of(k, end) + 1
+                    continue
+                if t in (',', ';') or t in _CLOSE:
+                    return k
+            elif tok.kind in _TAGS:
+                return k
+            k += 1
+        return end
+
+    def _class_decl(self, i: int, end: int, cur: int):
+        k = self._block_or_stmt_end(i + 1, end)
+        if not self.is_op(k, '{'):
+            return k + 1, cur
+        j = self.close_of(k, end)
+        # 클래스 본문(프로퍼티 기본값, 메서드)은 현재 흐름과 무관하다.
+        saved, self.jumps = self.jumps, []
+        self.parse_list(k + 1, j, self.new_block())
+        self.jumps = saved
+        return j + 1, cur
+
+    def _kw_namespace(self, i: int, end: int, cur: int):
+        k = i + 1
+        while k < end and self.toks[k].kind == T_IDENT:
+            k += 1
+        if self.is_op(k, '{'):
+            j = self.close_of(k, end)
+            _, cur = self.parse_list(k + 1, j, cur)
+            return j + 1, cur
+        return self.stmt_end(i, end), cur
+
+    def _kw_declare(self, i: int, end: int, cur: int):
+        k = i + 1
+        if self.is_op(k, '('):
+            k = self.close_of(k, end) + 1
+        if self.is_op(k, '{'):
+            j = self.close_of(k, end)
+            _, cur = self.parse_list(k + 1, j, cur)
+            return j + 1, cur
+        return self.skip_terminator(k, end), cur
+
+    def build(self):
+        entry = self.new_block()
+        i, n = 0, len(self.toks)
+        cur = entry
+        while i < n:
+            nxt, cur = self.parse_stmt(i, n, cur)
+            i = max(nxt, i + 1)
+        return self.blocks, self.succ
+
+
+class TaintResult:
+    """
+    고정점 결과. lookup(line, var) 로 그 라인에서 변수의 taint 정보를 얻는다.
+    """
+
+    def __init__(self, names, levels_by_line, starts, out_states, origins, width):
+        self._ids = {name: i for i, name in enumerate(names)}
+        self._width = width
+        self._names = names
+        self._line_levels = levels_by_line
+        self._starts = starts
+        self._outs = out_states
+        self._origins = origins
+
+    def _levels_at(self, line_num: int):
+        levels = self._line_levels.get(line_num)
+        if levels is not None:
+            return levels
+        # 문장이 없는 라인: 그 앞에서 시작한 마지막 문장이 끝난 뒤의 상태
+        idx = bisect_right(self._starts, line_num) - 1
+        return self._outs[idx] if idx >= 0 else ()
+
+    def lookup(self, line_num: int, var: str):
+        """
+        {'source', 'line', 'hops', 'guards'} 또는 None.
+        guards 는 값이 모든 경로에서 가드를 거쳤을 때 그 가드 이름 튜플(아니면 None).
+        """
+        vid = self._ids.get(var)
+        if vid is None:
+            return None
+        bit = 1 << vid
+        levels = self._levels_at(line_num)
+        width = self._width
+        for h, bits in enumerate(levels[:width]):
+            if bits & bit:
+                source, line = self._origins.get((vid, h), (None, None))
+                guards = None
+                if not levels[width] & bit:
+                    guards = tuple(g for i, g in enumerate(GUARD_NAMES) if levels[width + 1 + i] & bit) or None
+                return {'source': source, 'line': line, 'hops': h, 'guards': guards}
+        return None
+
+    def tainted_at(self, line_num: int) -> dict:
+        """그 라인 시점에 tainted 인 모든 변수 -> {'source', 'line', 'hops'}."""
+        found = {}
+        for h, bits in enumerate(self._levels_at(line_num)[:self._width]):
+            vid = 0
+            while bits:
+                if bits & 1:
+                    source, line = self._origins.get((vid, h), (None, None))
+                    found.setdefault(self._names[vid], {'source': source, 'line': line, 'hops': h})
+                bits >>= 1
+                vid += 1
+        return found
+
+    def summary(self) -> dict:
+        """파일 어디에서든 tainted 인 변수 -> 가장 작은 hop 의 정보."""
+        best = {}
+        for (vid, h), (source, line) in self._origins.items():
+            name = self._names[vid]
+            if name not in best or h < best[name]['hops']:
+                best[name] = {'source': source, 'line': line, 'hops': h}
+        return best
+
+
+def _normalize(levels, width):
+    """hop 슬롯 [0, width) 에서 변수를 가장 작은 hop 하나에만 남긴다."""
+    seen = 0
+    for h in range(width):
+        bits = levels[h] & ~seen
+        levels[h] = bits
+        seen |= bits
+    return levels
+
+
+class TaintEngine:
+    """
+    토큰 리스트 하나에 대한 worklist 고정점 taint 분석.
+
+    - seed: {변수: (소스, 라인[, hop])} 진입 블록에서 이미 tainted 인 변수
+      (hop 을 생략하면 0)
+    - summaries: {함수 이름(소문자): 요약} 우변이 `f(...)` 한 번의 호출이면
+      요약의 returns / returns_source 로 반환값의 taint 를 정한다
+      (interproc.build_summary_table 참고).
+    - detect_sources: False 이면 입력 소스(SOURCE_PATTERNS)를 보지 않고
+      seed 에서 시작한 흐름만 추적한다(함수 파라미터 요약용).
+    """
+
+    def __init__(self, tokens, max_hops: int = 3, seed=None, summaries=None, detect_sources: bool = True):
+        self.toks = tokens
+        self.max_hops = max_hops
+        self.seed = seed or {}
+        self.summaries = summaries or {}
+        self.detect_sources = detect_sources
+        self.var_ids = {}
+        self.names = []
+        self.origins = {}
+        self.scope = [0] * len(tokens)
+        # 상태 슬롯: hop 수준 [0, width), raw, 가드별
+        self.width = max_hops + 1
+        self.slots = self.width + 1 + len(GUARD_NAMES)
+
+    def _vid(self, name: str) -> int:
+        vid = self.var_ids.get(name)
+        if vid is None:
+            vid = self.var_ids[name] = len(self.names)
+            self.names.append(name)
+        return vid
+
+    # --- 문장 효과 미리 계산 ---
+
+    def _own_tokens(self, a: int, b: int):
+        """tokens[a:b] 중 익명 함수 본문 밖(a 와 같은 scope)의 토큰."""
+        scope = self.scope
+        base = scope[a] if a < len(scope) else 0
+        return [t for k, t in enumerate(self.toks[a:b], a) if scope[k] == base]
+
+    def _rhs_end(self, k: int, j: int) -> int:
+        toks = self.toks
+        depth = 0
+        while k < j:
+            tok = toks[k]
+            if tok.kind == T_OP:
+                t = tok.text
+                if t in _OPEN:
+                    depth += 1
+                elif t in _CLOSE:
+                    depth -= 1
+                    if depth < 0:
+                        return k
+                elif t == ';' and depth == 0:
+                    return k
+            elif tok.kind in _TAGS:
+                return k
+            k += 1
+        return j
+
+    def _rhs_info(self, a: int, b: int, match):
+        """
+        우변 [a, b) -> (소스 문자열 또는 None, 변수 비트마스크, 정화 여부,
+        우변 전체를 감싼 가드 이름 또는 None).
+        """
+        toks = self.toks
+        own = self._own_tokens(a, b)
+        right = ' '.join(t.text for t in own if t.kind not in MASKED_KINDS)
+        source = None
+        if self.detect_sources and SOURCE_RE.search(right):
+            for sp, sp_re in _SOURCE_RES:
+                if sp_re.search(right):
+                    source = sp.lower()
+                    break
+        mask = 0
+        for t in own:
+            if t.kind == T_VARIABLE:
+                mask |= 1 << self._vid(t.text)
+
+        if is_sanitizing_expr(toks, a, b, match):
+            return source, mask, True, None
+        guard = guard_call(toks, a, b, match)
+        if guard is not None:
+            return source, mask, False, guard
+        if (
+            b - a >= 3
+            and toks[a].kind == T_IDENT and toks[a + 1].kind == T_OP and toks[a + 1].text == '('
+            and match[a + 1] == b - 1
+            and toks[a].text.lower() in self.summaries
+        ):
+            # 우변 전체가 요약이 있는 함수 한 번의 호출
+            return self._call_info(self.summaries[toks[a].text.lower()], a + 1, match)
+        return source, mask, False, None
+
+    def _call_info(self, summary, open_idx: int, match):
+        """
+        요약이 있는 함수 호출의 반환값 taint: 반환값으로 흐르는 인자만 본다.
+        모든 반환값이 같은 가드로 감싸여 있으면 요약의 returns_guard 를 붙인다.
+        """
+        toks = self.toks
+        source = summary.get('returns_source') if self.detect_sources else None
+        mask = 0
+        args = split_call_args(toks, open_idx, match)
+        for idx in summary.get('returns', ()):
+            if idx >= len(args):
+                continue
+            a, b = args[idx]
+            own = self._own_tokens(a, b)
+            if source is None and self.detect_sources:
+                right = ' '.join(t.text for t in own if t.kind not in MASKED_KINDS)
+                for sp, sp_re in _SOURCE_RES:
+                    if sp_re.search(right):
+                        source = sp.lower()
+                        break
+            for t in own:
+                if t.kind == T_VARIABLE:
+                    mask |= 1 << self._vid(t.text)
+        # 어떤 인자도 반환값으로 흐르지 않고 소스도 없으면 정화와 같다.
+        return source, mask, source is None and not mask, summary.get('returns_guard')
+
+    def _effect(self, kind, left, a, b, match):
+        source, mask, sanitized, guard = self._rhs_info(a, b, match)
+        if sanitized:
+            kind = SANITIZE if kind == ASSIGN else None
+        if kind is None:
+            return None
+        return _Effect(
+            kind, self._vid(left), source, mask, self.toks[a - 1].line if a else 1,
+            _GUARD_IDS.get(guard),
+        )
+
+    def compile_stmt(self, i: int, j: int, kind: str, match):
+        toks = self.toks
+        effects = []
+        if kind == 'foreach':
+            k = i
+            while k < j and not (toks[k].kind == T_IDENT and toks[k].text.lower() == 'as'):
+                if toks[k].kind == T_OP and toks[k].text in _OPEN and 0 <= match[k] < j:
+                    k = match[k]
+                k += 1
+            for t in toks[k + 1:j]:
+                if t.kind == T_VARIABLE:
+                    eff = self._effect(ASSIGN, t.text, i, k, match)
+                    if eff is not None:
+                        eff.line = t.line
+                        effects.append(eff)
+            return effects
+
+        scope = self.scope
+        for k in range(i, j):
+            if scope[k] != scope[i]:
+                # 익명 함수 본문은 따로 분석한다.
+                continue
+            tok = toks[k]
+            if tok.kind == T_VARIABLE:
+                nk = k + 1
+                kind_ = ASSIGN
+                if nk < j and toks[nk].kind == T_OP and toks[nk].text == '[':
+                    # $a[...][...] = ...  -> $a 에 약한 갱신
+                    while nk < j and toks[nk].kind == T_OP and toks[nk].text == '[' and 0 <= match[nk] < j:
+                        nk = match[nk] + 1
+                    kind_ = APPEND
+                if nk < j and toks[nk].kind == T_OP and toks[nk].text in ('=', '.='):
+                    if toks[nk].text == '.=':
+                        kind_ = APPEND
+                    a = nk + 1
+                    eff = self._effect(kind_, tok.text, a, self._rhs_end(a, j), match)
+                    if eff is not None:
+                        effects.append(eff)
+            elif tok.kind == T_OP and tok.text == '[' or (
+                tok.kind == T_IDENT and tok.text.lower() == 'list' and k + 1 < j and toks[k + 1].text == '('
+            ):
+                # [$a, $b] = ... / list($a, $b) = ...  (구조 분해)
+                o = k if tok.text == '[' else k + 1
+                c = match[o]
+                prev = toks[k - 1] if k > i else None
+                if (
+                    0 <= c < j - 1
+                    and toks[c + 1].kind == T_OP and toks[c + 1].text == '='
+                    and not (prev is not None and (prev.kind in (T_VARIABLE, T_IDENT) or prev.text in (']', ')', '}')))
+                ):
+                    a = c + 2
+                    b = self._rhs_end(a, j)
+                    for t in toks[o + 1:c]:
+                        if t.kind == T_VARIABLE:
+                            eff = self._effect(ASSIGN, t.text, a, b, match)
+                            if eff is not None:
+                                effects.append(eff)
+        return effects
+
+    # --- 전달 함수 ---
+
+    def transfer(self, levels, effects):
+        max_hops = self.max_hops
+        width = self.width
+        for eff in effects:
+            bit = 1 << eff.left
+            new_h = None
+            marks = ()
+            if eff.kind != SANITIZE:
+                if eff.source is not None:
+                    new_h = 0
+                    self.origins.setdefault((eff.left, 0), (eff.source, eff.line))
+                elif eff.rhs_mask:
+                    for h in range(width):
+                        hit = levels[h] & eff.rhs_mask
+                        if not hit:
+                            continue
+                        if hit & bit:
+                            # 자기 자신을 다시 쓰는 것($x = $x . ..)은 hop 을 늘리지 않는다.
+                            new_h = h
+                            break
+                        if h < max_hops:
+                            new_h = h + 1
+                            if (eff.left, new_h) not in self.origins:
+                                src = (hit & -hit).bit_length() - 1
+                                self.origins[(eff.left, new_h)] = self.origins.get((src, h), (None, None))
+                        break
+                if new_h is not None:
+                    # 새 값이 거친 가드: 감싼 가드가 있으면 그것만, 아니면 우변 변수들의 것
+                    if eff.guard is not None:
+                        marks = (width + 1 + eff.guard,)
+                    else:
+                        marks = [s for s in range(width, self.slots) if levels[s] & eff.rhs_mask]
+                        if eff.source is not None:
+                            marks.append(width)
+
+            if eff.kind == APPEND:
+                if new_h is None:
+                    continue
+                for s in marks:
+                    levels[s] |= bit
+                for h in range(width):
+                    if levels[h] & bit:
+                        if h <= new_h:
+                            new_h = None
+                        else:
+                            levels[h] &= ~bit
+                        break
+                if new_h is not None:
+                    levels[new_h] |= bit
+                continue
+
+            for h in range(len(levels)):
+                levels[h] &= ~bit
+            if new_h is not None:
+                levels[new_h] |= bit
+                for s in marks:
+                    levels[s] |= bit
+        return levels
+
+    # --- 실행 ---
+
+    def _stmt_lines(self, i: int, j: int):
+        """
+        문장 [i, j) 의 상태를 붙일 라인들. 익명 함수 본문만 있는 라인은
+        본문 안 문장들이 자기 상태를 붙이므로 빼고, 둘러싼 문장의 토큰이
+        걸친 라인만 남긴다.
+        """
+        toks = self.toks
+        scope = self.scope
+        base = scope[i]
+        lines = []
+        first = None
+        last = 0
+        for k in range(i, j):
+            if scope[k] != base:
+                continue
+            tok = toks[k]
+            end = tok.line + tok.text.count('\n')
+            if first is None:
+                first = tok.line
+            elif tok.line > last + 1 and scope[k - 1] != base:
+                # 본문을 건너뛴 자리: 앞 구간을 닫는다.
+                lines.extend(range(first, last + 1))
+                first = tok.line
+            last = max(last, end)
+        if first is not None:
+            lines.extend(range(first, last + 1))
+        return lines
+
+    def run(self) -> TaintResult:
+        toks = self.toks
+        builder = _CFGBuilder(toks)
+        blocks, succ = builder.build()
+        match = builder.match
+        self.scope = builder.scope
+
+        stmt_effects = [
+            [(i, j, self.compile_stmt(i, j, kind, match)) for i, j, kind in stmts]
+            for stmts in blocks
+        ]
+        # 문장이 하나도 없는 블록도 흐름은 이어 준다.
+        preds = [[] for _ in blocks]
+        for b, ss in enumerate(succ):
+            for s in ss:
+                preds[s].append(b)
+
+        width = self.width
+        slots = self.slots
+        seed_levels = [0] * slots
+        for name, origin in self.seed.items():
+            vid = self._vid(name)
+            h = min(origin[2], self.max_hops) if len(origin) > 2 else 0
+            seed_levels[h] |= 1 << vid
+            seed_levels[width] |= 1 << vid
+            self.origins.setdefault((vid, h), (origin[0], origin[1]))
+        _normalize(seed_levels, width)
+        outs = [None] * len(blocks)
+        work = deque(range(len(blocks)))
+        queued = [True] * len(blocks)
+        while work:
+            b = work.popleft()
+            queued[b] = False
+            levels = list(seed_levels) if b == 0 else [0] * slots
+            for p in preds[b]:
+                out = outs[p]
+                if out is not None:
+                    for h in range(slots):
+                        levels[h] |= out[h]
+            _normalize(levels, width)
+            for _, _, effects in stmt_effects[b]:
+                if effects:
+                    self.transfer(levels, effects)
+            new = tuple(levels)
+            if new != outs[b]:
+                outs[b] = new
+                for s in succ[b]:
+                    if not queued[s]:
+                        queued[s] = True
+                        work.append(s)
+
+        # 고정점 상태로 문장별 진입/종료 상태를 다시 계산해 라인에 붙인다.
+        stmt_states = []
+        for b, stmts in enumerate(stmt_effects):
+            levels = list(seed_levels) if b == 0 else [0] * slots
+            for p in preds[b]:
+                out = outs[p]
+                if out is not None:
+                    for h in range(slots):
+                        levels[h] |= out[h]
+            _normalize(levels, width)
+            for i, j, effects in stmts:
+                before = tuple(levels)
+                if effects:
+                    self.transfer(levels, effects)
+                stmt_states.append((i, self._stmt_lines(i, j), before, tuple(levels)))
+        stmt_states.sort(key=lambda s: s[0])
+
+        by_line = {}
+        for _, lines, before, _ in stmt_states:
+            for ln in lines:
+                cur = by_line.get(ln)
+                if cur is None:
+                    by_line[ln] = before
+                else:
+                    by_line[ln] = tuple(_normalize([x | y for x, y in zip(cur, before)], width))
+        starts = [self.toks[s[0]].line for s in stmt_states]
+        out_states = [s[3] for s in stmt_states]
+        return TaintResult(self.names, by_line, starts, out_states, self.origins, width)
+
+
+def analyze_taint(tokens, max_hops: int = 3, seed=None, summaries=None, detect_sources: bool = True) -> TaintResult:
+    """MaskedSource.tokens 에 대한 taint 고정점 분석."""
+    engine = TaintEngine(
+        tokens, max_hops=max_hops, seed=seed, summaries=summaries, detect_sources=detect_sources
+    )
+    return engine.run()
@@ -6,7 +6,7 @@
 
 import concurrent.futures
 import os
-import random
+import shutil
 import threading
 import time
 import zipfile
@@ -16,6 +16,17 @@ from bs4 import BeautifulSoup
 from requests.adapters import HTTPAdapter
 from urllib3.util import Retry
 
+from .manifest import STAGING_PREFIX, PluginManifest, install_directory, plugin_slug, plugin_version
+from .ratelimit import (
+    INITIAL_RATE,
+    MAX_RATE,
+    THROTTLE_RETRIES,
+    THROTTLE_STATUSES,
+    AdaptiveRateLimiter,
+    parse_retry_after,
+)
+from .resume import RESUME_ATTEMPTS, IncompleteDownload, PartFile
+
 # 컬러 출력용
 colors = [
     '\033[91m',
@@ -33,7 +44,39 @@ RESET = '\033[0m'
 
 save_dir = "./plugins"
 _tmp_suffix = ".part"
+# 검색 결과 페이지 URL (target: 키워드, page: 1부터)
+SEARCH_URL = "https://ko.wordpress.org/plugins/search/{target}/page/{page}"
+DOWNLOAD_URL_PREFIX = "https://downloads.wordpress.org/plugin/"
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/58.0.3029.110 Safari/537.3"
+)
+# 키워드당 최대 검색 페이지 수
+MAX_SEARCH_PAGES = 50
+
+# WordPress.org plugins info API (query_plugins). JSON 요청 하나로 최대
+# API_PER_PAGE 개 플러그인의 slug/version/download_link 를 받는다.
+API_URL = "https://api.wordpress.org/plugins/info/1.2/"
+API_PER_PAGE = 250
+# 응답을 줄이기 위해 끄는 필드 / 꼭 받는 필드
+API_EXCLUDED_FIELDS = (
+    'description', 'sections', 'short_description', 'tags', 'ratings', 'banners', 'icons',
+    'screenshots', 'contributors', 'compatibility', 'donate_link', 'versions',
+)
+API_INCLUDED_FIELDS = ('download_link', 'version')
+# zip 다운로드의 연결 / 소켓 읽기 시간 제한(초)
+ZIP_TIMEOUT = 30
+# 플러그인 검색 방식: api(실패하면 html 로 대체) / html(검색 페이지 스크래핑)
+DISCOVERY_MODES = ('api', 'html')
+
 _folder_lock = threading.Lock()  # 중복 다운로드 방지(임계영역 보호)
+# 스레드 엔진의 모든 요청이 함께 쓰는 속도 제한기
+rate_limiter = AdaptiveRateLimiter()
+
+
+class PluginApiError(Exception):
+    """plugins info API 응답을 받지 못했거나 형식이 맞지 않는다."""
 
 
 def ensure_directory(directory: str):
@@ -46,6 +89,9 @@ def get_existing_folders(base_dir: str):
         return []
     out = []
     for name in os.listdir(base_dir):
+        if name.startswith('.'):
+            # 매니페스트, 압축해제 스테이징 등 다운로더 내부 파일
+            continue
         p = os.path.join(base_dir, name)
         if os.path.isdir(p):
             out.append(name)
@@ -56,16 +102,15 @@ def get_existing_folders(base_dir: str):
 
 def create_session() -> requests.Session:
     s = requests.Session()
-    s.headers.update(
-        {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/58.0.3029.110 Safari/537.3"
-            )
-        }
+    s.headers.update({"User-Agent": USER_AGENT})
+    # 429/503 은 limited_get 이 rate_limiter 로 속도를 줄여 다시 보낸다
+    # (urllib3 가 Retry-After 를 보고 먼저 재시도하지 않도록 끈다).
+    retries = Retry(
+        total=5,
+        backoff_factor=1,
+        status_forcelist=[500, 502, 504],
+        respect_retry_after_header=False,
     )
-    retries = Retry(total=5, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
     adapter = HTTPAdapter(max_retries=retries)
     s.mount("http://", adapter)
     s.mount("https://", adapter)
@@ -73,6 +118,27 @@ def create_session() -> requests.Session:
     return s
 
 
+def limited_get(session: requests.Session, url: str, **kwargs) -> requests.Response:
+    """
+    rate_limiter 토큰을 얻어 GET 을 보낸다. 성공 응답이면 속도를 올리고,
+    429/503 이면 속도를 줄여(Retry-After 를 따라) 다시 보낸다.
+    다시 보낼 횟수를 다 쓰면 마지막 응답을 그대로 돌려준다.
+    """
+    for attempt in range(THROTTLE_RETRIES + 1):
+        rate_limiter.acquire()
+        resp = session.get(url, **kwargs)
+        if resp.status_code in THROTTLE_STATUSES:
+            retry_after = parse_retry_after(resp.headers.get('Retry-After'))
+            rate_limiter.on_throttle(retry_after)
+            print(f"[rate] HTTP {resp.status_code} from {url}: slowing down to {rate_limiter.describe()}")
+            if attempt < THROTTLE_RETRIES:
+                resp.close()
+                continue
+        elif resp.ok:
+            rate_limiter.on_success()
+        return resp
+
+
 def _safe_basename(name: str) -> str:
     base = os.path.basename(name)
     safe = "".join(c for c in base if c.isalnum() or c in "-_.")
@@ -101,81 +167,246 @@ def safe_extract_zip(zip_path: str, dest_dir: str):
                 print(f"[warn] skip unsafe path in zip: {m}")
 
 
-def download_plugin(link: str, existing_folders, session: requests.Session) -> int:
+def parse_search_links(content) -> list:
+    """검색 결과 페이지 HTML -> 플러그인 상세 페이지 링크 목록."""
+    soup = BeautifulSoup(content, 'html.parser')
+    entries = soup.find_all('h3', {'class': 'entry-title'})
+    return [e.find('a')['href'] for e in entries if e.find('a')]
+
+
+def find_download_link(content):
+    """플러그인 상세 페이지 HTML -> zip 다운로드 링크(없으면 None)."""
+    soup = BeautifulSoup(content, 'html.parser')
+    download_anchor = soup.find('a', {'class': 'plugin-download button download-button button-large'})
+    if not download_anchor:
+        for a in soup.find_all('a', href=True):
+            href = a['href']
+            if href.startswith(DOWNLOAD_URL_PREFIX) and href.endswith(".zip"):
+                download_anchor = a
+                break
+    return download_anchor['href'] if download_anchor else None
+
+
+def plugin_file_names(download_link: str):
+    """zip 다운로드 링크 -> (zip 파일 이름, 압축을 풀 폴더 이름)."""
+    file_name = _safe_basename(download_link.split('/')[-1])
+    return file_name, file_name.rsplit('.', 1)[0]
+
+
+def finish_zip(final_path: str, extract_dir: str) -> bool:
+    """
+    받은 zip 을 스테이징 디렉토리에 압축해제해 extract_dir 자리에 넣고
+    zip 을 지운다. extract_dir 이 이미 있으면 바꿔치기한다.
+    실패는 경고만 출력하고 False.
+    """
+    parent, name = os.path.split(extract_dir)
+    staging = os.path.join(parent, STAGING_PREFIX + name)
+    try:
+        if zipfile.is_zipfile(final_path):
+            shutil.rmtree(staging, ignore_errors=True)
+            safe_extract_zip(final_path, staging)
+            install_directory(staging, extract_dir)
+            print('Extracted to:', extract_dir)
+            try:
+                os.remove(final_path)
+                print('Removed zip:', final_path)
+            except Exception as rm_err:
+                print(f"[warn] failed to remove zip {final_path}: {rm_err}")
+            return True
+        print(f"[warn] not a zip file: {final_path}")
+    except Exception as ex:
+        print(f"[warn] extract failed for {final_path}: {ex}")
+        shutil.rmtree(staging, ignore_errors=True)
+    return False
+
+
+def query_plugins_params(keyword: str, page: int, per_page: int = API_PER_PAGE) -> dict:
+    """query_plugins 요청의 query string 파라미터."""
+    params = {
+        'action': 'query_plugins',
+        'request[search]': keyword,
+        'request[page]': str(page),
+        'request[per_page]': str(per_page),
+    }
+    for field in API_EXCLUDED_FIELDS:
+        params[f'request[fields][{field}]'] = '0'
+    for field in API_INCLUDED_FIELDS:
+        params[f'request[fields][{field}]'] = '1'
+    return params
+
+
+def parse_query_plugins(data):
+    """
+    query_plugins JSON -> ([{'slug', 'version', 'download_link'}], 전체 페이지 수).
+    형식이 맞지 않으면 PluginApiError.
+    """
+    if not isinstance(data, dict) or 'plugins' not in data:
+        error = data.get('error') if isinstance(data, dict) else None
+        raise PluginApiError(error or 'unexpected query_plugins response')
+    plugins = data['plugins']
+    if isinstance(plugins, dict):
+        plugins = list(plugins.values())
+    out = [
+        {'slug': p.get('slug'), 'version': p.get('version'), 'download_link': p.get('download_link')}
+        for p in plugins
+        if isinstance(p, dict)
+    ]
+    info = data.get('info') or {}
+    try:
+        pages = int(info.get('pages') or 1)
+    except (TypeError, ValueError):
+        pages = 1
+    return out, pages
+
+
+def query_plugins(session: requests.Session, keyword: str, page: int, per_page: int = API_PER_PAGE):
+    """plugins info API 검색 한 페이지. 실패하면 PluginApiError."""
+    try:
+        resp = limited_get(session, API_URL, params=query_plugins_params(keyword, page, per_page), timeout=30)
+        resp.raise_for_status()
+        data = resp.json()
+    except (requests.RequestException, ValueError) as e:
+        raise PluginApiError(str(e))
+    return parse_query_plugins(data)
+
+
+def download_plugin(link: str, existing_folders, session: requests.Session, manifest=None) -> int:
     """
-    개별 플러그인 상세 페이지 링크에서 실제 zip을 다운로드 & 압축해제.
+    개별 플러그인 상세 페이지 링크에서 zip 링크를 찾아 download_zip.
     """
     try:
-        resp = session.get(link, timeout=10)
+        resp = limited_get(session, link, timeout=10)
         resp.raise_for_status()
     except Exception as e:
         print(f"Error fetching plugin page {link}: {e}")
         return 0
 
-    soup = BeautifulSoup(resp.content, 'html.parser')
-    download_anchor = soup.find('a', {'class': 'plugin-download button download-button button-large'})
-    if not download_anchor:
-        for a in soup.find_all('a', href=True):
-            href = a['href']
-            if href.startswith("https://downloads.wordpress.org/plugin/") and href.endswith(".zip"):
-                download_anchor = a
-                break
-    if not download_anchor:
+    download_link = find_download_link(resp.content)
+    if not download_link:
         print(f"Download link not found for {link}")
         return 0
+    return download_zip(download_link, existing_folders, session, manifest)
 
-    download_link = download_anchor['href']
-    file_name = _safe_basename(download_link.split('/')[-1])
-    folder_name = file_name.rsplit('.', 1)[0]
 
-    with _folder_lock:
-        if folder_name in existing_folders:
-            print(f"Skipping {folder_name} as it already exists.")
+def _fetch_part(session: requests.Session, download_link: str, part: PartFile, headers) -> bool:
+    """
+    download_link 를 part(.part 파일)에 받는다. 연결이 끊기면 받은 데까지
+    남겨 두고 Range 로 이어받는다(RESUME_ATTEMPTS 번까지). 304 이면 False.
+    """
+    for attempt in range(RESUME_ATTEMPTS):
+        if part.complete:
+            return True
+        req_headers = dict(headers)
+        req_headers.update(part.request_headers())
+        try:
+            with limited_get(session, download_link, stream=True, timeout=ZIP_TIMEOUT, headers=req_headers) as r:
+                if r.status_code == 304:
+                    return False
+                if r.status_code == 416:
+                    # 남은 .part 가 서버 파일과 맞지 않는다: 처음부터 다시 받는다.
+                    part.discard()
+                    continue
+                r.raise_for_status()
+                with part.begin(r.status_code, r.headers) as f:
+                    for chunk in r.iter_content(chunk_size=1024 * 256):
+                        if chunk:
+                            f.write(chunk)
+            part.check_size()
+            return True
+        except (requests.ConnectionError, requests.exceptions.ChunkedEncodingError, IncompleteDownload) as e:
+            part.refresh()
+            if attempt + 1 >= RESUME_ATTEMPTS:
+                raise
+            print(f"[resume] {download_link}: {e} (resuming at {part.offset} bytes)")
+    raise IncompleteDownload(f"range not satisfiable: {download_link}")
+
+
+def download_zip(
+    download_link: str,
+    existing_folders,
+    session: requests.Session,
+    manifest=None,
+    version=None,
+) -> int:
+    """
+    zip 링크에서 플러그인을 받아 압축해제. 받았으면 1.
+
+    zip 은 <name>.zip.part 에 받고, 끊기면 .part 와 메타데이터를 남겨
+    다음 시도에서 이어받는다(resume.PartFile). 크기와 zip CRC 를 확인한
+    뒤에야 제자리로 옮긴다.
+
+    manifest(PluginManifest)가 있으면 받은 zip 의 버전/ETag/sha256 을
+    기록한다. update 모드이면 이미 있는 플러그인도 버전 비교나 조건부
+    GET 으로 확인해 바뀐 것만 다시 받고, 최신이라 건너뛴 것도 1 로 센다
+    (max_plugins 는 확인한 플러그인 수).
+    """
+    file_name, folder_name = plugin_file_names(download_link)
+    slug = plugin_slug(file_name)
+    version = version or plugin_version(file_name)
+    updating = manifest is not None and manifest.update
+    headers = {}
+    old_folder = None
+
+    if updating:
+        if not manifest.claim(slug):
             return 0
-        existing_folders.append(folder_name)
+        if manifest.is_current(slug, folder_name, version, existing_folders):
+            print(f"Up to date: {slug} {version}")
+            manifest.mark_unchanged()
+            return 1
+        old_folder = manifest.installed_folder(slug, existing_folders)
+        if old_folder:
+            headers = manifest.request_headers(slug, download_link)
+    else:
+        with _folder_lock:
+            if folder_name in existing_folders:
+                print(f"Skipping {folder_name} as it already exists.")
+                return 0
+            existing_folders.append(folder_name)
 
     ensure_directory(save_dir)
     final_path = os.path.join(save_dir, file_name)
     temp_path = final_path + _tmp_suffix
     extract_dir = os.path.join(save_dir, folder_name)
 
+    part = PartFile(temp_path, download_link)
     try:
-        with session.get(download_link, stream=True, timeout=30) as r:
-            r.raise_for_status()
-            with open(temp_path, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=1024 * 256):
-                    if chunk:
-                        f.write(chunk)
-        os.replace(temp_path, final_path)
+        if not _fetch_part(session, download_link, part, headers):
+            print(f"Not modified: {slug}")
+            part.discard()
+            manifest.mark_unchanged()
+            return 1
+        sha256 = part.verify()
+        validators = part.validators()
+        if old_folder and manifest.same_content(slug, sha256):
+            part.discard()
+            manifest.record_download(slug, old_folder, version, download_link, validators, sha256)
+            print(f"Unchanged: {slug}")
+            manifest.mark_unchanged()
+            return 1
+        part.finish(final_path)
         print('Downloaded:', file_name)
-
-        try:
-            if zipfile.is_zipfile(final_path):
-                safe_extract_zip(final_path, extract_dir)
-                print('Extracted to:', extract_dir)
-                try:
-                    os.remove(final_path)
-                    print('Removed zip:', final_path)
-                except Exception as rm_err:
-                    print(f"[warn] failed to remove zip {final_path}: {rm_err}")
-            else:
-                print(f"[warn] not a zip file: {final_path}")
-        except Exception as ex:
-            print(f"[warn] extract failed for {final_path}: {ex}")
+        if not finish_zip(final_path, extract_dir):
+            raise RuntimeError(f"extract failed for {file_name}")
 
     except Exception as e:
-        print(f"Error downloading plugin from {download_link}: {e}")
-        try:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-        except Exception:
-            pass
-        with _folder_lock:
-            if folder_name in existing_folders:
-                existing_folders.remove(folder_name)
+        kept = f" (kept {part.offset} bytes in {os.path.basename(temp_path)} to resume)" if part.offset else ""
+        print(f"Error downloading plugin from {download_link}: {e}{kept}")
+        if updating:
+            manifest.release(slug)
+        else:
+            with _folder_lock:
+                if folder_name in existing_folders:
+                    existing_folders.remove(folder_name)
         return 0
 
-    time.sleep(random.uniform(0.5, 2))
+    if manifest is not None:
+        if old_folder and old_folder != folder_name:
+            # 버전이 이름에 들어간 옛 폴더(slug.1.0 -> slug.1.1)
+            shutil.rmtree(os.path.join(save_dir, old_folder), ignore_errors=True)
+        manifest.record_download(slug, folder_name, version, download_link, validators, sha256)
+        if updating:
+            manifest.mark_changed(slug)
     return 1
 
 
@@ -186,27 +417,24 @@ def download_plugins_on_page(
     session: requests.Session,
     max_plugins=None,
     counter=None,
+    manifest=None,
 ):
     """
     검색 결과 페이지 하나에서 플러그인 상세 링크들을 모아
     병렬로 download_plugin 을 호출.
     """
-    base_url = f"https://ko.wordpress.org/plugins/search/{target}/page/"
-    url = base_url + str(page_num)
+    url = SEARCH_URL.format(target=target, page=page_num)
     try:
-        resp = session.get(url, timeout=10)
+        resp = limited_get(session, url, timeout=10)
         resp.raise_for_status()
     except Exception as e:
         print(f"Error fetching search page {url}: {e}")
         return []
 
-    soup = BeautifulSoup(resp.content, 'html.parser')
-    entries = soup.find_all('h3', {'class': 'entry-title'})
-    if not entries:
+    links = parse_search_links(resp.content)
+    if not links:
         return []
 
-    links = [e.find('a')['href'] for e in entries if e.find('a')]
-
     # 갯수 제한(max_plugins)이 있으면 초과 시 stop
     if max_plugins and counter is not None:
         remaining = max_plugins - counter[0]
@@ -215,53 +443,121 @@ def download_plugins_on_page(
         links = links[:remaining]
 
     with concurrent.futures.ThreadPoolExecutor(max_workers=3) as ex:
-        futures = [ex.submit(download_plugin, link, existing_folders, session) for link in links]
+        futures = [ex.submit(download_plugin, link, existing_folders, session, manifest) for link in links]
         for f in concurrent.futures.as_completed(futures):
             result = f.result()
             if counter is not None:
                 counter[0] += result
 
-    time.sleep(random.uniform(1, 3))
     return links
 
 
+def download_plugins_from_api(
+    target: str,
+    existing_folders,
+    color_code: str,
+    session: requests.Session,
+    max_plugins=None,
+    manifest=None,
+) -> bool:
+    """
+    plugins info API 로 키워드를 검색해 다운로드한다. 검색 결과의
+    download_link 를 바로 받으므로 상세 페이지를 열지 않는다.
+    첫 페이지부터 API 를 쓸 수 없으면 False(HTML 검색으로 대체).
+    """
+    per_page = min(API_PER_PAGE, max_plugins) if max_plugins else API_PER_PAGE
+    counter = 0
+    page = 1
+    while page <= MAX_SEARCH_PAGES:
+        try:
+            plugins, pages = query_plugins(session, target, page, per_page)
+        except PluginApiError as e:
+            if page == 1:
+                print(f"[warn] plugins API 를 쓸 수 없어 HTML 검색으로 전환합니다 ({target}): {e}")
+                return False
+            print(f"Error querying plugins API page {page} for {target}: {e}")
+            break
+        plugins = [p for p in plugins if p['download_link']]
+        if max_plugins:
+            plugins = plugins[:max_plugins - counter]
+        if not plugins:
+            break
+        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as ex:
+            futures = [
+                ex.submit(download_zip, p['download_link'], existing_folders, session, manifest, p['version'])
+                for p in plugins
+            ]
+            for f in concurrent.futures.as_completed(futures):
+                counter += f.result()
+        print(f'{color_code}Downloaded {len(plugins)} plugins from API page {page} for {target}. ({rate_limiter.describe()}){RESET}')
+        if (max_plugins and counter >= max_plugins) or page >= pages:
+            break
+        page += 1
+    return True
+
+
 def download_plugins_for_target(
     target: str,
     existing_folders,
     color_code: str,
     session: requests.Session,
     max_plugins=None,
+    discovery: str = 'api',
+    manifest=None,
 ):
     """
     특정 키워드에 대해 여러 페이지(최대 50페이지)에서 플러그인을 다운로드.
+    discovery 가 'api' 이면 plugins info API 로 찾고, 첫 페이지부터 API 를
+    쓸 수 없으면 검색 페이지 스크래핑으로 대체한다.
     """
+    if discovery == 'api' and download_plugins_from_api(
+        target, existing_folders, color_code, session, max_plugins, manifest
+    ):
+        return
     page = 1
     counter = [0]
     while True:
-        links = download_plugins_on_page(page, existing_folders, target, session, max_plugins, counter)
+        links = download_plugins_on_page(page, existing_folders, target, session, max_plugins, counter, manifest)
         if not links:
             break
-        print(f'{color_code}Downloaded {len(links)} plugins from page {page} for {target}.{RESET}')
+        print(f'{color_code}Downloaded {len(links)} plugins from page {page} for {target}. ({rate_limiter.describe()}){RESET}')
         page += 1
         if max_plugins and counter[0] >= max_plugins:
             break
-        if page > 50:
+        if page > MAX_SEARCH_PAGES:
             break
 
 
-def download_plugins_for_keywords(keywords, max_plugins=None):
+def print_keywords(keywords):
+    print("키워드에 대한 플러그인을 다운로드 합니다.")
+    print("-------------------------------------------------")
+    for i, t in enumerate(keywords):
+        print(f'{i + 1}. {colors[i % len(colors)]}{t}{RESET}')
+    print("-------------------------------------------------\n")
+
+
+def download_plugins_for_keywords(
+    keywords,
+    max_plugins=None,
+    discovery: str = 'api',
+    rate: float = INITIAL_RATE,
+    max_rate: float = MAX_RATE,
+    update: bool = False,
+    changed_out: str = None,
+):
     """
     여러 키워드에 대해 병렬로 플러그인을 다운로드하는 상위 함수.
     scripts/download_plugins.py 에서 사용.
+    discovery: 'api'(plugins info API, 실패 시 HTML 검색) 또는 'html'.
+    rate / max_rate: rate_limiter 의 처음 / 최대 초당 요청 수.
+    update: 이미 받은 플러그인도 확인해 버전이 바뀐 것만 다시 받는다.
+            바뀐 slug 목록을 출력하고(changed_out 이 있으면 파일로도) 돌려준다.
     """
+    rate_limiter.reset(rate, max_rate)
     ensure_directory(save_dir)
     existing_folders = get_existing_folders(save_dir)
-
-    print("키워드에 대한 플러그인을 다운로드 합니다.")
-    print("-------------------------------------------------")
-    for i, t in enumerate(keywords):
-        print(f'{i + 1}. {colors[i % len(colors)]}{t}{RESET}')
-    print("-------------------------------------------------\n")
+    manifest = PluginManifest(save_dir, update=update)
+    print_keywords(keywords)
 
     session = create_session()
     with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
@@ -273,11 +569,21 @@ def download_plugins_for_keywords(keywords, max_plugins=None):
                 colors[i % len(colors)],
                 session,
                 max_plugins,
+                discovery,
+                manifest,
             )
             for i, t in enumerate(keywords)
         ]
         for _ in concurrent.futures.as_completed(futures):
             pass
+    manifest.save()
+    print(
+        f"[rate] requests={rate_limiter.requests}, throttled={rate_limiter.throttled}, "
+        f"final rate {rate_limiter.describe()}"
+    )
+    if update:
+        manifest.report(changed_out)
+    return sorted(manifest.changed)
 
 
 def interactive_cli():
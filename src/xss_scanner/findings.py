@@ -0,0 +1,312 @@
+"""
+취약점 후보 하나를 표현하는 압축 레코드 모듈.
+
+scan_file_for_xss 는 후보마다 Finding 을 만들고, 위험도/신뢰도로 걸러낸
+뒤 남은 것만 돌려준다. 코드 스니펫, 라인 내용, 설명 문자열처럼 큰 값은
+저장하지 않고 리포터/JSON 출력이 요청할 때 파일을 다시 읽어 만든다.
+
+기존 dict 기반 코드(reporter, dedupe 등)와 호환되도록 v['key'],
+v.get('key') 형태의 조회를 지원한다.
+"""
+
+import mmap
+import os
+from functools import lru_cache
+
+from .patterns import CONTEXT_LINES
+
+# flags 비트
+FLAG_DIRECT_SUPERGLOBAL = 1
+FLAG_GUARD_PRESENT = 2
+
+# to_dict() 가 내보내는 키 순서 (기존 vuln dict 와 동일)
+FINDING_KEYS = (
+    'file',
+    'line_num',
+    'column',
+    'line_content',
+    'context',
+    'tainted_var',
+    'taint_hops',
+    'taint_origin_line',
+    'taint_source',
+    'direct_superglobal',
+    'guard_present',
+    'guard_name',
+    'guard_mismatch',
+    'vulnerability_type',
+    'risk_level',
+    'description',
+    'context_snippet',
+    'confidence',
+    'vulnerability_category',
+)
+
+# 파일 경로 외에 저장되는 필드 (캐시 직렬화 순서)
+_RECORD_FIELDS = (
+    'line_num',
+    'flags',
+    'confidence',
+    'risk_level',
+    'context',
+    'tainted_var',
+    'taint_hops',
+    'taint_origin_line',
+    'taint_source',
+    'guard_name',
+    'guard_mismatch',
+    'vulnerability_category',
+    'column',
+)
+
+# column 이 있는 결과(긴 라인)의 스니펫에 보여줄 앞뒤 글자 수
+COLUMN_SNIPPET_RADIUS = 150
+
+
+@lru_cache(maxsize=8)
+def _read_file_lines(file_path: str):
+    """스니펫 생성용으로 파일 라인을 읽는다(최근 몇 개 파일만 캐시)."""
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            return tuple(f.read().split('\n'))
+    except OSError:
+        return ()
+
+
+def _read_line_window(file_path: str, line_num: int, column: int, radius: int):
+    """
+    긴 라인(minified 등)에서 column 주변 [column-radius, column+radius) 바이트만
+    파일 전체를 읽지 않고 mmap 으로 잘라 온다.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return ''
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                start = 0
+                for _ in range(line_num - 1):
+                    nl = mm.find(b'\n', start)
+                    if nl == -1:
+                        return ''
+                    start = nl + 1
+                end = mm.find(b'\n', start)
+                if end == -1:
+                    end = size
+                lo = max(start, start + column - radius)
+                hi = min(end, start + column + radius)
+                return mm[lo:hi].decode('utf-8', errors='ignore')
+    except (OSError, ValueError):
+        return ''
+
+
+def format_code_context(get_line, line_count: int, line_num: int, context_size: int = CONTEXT_LINES) -> str:
+    """
+    라인 주변 코드 문맥을 예쁘게 문자열로 만든다.
+    get_line(n) 은 1부터 시작하는 라인 번호의 원본 텍스트를 돌려준다.
+    """
+    start = max(0, line_num - context_size - 1)
+    end = min(line_count, line_num + context_size)
+    context_lines = []
+    for i in range(start, end):
+        marker = '>>>' if i == line_num - 1 else '   '
+        context_lines.append(f"{marker}{i + 1}: {get_line(i + 1).rstrip()}")
+    return '\n'.join(context_lines)
+
+
+class Finding:
+    """
+    취약점 후보 압축 레코드.
+
+    파일 경로, 라인, 플래그 비트, 점수와 짧은 분석 결과만 들고 있고
+    line_content / context_snippet / description / vulnerability_type 은
+    조회 시점에 만든다.
+    """
+
+    __slots__ = ('file',) + _RECORD_FIELDS
+
+    def __init__(
+        self,
+        file,
+        line_num,
+        flags=0,
+        confidence=0,
+        risk_level='LOW',
+        context='html',
+        tainted_var=None,
+        taint_hops=None,
+        taint_origin_line=None,
+        taint_source=None,
+        guard_name=None,
+        guard_mismatch=None,
+        vulnerability_category=None,
+        column=None,
+    ):
+        self.file = file
+        self.line_num = line_num
+        self.flags = flags
+        self.confidence = confidence
+        self.risk_level = risk_level
+        self.context = context
+        self.tainted_var = tainted_var
+        self.taint_hops = taint_hops
+        self.taint_origin_line = taint_origin_line
+        self.taint_source = taint_source
+        self.guard_name = guard_name
+        self.guard_mismatch = guard_mismatch
+        self.vulnerability_category = vulnerability_category
+        # 긴 라인에서 찾은 결과는 라인 안의 바이트 오프셋(0부터)을 함께 기록한다.
+        self.column = column
+
+    # --- 플래그 ---
+
+    @property
+    def direct_superglobal(self) -> bool:
+        return bool(self.flags & FLAG_DIRECT_SUPERGLOBAL)
+
+    @property
+    def guard_present(self) -> bool:
+        return bool(self.flags & FLAG_GUARD_PRESENT)
+
+    # --- 지연 생성 필드 ---
+
+    @property
+    def vulnerability_type(self) -> str:
+        if self.direct_superglobal:
+            kind = 'Direct Input Output'
+        elif self.tainted_var:
+            kind = 'Tainted Output'
+        else:
+            kind = 'Suspicious Output'
+        return 'XSS - ' + kind
+
+    @property
+    def description(self) -> str:
+        if self.direct_superglobal:
+            return 'Sink directly outputs superglobal input.'
+        if self.tainted_var:
+            return f'Variable {self.tainted_var} is tainted (source at line {self.taint_origin_line}).'
+        return 'Sink found near source token but taint not resolved — 추가 분석 권장.'
+
+    @property
+    def line_content(self) -> str:
+        if self.column is not None:
+            return _read_line_window(self.file, self.line_num, self.column, COLUMN_SNIPPET_RADIUS).strip()[:300]
+        lines = _read_file_lines(self.file)
+        if 0 < self.line_num <= len(lines):
+            return lines[self.line_num - 1].strip()[:300]
+        return ''
+
+    @property
+    def context_snippet(self) -> str:
+        if self.column is not None:
+            text = _read_line_window(self.file, self.line_num, self.column, COLUMN_SNIPPET_RADIUS)
+            return f">>>{self.line_num}:{self.column}: {text.strip()}"
+        lines = _read_file_lines(self.file)
+        return format_code_context(lambda n: lines[n - 1], len(lines), self.line_num)
+
+    # --- dict 호환 ---
+
+    def __getitem__(self, key):
+        if key not in FINDING_KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        if key not in FINDING_KEYS:
+            return default
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in FINDING_KEYS
+
+    def keys(self):
+        return FINDING_KEYS
+
+    def to_dict(self) -> dict:
+        """모든 필드(스니펫/설명 포함)를 채운 dict."""
+        return {k: getattr(self, k) for k in FINDING_KEYS}
+
+    # --- 직렬화 ---
+
+    def to_record(self) -> list:
+        """파일 경로를 뺀 압축 레코드(캐시/프로세스 간 전달용)."""
+        return [getattr(self, k) for k in _RECORD_FIELDS]
+
+    @classmethod
+    def from_record(cls, file, record):
+        return cls(file, *record)
+
+    def with_file(self, file) -> 'Finding':
+        """같은 내용의 다른 경로용 복사본."""
+        return Finding.from_record(file, self.to_record())
+
+    def __reduce__(self):
+        return (Finding.from_record, (self.file, self.to_record()))
+
+    def __repr__(self):
+        return f"Finding({self.file!r}, line={self.line_num}, risk={self.risk_level}, confidence={self.confidence})"
+
+
+def _longest_line(file_path: str):
+    """(가장 긴 라인 번호, 그 길이(bytes)) — 파일을 청크 단위로 한 번 읽는다."""
+    best_num, best_len = 0, 0
+    num, cur = 1, 0
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            start = 0
+            while True:
+                nl = chunk.find(b'\n', start)
+                if nl == -1:
+                    cur += len(chunk) - start
+                    break
+                cur += nl - start
+                if cur > best_len:
+                    best_num, best_len = num, cur
+                num += 1
+                cur = 0
+                start = nl + 1
+    if cur > best_len:
+        best_num, best_len = num, cur
+    return best_num, best_len
+
+
+class FileTimeout:
+    """
+    시간 예산을 넘겨 분석을 중단한 파일 기록.
+
+    원인을 바로 짚을 수 있도록 파일 크기와 가장 긴 라인(번호, 길이)을 함께
+    남긴다. killed 는 소프트 예산이 듣지 않아 감시 스레드가 워커를 죽였는지.
+    결과 캐시에는 저장하지 않는다(예산에 따라 달라지므로).
+    """
+
+    __slots__ = ('file', 'size', 'longest_line', 'longest_length', 'budget', 'killed')
+
+    def __init__(self, file, size=0, longest_line=0, longest_length=0, budget=0.0, killed=False):
+        self.file = file
+        self.size = size
+        self.longest_line = longest_line
+        self.longest_length = longest_length
+        self.budget = budget
+        self.killed = killed
+
+    @classmethod
+    def for_path(cls, file, budget: float, killed: bool = False) -> 'FileTimeout':
+        try:
+            size = os.path.getsize(file)
+            line, length = _longest_line(file)
+        except OSError:
+            size, line, length = 0, 0, 0
+        return cls(file, size, line, length, budget, killed)
+
+    def with_file(self, file) -> 'FileTimeout':
+        return FileTimeout(file, self.size, self.longest_line, self.longest_length, self.budget, self.killed)
+
+    def to_dict(self) -> dict:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __reduce__(self):
+        return (FileTimeout, tuple(getattr(self, k) for k in self.__slots__))
+
+    def __repr__(self):
+        return f"FileTimeout({self.file!r}, size={self.size}, longest_line={self.longest_line}:{self.longest_length})"
@@ -0,0 +1,338 @@
+"""
+include/require 의존 그래프 모듈.
+
+컨트롤러 파일에서 `$var = $_REQUEST[...]` 를 만든 뒤 템플릿을 include 하면
+템플릿은 같은 스코프에서 실행되므로 $var 가 그대로 tainted 다. 파일을 하나씩
+따로 분석하면 이 흐름을 놓치므로 플러그인 단위로 다음을 한다.
+
+1. find_includes / find_defines : 파일마다 include/include_once/require/
+   require_once 의 경로 식 중 상수로 풀리는 것(문자열 리터럴, __DIR__,
+   __FILE__, dirname(), plugin_dir_path(), define() 상수와 '.' 연결)을
+   가상 경로로 기록한다. 파일 내용에만 의존하므로 함수 지역 요약 레코드
+   (interproc.summarize_source)에 함께 저장해 내용 해시로 메모이즈한다.
+2. build_include_graph : 가상 경로를 실제 경로로 풀어 플러그인 안 파일 사이의
+   간선(include 하는 파일 -> include 되는 파일)을 만든다.
+3. topological_waves : include 하는 파일이 먼저 오도록 위상 순서로 묶는다.
+   한 파일의 진입 taint 는 그 파일을 include 하는 모든 파일의 include 지점
+   taint 를 합친 것이므로, 위상 순서대로 처리하면 공통 헤더처럼 여러 곳에서
+   include 되는 파일도 진입 taint 가 모두 모인 뒤 한 번만 분석된다.
+4. include_exports : 파일 하나를 진입 taint 로 분석해 include 지점마다
+   tainted 인 변수(내보내는 전역 taint)를 돌려준다. (내용 해시, 진입 taint)
+   로 메모이즈한다.
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+
+from .analyzer import MaskedSource, analyze_file_taint, stage_timer
+from .dataflow import match_brackets, split_call_args
+from .lexer import T_CLOSE_TAG, T_IDENT, T_NUMBER, T_OP, T_STRING
+
+INCLUDE_KEYWORDS = frozenset(['include', 'include_once', 'require', 'require_once'])
+
+# 파일 위치에 의존하는 경로는 이 가상 경로 기준으로 기록해 두었다가
+# build_include_graph 에서 실제 디렉터리로 바꾼다(dirname() 을 8단계까지 허용).
+VIRTUAL_ROOT = '/@0'
+VIRTUAL_DIR = VIRTUAL_ROOT + '/@1/@2/@3/@4/@5/@6/@7/@8'
+VIRTUAL_FILE = VIRTUAL_DIR + '/@file.php'
+# define() 상수 참조 표시: '\x00이름\x00' + 나머지 경로
+CONST_MARK = '\x00'
+
+# 경로로 보지 않는 상수(풀 수 없는 WordPress 상수 포함)
+_NON_PATH_CONSTANTS = frozenset(['true', 'false', 'null', 'abspath', 'wp_plugin_dir', 'wp_content_dir'])
+# 디렉터리 경로를 그대로 돌려주거나 끝 '/' 만 바꾸는 함수
+_PATH_FUNCS = frozenset(['plugin_dir_path', 'trailingslashit', 'untrailingslashit', 'realpath', 'wp_normalize_path'])
+
+
+def _is_op(tok, text: str) -> bool:
+    return tok.kind == T_OP and tok.text == text
+
+
+def _literal(tok):
+    """변수 보간이 없는 문자열 리터럴의 내용(없으면 None)."""
+    text = tok.text
+    if len(text) < 2 or text[0] != text[-1]:
+        return None
+    body = text[1:-1]
+    if text[0] == "'":
+        return body.replace("\\'", "'").replace('\\\\', '\\')
+    if text[0] == '"' and '$' not in body:
+        return body.replace('\\"', '"').replace('\\\\', '\\')
+    return None
+
+
+def _eval_call(name: str, tokens, open_idx: int, match):
+    args = split_call_args(tokens, open_idx, match)
+    if not args:
+        return None
+    inner = eval_path(tokens, args[0][0], args[0][1], match)
+    if inner is None or (name == 'dirname' and inner.startswith(CONST_MARK)):
+        return None
+    if name == 'dirname':
+        levels = 1
+        if len(args) > 1:
+            a, b = args[1]
+            if b - a != 1 or tokens[a].kind != T_NUMBER or not tokens[a].text.isdigit():
+                return None
+            levels = int(tokens[a].text)
+        for _ in range(levels):
+            inner = posixpath.dirname(inner.rstrip('/') or '/')
+        return inner
+    if name == 'plugin_dir_path':
+        return posixpath.dirname(inner) + '/'
+    if name == 'trailingslashit':
+        return inner.rstrip('/') + '/'
+    if name == 'untrailingslashit':
+        return inner.rstrip('/')
+    return inner
+
+
+def _eval_part(tokens, a: int, b: int, match):
+    tok = tokens[a]
+    if b - a == 1:
+        if tok.kind == T_STRING:
+            return _literal(tok)
+        if tok.kind == T_IDENT:
+            name = tok.text
+            if name == '__DIR__':
+                return VIRTUAL_DIR
+            if name == '__FILE__':
+                return VIRTUAL_FILE
+            if name.lower() not in _NON_PATH_CONSTANTS and not name.startswith('__'):
+                return CONST_MARK + name + CONST_MARK
+        return None
+    if _is_op(tok, '(') and match[a] == b - 1:
+        return eval_path(tokens, a + 1, b - 1, match)
+    if (
+        tok.kind == T_IDENT and _is_op(tokens[a + 1], '(') and match[a + 1] == b - 1
+        and (tok.text.lower() == 'dirname' or tok.text.lower() in _PATH_FUNCS)
+    ):
+        return _eval_call(tok.text.lower(), tokens, a + 1, match)
+    return None
+
+
+def eval_path(tokens, a: int, b: int, match):
+    """
+    경로 식 tokens[a:b] 를 상수로 풀어 가상 경로 문자열을 돌려준다.
+    '.' 로 이은 부분마다 _eval_part 로 풀고, 하나라도 못 풀면 None.
+    """
+    while a < b and _is_op(tokens[a], '(') and match[a] == b - 1:
+        a, b = a + 1, b - 1
+    if a >= b:
+        return None
+    pieces = []
+    start = k = a
+    while k < b:
+        tok = tokens[k]
+        if tok.kind == T_OP:
+            if tok.text in '([{' and match[k] > k:
+                k = match[k]
+            elif tok.text == '.':
+                pieces.append((start, k))
+                start = k + 1
+        k += 1
+    pieces.append((start, b))
+
+    value = ''
+    for i, (pa, pb) in enumerate(pieces):
+        if pa >= pb:
+            return None
+        part = _eval_part(tokens, pa, pb, match)
+        if part is None:
+            return None
+        # 상수/가상 경로는 식의 맨 앞에만 올 수 있다.
+        if i and (part.startswith(CONST_MARK) or part.startswith(VIRTUAL_ROOT)):
+            return None
+        value += part
+    return value
+
+
+def _expr_end(tokens, k: int, match) -> int:
+    """k 에서 시작하는 식의 끝(';' / 닫는 태그 / 바깥 괄호 / ',' 앞)."""
+    n = len(tokens)
+    while k < n:
+        tok = tokens[k]
+        if tok.kind == T_CLOSE_TAG:
+            return k
+        if tok.kind == T_OP:
+            if tok.text in '([{':
+                if match[k] < 0:
+                    return k
+                k = match[k]
+            elif tok.text in (';', ',', ')', ']', '}'):
+                return k
+        k += 1
+    return n
+
+
+def find_includes(tokens, match) -> list:
+    """include/require 문 중 경로가 상수로 풀리는 것 -> [[라인, 가상 경로]]."""
+    found = []
+    for k, tok in enumerate(tokens):
+        if tok.kind != T_IDENT or tok.text.lower() not in INCLUDE_KEYWORDS:
+            continue
+        if k and tokens[k - 1].kind == T_OP and tokens[k - 1].text in ('->', '?->', '::'):
+            continue
+        value = eval_path(tokens, k + 1, _expr_end(tokens, k + 1, match), match)
+        if value:
+            found.append([tok.line, value])
+    return found
+
+
+def find_defines(tokens, match) -> dict:
+    """define('이름', 경로 식) 중 경로로 풀리는 것 -> {이름: 가상 경로}."""
+    found = {}
+    for k in range(len(tokens) - 1):
+        tok = tokens[k]
+        if tok.kind != T_IDENT or tok.text.lower() != 'define' or not _is_op(tokens[k + 1], '('):
+            continue
+        args = split_call_args(tokens, k + 1, match)
+        if len(args) < 2 or args[0][1] - args[0][0] != 1 or tokens[args[0][0]].kind != T_STRING:
+            continue
+        name = _literal(tokens[args[0][0]])
+        value = eval_path(tokens, args[1][0], args[1][1], match)
+        if name and value and name not in found:
+            found[name] = value
+    return found
+
+
+def scan_includes(tokens) -> dict:
+    """파일 하나의 include 레코드 {'includes': [[라인, 가상 경로]], 'defines': {...}}."""
+    match = match_brackets(tokens)
+    return {'includes': find_includes(tokens, match), 'defines': find_defines(tokens, match)}
+
+
+# --- 플러그인 단위 그래프 ---
+
+
+def _materialize(value: str, base_dir: str, constants: dict):
+    """가상 경로를 base_dir(그 식이 있는 파일의 디렉터리) 기준 실제 경로로."""
+    if value.startswith(CONST_MARK):
+        end = value.find(CONST_MARK, 1)
+        base = constants.get(value[1:end])
+        return None if base is None else base + value[end + 1:]
+    if value.startswith(VIRTUAL_ROOT):
+        rel = posixpath.relpath(value, VIRTUAL_DIR)
+        path = os.path.normpath(os.path.join(base_dir, *rel.split('/')))
+        return path + os.sep if value.endswith('/') else path
+    if posixpath.isabs(value):
+        return value
+    return os.path.join(base_dir, value)
+
+
+def _resolve_constants(records: dict) -> dict:
+    """플러그인 안 define() 경로 상수 -> 실제 경로(다른 상수를 참조하면 반복해서 푼다)."""
+    pending = {}
+    for fp in sorted(records):
+        for name, value in records[fp].get('defines', {}).items():
+            pending.setdefault(name, (value, os.path.dirname(fp)))
+    constants = {}
+    changed = True
+    while changed:
+        changed = False
+        for name, (value, base_dir) in list(pending.items()):
+            path = _materialize(value, base_dir, constants)
+            if path is not None:
+                constants[name] = path
+                del pending[name]
+                changed = True
+    return constants
+
+
+def _path_key(path: str) -> str:
+    return os.path.normcase(os.path.normpath(path))
+
+
+def build_include_graph(records: dict) -> dict:
+    """
+    {파일 경로: include 레코드} -> {파일 경로: [(라인, include 되는 파일 경로)]}.
+    플러그인 안 파일로 풀리는 include 만 간선이 된다.
+    """
+    known = {_path_key(fp): fp for fp in records}
+    constants = _resolve_constants(records)
+    graph = {}
+    for fp, rec in records.items():
+        edges = []
+        base_dir = os.path.dirname(fp)
+        for line, value in rec.get('includes', []):
+            path = _materialize(value, base_dir, constants)
+            target = known.get(_path_key(path)) if path else None
+            if target is not None and target != fp:
+                edges.append((line, target))
+        graph[fp] = edges
+    return graph
+
+
+def topological_waves(graph: dict) -> list:
+    """
+    include 하는 파일이 include 되는 파일보다 먼저 오도록 파일들을 묶는다.
+    같은 묶음 안의 파일은 서로 의존하지 않으므로 병렬로 처리할 수 있다.
+    순환 include 는 남은 파일 중 경로가 가장 앞선 것의 들어오는 간선을
+    끊어 풀어낸다.
+    """
+    indegree = {fp: 0 for fp in graph}
+    for edges in graph.values():
+        for target in {t for _, t in edges}:
+            indegree[target] += 1
+    waves = []
+    remaining = set(graph)
+    ready = sorted(fp for fp in remaining if indegree[fp] == 0)
+    while remaining:
+        if not ready:
+            ready = [min(remaining)]
+        waves.append(ready)
+        remaining.difference_update(ready)
+        nxt = []
+        for fp in ready:
+            for target in {t for _, t in graph[fp]}:
+                if target in remaining:
+                    indegree[target] -= 1
+                    if indegree[target] == 0:
+                        nxt.append(target)
+        ready = sorted(nxt)
+    return waves
+
+
+def merge_entry_taint(entry: dict, exported: dict, origin: str):
+    """
+    include 지점의 taint(exported)를 include 되는 파일의 진입 taint(entry)에
+    합친다. 같은 변수는 hop 이 작은 쪽을 남긴다. 다른 파일에서 시작한 taint 는
+    소스 뒤에 ' @ 시작 파일' 을 붙여 둔다.
+    """
+    for var, (source, line, hops) in exported.items():
+        if source is not None and ' @ ' not in source:
+            source = f"{source} @ {origin}"
+        cur = entry.get(var)
+        if cur is None or hops < cur[2]:
+            entry[var] = [source, line, hops]
+
+
+def entry_fingerprint(entry: dict) -> str:
+    """진입 taint 의 해시(스캔 결과 캐시/중복 제거 키에 덧붙인다)."""
+    payload = json.dumps(entry, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+
+
+def include_exports(file_path: str, lines, entry_taint=None, summaries=None) -> dict:
+    """
+    파일을 진입 taint 로 분석해 include 지점(lines)마다 tainted 인 변수를 돌려준다.
+    -> {'라인': {변수: [소스, 라인, hop]}}
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+        src = MaskedSource(content)
+        taint = analyze_file_taint(src, max_hops=3, summaries=summaries, seed=entry_taint)
+        with stage_timer('includes'):
+            exports = {}
+            for ln in sorted(set(lines)):
+                tainted = taint.tainted_at(ln)
+                exports[str(ln)] = {
+                    var: [info['source'], info['line'], info['hops']] for var, info in sorted(tainted.items())
+                }
+            return exports
+    except Exception as e:
+        print(f"Error analyzing includes of {file_path}: {e}")
+        return {}
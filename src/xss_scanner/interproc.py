@@ -0,0 +1,322 @@
+"""
+플러그인 단위 함수 요약(interprocedural taint) 모듈.
+
+파일마다 이름 있는 함수/메서드의 "지역 요약"을 만든다.
+    - returns        : 반환값으로 흐르는 파라미터 인덱스
+    - returns_source : 반환값이 입력 소스($_GET 등)에서 오는지
+    - returns_guard  : 모든 return 이 같은 출력 가드(esc_html 등)로 감싸여 있으면 그 이름
+    - sinks          : 가드 없이 싱크로 흐르는 파라미터 인덱스와 출력 컨텍스트
+    - guarded        : 싱크로 흐르지만 가드가 적용된 파라미터 인덱스
+    - call_args / return_args / return_via : 다른 함수 호출로 넘어가는 흐름
+지역 요약은 파일 내용에만 의존하므로 내용 해시로 메모이즈(ScanCache)한다.
+include/require 경로와 define() 경로 상수(includes.scan_includes)도 같은
+레코드에 담는다.
+
+build_summary_table() 은 플러그인 안 모든 파일의 지역 요약을 합치고
+호출 관계를 따라 고정점까지 합성한다. 함수 본문을 다시 분석하지 않으므로
+플러그인 크기에 거의 선형이다. 호출 지점에서는 함수 이름(소문자)으로 찾는다.
+"""
+
+import hashlib
+import json
+import re
+
+from .analyzer import (
+    MaskedSource,
+    rule_lines,
+    detect_context_for_line,
+    check_guards_for_lines,
+    stage_timer,
+    _VAR_RE,
+)
+from .dataflow import analyze_taint, guard_call, is_sanitizing_expr, match_brackets, split_call_args
+from .includes import scan_includes
+from .lexer import T_CLOSE_TAG, T_IDENT, T_OP, T_OPEN_TAG, T_VARIABLE, MASKED_KINDS
+from .patterns import SOURCE_PATTERNS, SOURCE_RE
+
+_SOURCE_RES = [(sp, re.compile(sp, re.IGNORECASE)) for sp in SOURCE_PATTERNS]
+# 파라미터 seed 의 출처 표시
+PARAM_SOURCE = 'param'
+
+EMPTY_RECORD = {'functions': {}, 'calls': [], 'includes': [], 'defines': {}}
+
+
+def find_functions(tokens, match):
+    """
+    이름 있는 함수/메서드 선언 목록.
+    -> [(이름(소문자), 파라미터 변수 리스트, 본문 시작, 본문 끝, 선언 라인)]
+    """
+    found = []
+    n = len(tokens)
+    for k in range(n - 2):
+        tok = tokens[k]
+        if tok.kind != T_IDENT or tok.text.lower() != 'function':
+            continue
+        p = k + 1
+        if tokens[p].kind == T_OP and tokens[p].text == '&':
+            p += 1
+        if p + 1 >= n or tokens[p].kind != T_IDENT:
+            continue
+        name = tokens[p].text.lower()
+        if tokens[p + 1].kind != T_OP or tokens[p + 1].text != '(' or match[p + 1] < 0:
+            continue
+        close = match[p + 1]
+        params = [t.text for t in tokens[p + 2:close] if t.kind == T_VARIABLE]
+        q = close + 1
+        while q < n and not (tokens[q].kind == T_OP and tokens[q].text in ('{', ';')):
+            q += 1
+        if q >= n or tokens[q].text != '{' or match[q] < 0:
+            continue
+        found.append((name, params, q + 1, match[q], tok.line))
+    return found
+
+
+def _iter_calls(tokens):
+    """(함수 이름(소문자), '(' 인덱스) — 선언/new 는 제외."""
+    for k in range(len(tokens) - 1):
+        tok = tokens[k]
+        if tok.kind != T_IDENT:
+            continue
+        nxt = tokens[k + 1]
+        if nxt.kind != T_OP or nxt.text != '(':
+            continue
+        if k and tokens[k - 1].kind == T_IDENT and tokens[k - 1].text.lower() in ('function', 'new'):
+            continue
+        yield tok.text.lower(), k + 1
+
+
+def _return_ranges(tokens):
+    """return 문의 식 범위 [(시작, 끝)]."""
+    ranges = []
+    n = len(tokens)
+    for k, tok in enumerate(tokens):
+        if tok.kind != T_IDENT or tok.text.lower() != 'return':
+            continue
+        depth = 0
+        e = k + 1
+        while e < n:
+            t = tokens[e]
+            if t.kind == T_OP:
+                if t.text in '([{':
+                    depth += 1
+                elif t.text in ')]}':
+                    depth -= 1
+                    if depth < 0:
+                        break
+                elif t.text == ';' and depth == 0:
+                    break
+            elif t.kind in (T_CLOSE_TAG, T_OPEN_TAG):
+                break
+            e += 1
+        ranges.append((k + 1, e))
+    return ranges
+
+
+def _tainted_in(tokens, a, b, result):
+    """tokens[a:b] 안에 result 기준 tainted 인 변수의 taint 정보(없으면 None)."""
+    for t in tokens[a:b]:
+        if t.kind == T_VARIABLE:
+            info = result.lookup(t.line, t.text)
+            if info is not None:
+                return info
+    return None
+
+
+def _source_in(tokens, a, b):
+    right = ' '.join(t.text for t in tokens[a:b] if t.kind not in MASKED_KINDS)
+    if SOURCE_RE.search(right):
+        for sp, sp_re in _SOURCE_RES:
+            if sp_re.search(right):
+                return sp.lower()
+    return None
+
+
+def _summarize_function(body, params, line, src, sink_lines, contexts, guards):
+    body_match = match_brackets(body)
+    # 정화 함수로 감싼 return 은 반환값 흐름에서 뺀다.
+    returns_at = [(a, b) for a, b in _return_ranges(body) if not is_sanitizing_expr(body, a, b, body_match)]
+    # 가드로 감싼 return 은 흐름으로 남기되, 호출 지점에 그 가드를 알린다.
+    return_guards = {guard_call(body, a, b, body_match) for a, b in returns_at}
+    returns_guard = return_guards.pop() if len(return_guards) == 1 else None
+    calls = list(_iter_calls(body))
+    first, last = body[0].line, body[-1].line
+    body_sinks = [ln for ln in sink_lines if first <= ln <= last]
+    sink_vars = {ln: _VAR_RE.findall(src.masked_line(ln)) for ln in body_sinks}
+
+    def _in_return(idx):
+        return any(a <= idx < b for a, b in returns_at)
+
+    return_via = sorted({name for name, o in calls if _in_return(o)})
+
+    # 파라미터 없이: 반환값이 입력 소스에서 오는지
+    returns_source = None
+    base = analyze_taint(body)
+    for a, b in returns_at:
+        returns_source = _source_in(body, a, b)
+        if returns_source is None:
+            info = _tainted_in(body, a, b, base)
+            if info is not None:
+                returns_source = info['source']
+        if returns_source is not None:
+            break
+
+    returns, sinks, guarded = [], {}, set()
+    call_args, return_args = [], []
+    for i, param in enumerate(params):
+        result = analyze_taint(body, seed={param: (PARAM_SOURCE, line)}, detect_sources=False)
+        if any(_tainted_in(body, a, b, result) for a, b in returns_at):
+            returns.append(i)
+        for ln in body_sinks:
+            if any(result.lookup(ln, v) is not None for v in sink_vars[ln]):
+                present, _, mismatch = guards[ln]
+                if present and not mismatch:
+                    guarded.add(i)
+                else:
+                    sinks.setdefault(i, contexts[ln])
+        for name, o in calls:
+            for j, (a, b) in enumerate(split_call_args(body, o, body_match)):
+                if _tainted_in(body, a, b, result) is not None:
+                    call_args.append([name, j, i])
+                    if _in_return(o):
+                        return_args.append([name, j, i])
+
+    return {
+        'params': params,
+        'line': line,
+        'returns': returns,
+        'returns_source': returns_source,
+        'returns_guard': returns_guard,
+        'sinks': sorted([i, ctx] for i, ctx in sinks.items()),
+        'guarded': sorted(guarded - set(sinks)),
+        'call_args': call_args,
+        'return_args': return_args,
+        'return_via': return_via,
+    }
+
+
+def _merge_local(a: dict, b: dict) -> dict:
+    """같은 이름의 함수(다른 클래스의 메서드 등)는 흐름을 합친다."""
+    sinks = dict((i, c) for i, c in a['sinks'])
+    for i, c in b['sinks']:
+        sinks.setdefault(i, c)
+    return {
+        'params': a['params'] if len(a['params']) >= len(b['params']) else b['params'],
+        'line': a['line'],
+        'returns': sorted(set(a['returns']) | set(b['returns'])),
+        'returns_source': a['returns_source'] or b['returns_source'],
+        'returns_guard': a['returns_guard'] if a['returns_guard'] == b['returns_guard'] else None,
+        'sinks': sorted([i, c] for i, c in sinks.items()),
+        'guarded': sorted((set(a['guarded']) | set(b['guarded'])) - set(sinks)),
+        'call_args': a['call_args'] + b['call_args'],
+        'return_args': a['return_args'] + b['return_args'],
+        'return_via': sorted(set(a['return_via']) | set(b['return_via'])),
+    }
+
+
+def summarize_source(src: MaskedSource) -> dict:
+    """
+    파일 하나의 지역 요약 레코드.
+    {'functions': {이름: 요약}, 'calls': [이 파일이 호출하는 함수 이름],
+     'includes': [[라인, 가상 경로]], 'defines': {상수: 가상 경로}}
+    """
+    tokens = src.tokens
+    match = match_brackets(tokens)
+    functions = find_functions(tokens, match)
+    calls = sorted({name for name, _ in _iter_calls(tokens)})
+    record = {'functions': {}, 'calls': calls}
+    record.update(scan_includes(tokens))
+    if not functions:
+        return record
+
+    _, sink_lines = rule_lines(src)
+    sink_lines = sorted(sink_lines)
+    contexts = {ln: detect_context_for_line(src, ln) for ln in sink_lines}
+    guards = check_guards_for_lines(src, contexts)
+
+    summaries = {}
+    for name, params, a, b, line in functions:
+        if a >= b:
+            continue
+        summary = _summarize_function(tokens[a:b], params, line, src, sink_lines, contexts, guards)
+        summaries[name] = _merge_local(summaries[name], summary) if name in summaries else summary
+    record['functions'] = summaries
+    return record
+
+
+def summarize_file(file_path: str) -> dict:
+    """PHP 파일의 지역 요약 레코드(읽을 수 없거나 PHP 가 아니면 빈 레코드)."""
+    if not file_path.lower().endswith('.php'):
+        return EMPTY_RECORD
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+        with stage_timer('summaries'):
+            return summarize_source(MaskedSource(content))
+    except Exception as e:
+        print(f"Error summarizing {file_path}: {e}")
+        return EMPTY_RECORD
+
+
+def build_summary_table(records) -> dict:
+    """
+    지역 요약 레코드들을 합쳐 플러그인 전체 함수 요약 테이블을 만든다.
+    호출 관계(call_args / return_args / return_via)를 따라 고정점까지 합성한다.
+    -> {이름: {'returns': [...], 'returns_source': ..., 'sinks': [[인덱스, 컨텍스트]]}}
+    """
+    local = {}
+    for rec in records:
+        for name, s in rec.get('functions', {}).items():
+            local[name] = _merge_local(local[name], s) if name in local else s
+
+    work = {
+        name: {
+            'returns': set(s['returns']),
+            'returns_source': s['returns_source'],
+            'returns_guard': s['returns_guard'],
+            'sinks': dict((i, c) for i, c in s['sinks']),
+        }
+        for name, s in local.items()
+    }
+    changed = True
+    while changed:
+        changed = False
+        for name, s in local.items():
+            cur = work[name]
+            if cur['returns_source'] is None:
+                for g in s['return_via']:
+                    callee = work.get(g)
+                    if callee is not None and callee['returns_source'] is not None:
+                        cur['returns_source'] = callee['returns_source']
+                        changed = True
+                        break
+            for g, j, i in s['return_args']:
+                callee = work.get(g)
+                if callee is not None and j in callee['returns'] and i not in cur['returns']:
+                    cur['returns'].add(i)
+                    changed = True
+            for g, j, i in s['call_args']:
+                callee = work.get(g)
+                if callee is not None and j in callee['sinks'] and i not in cur['sinks']:
+                    cur['sinks'][i] = callee['sinks'][j]
+                    changed = True
+
+    return {
+        name: {
+            'returns': sorted(s['returns']),
+            'returns_source': s['returns_source'],
+            'returns_guard': s['returns_guard'],
+            'sinks': sorted([i, c] for i, c in s['sinks'].items()),
+        }
+        for name, s in work.items()
+    }
+
+
+def relevant_summaries(table: dict, calls) -> dict:
+    """파일이 호출하는 함수들의 요약만 골라낸다."""
+    return {name: table[name] for name in calls if name in table}
+
+
+def summary_fingerprint(summaries: dict) -> str:
+    """호출하는 함수 요약의 해시(스캔 결과 캐시/중복 제거 키에 덧붙인다)."""
+    payload = json.dumps(summaries, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
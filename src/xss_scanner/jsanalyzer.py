@@ -0,0 +1,336 @@
+"""
+JavaScript 전용 DOM XSS 분석 모듈.
+
+.js 파일을 PHP 토크나이저/정규식으로 보지 않고 jslexer.tokenize_js 토큰
+위에서 분석한다.
+
+- 소스: DOM_SOURCES(location.hash, document.URL 등)와 message 이벤트
+  핸들러 파라미터의 .data(postMessage 로 들어온 값)
+- 싱크: JS_SINK_HINT 를 호출/대입 형태로 나눈 JS_CALL_SINKS /
+  JS_ASSIGN_SINKS, JSX 의 dangerouslySetInnerHTML
+- 흐름: 토큰을 앞에서부터 한 번 훑으며 var/let/const 선언과 대입을
+  따라 변수별 taint(소스, 라인, hop)를 갱신한다. 정화 함수
+  (JS_SANITIZER_FUNCS) 호출 결과는 taint 를 끊는다.
+
+PHP 쪽 dataflow 처럼 분기/루프를 나누지 않는 흐름 무관(flow-insensitive
+에 가까운) 근사이며, 결과는 analyzer.findings_from_sites 로 Finding 이 된다.
+"""
+
+import os
+
+from .analyzer import (
+    findings_from_sites,
+    has_long_lines,
+    resolve_scan_policy,
+    scan_file_shallow,
+    stage_timer,
+)
+from .dataflow import split_call_args
+from .jslexer import JS_TRIVIA_KINDS, T_JSX_ATTR, T_REGEX, T_TEMPLATE, tokenize_js
+from .lexer import T_IDENT, T_NUMBER, T_OP, T_STRING
+from .patterns import (
+    DOM_SOURCES,
+    JS_ASSIGN_SINKS,
+    JS_CALL_SINKS,
+    JS_MESSAGE_SOURCE,
+    JS_SANITIZER_FUNCS,
+)
+
+JS_CATEGORY = 'DOM-based XSS'
+# 변수 간 전파 최대 hop 수(PHP 쪽 analyze_file_taint 의 max_hops 와 같다)
+MAX_HOPS = 3
+
+_OPENERS = {'(': ')', '[': ']', '{': '}', '${': '}'}
+_CLOSERS = frozenset([')', ']', '}'])
+_MEMBER_OPS = frozenset(['.', '?.'])
+_SANITIZERS = frozenset(JS_SANITIZER_FUNCS)
+# ASI 판정: 앞 줄이 이 토큰으로 끝나고 다음 줄이 피연산자로 시작하면 문장이 끝난 것으로 본다.
+_OPERAND_KINDS = frozenset([T_IDENT, T_NUMBER, T_STRING, T_REGEX, T_TEMPLATE])
+_OPERAND_END_OPS = frozenset([')', ']', '}', '`', '++', '--'])
+_NO_GUARD = (False, None, None)
+
+
+def match_js_brackets(tokens):
+    """괄호 짝 인덱스 리스트('${' 도 여는 괄호로 본다, 짝이 없으면 -1)."""
+    match = [-1] * len(tokens)
+    stack = []
+    for i, t in enumerate(tokens):
+        if t.kind != T_OP:
+            continue
+        if t.text in _OPENERS:
+            stack.append(i)
+        elif t.text in _CLOSERS:
+            while stack and _OPENERS[tokens[stack[-1]].text] != t.text:
+                stack.pop()
+            if stack:
+                j = stack.pop()
+                match[i] = j
+                match[j] = i
+    return match
+
+
+def _is_op(tok, texts) -> bool:
+    return tok.kind == T_OP and tok.text in texts
+
+
+def dom_source(chain: str):
+    """멤버 체인(소문자)이 DOM 소스를 읽으면 그 소스 이름, 아니면 None."""
+    padded = '.' + chain + '.'
+    for src in DOM_SOURCES:
+        if '.' + src + '.' in padded:
+            return src
+    return None
+
+
+class JsAnalyzer:
+    """JS 토큰(공백/주석 제외)에서 싱크 지점(sites)을 찾는 분석기."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.n = len(tokens)
+        self.match = match_js_brackets(tokens)
+        self.message_params = self._message_params()
+        # 변수 -> (소스, 라인, hop)
+        self.env = {}
+        # 라인 -> site
+        self.sites = {}
+
+    # ---- 토큰 헬퍼 ----
+
+    def _chain_start(self, i: int) -> bool:
+        """체인의 첫 이름인지. f(x).innerHTML 처럼 호출/인덱싱 뒤의 멤버도 새 체인으로 본다."""
+        tokens = self.tokens
+        if tokens[i].kind != T_IDENT:
+            return False
+        if i and _is_op(tokens[i - 1], _MEMBER_OPS):
+            return i > 1 and _is_op(tokens[i - 2], (')', ']'))
+        return True
+
+    def _chain(self, i: int):
+        """tokens[i] 에서 시작하는 a.b?.c 체인 -> (소문자 체인, 원래 첫 이름, 체인 다음 인덱스)."""
+        tokens = self.tokens
+        parts = [tokens[i].text]
+        k = i + 1
+        while k + 1 < self.n and _is_op(tokens[k], _MEMBER_OPS) and tokens[k + 1].kind == T_IDENT:
+            parts.append(tokens[k + 1].text)
+            k += 2
+        return '.'.join(parts).lower(), parts[0], k
+
+    def _expr_end(self, a: int) -> int:
+        """a 부터 시작하는 식의 끝(';' / 깊이 0 의 ',' / 닫는 괄호 / ASI 줄바꿈)."""
+        tokens, match = self.tokens, self.match
+        k = a
+        while k < self.n:
+            t = tokens[k]
+            if k > a and t.line != tokens[k - 1].line and self._asi(tokens[k - 1], t):
+                return k
+            if t.kind == T_OP:
+                if t.text in _OPENERS:
+                    if match[k] < 0:
+                        return k
+                    k = match[k] + 1
+                    continue
+                if t.text in _CLOSERS or t.text in (';', ','):
+                    return k
+            k += 1
+        return k
+
+    @staticmethod
+    def _asi(prev, tok) -> bool:
+        ends = prev.kind in _OPERAND_KINDS or _is_op(prev, _OPERAND_END_OPS)
+        return ends and tok.kind in _OPERAND_KINDS
+
+    def _message_params(self):
+        """addEventListener('message', ...) / onmessage = ... 핸들러의 첫 파라미터 이름들."""
+        tokens = self.tokens
+        params = set()
+        for i, t in enumerate(tokens):
+            if t.kind != T_IDENT:
+                continue
+            low = t.text.lower()
+            if (
+                low == 'addeventlistener'
+                and i + 3 < self.n
+                and _is_op(tokens[i + 1], ('(',))
+                and tokens[i + 2].kind == T_STRING
+                and tokens[i + 2].text[1:-1] == 'message'
+                and _is_op(tokens[i + 3], (',',))
+            ):
+                start = i + 4
+            elif low == 'onmessage' and i + 1 < self.n and _is_op(tokens[i + 1], ('=',)):
+                start = i + 2
+            else:
+                continue
+            name = self._handler_param(start)
+            if name:
+                params.add(name)
+        return params
+
+    def _handler_param(self, k: int):
+        """k 에서 시작하는 function(e) / (e) => / e => 의 첫 파라미터."""
+        tokens = self.tokens
+        if k < self.n and tokens[k].kind == T_IDENT and tokens[k].text == 'async':
+            k += 1
+        if k >= self.n:
+            return None
+        tok = tokens[k]
+        if tok.kind == T_IDENT and tok.text == 'function':
+            k += 1
+            if k < self.n and tokens[k].kind == T_IDENT:
+                k += 1
+            if k + 1 < self.n and _is_op(tokens[k], ('(',)) and tokens[k + 1].kind == T_IDENT:
+                return tokens[k + 1].text
+            return None
+        if _is_op(tok, ('(',)) and k + 1 < self.n and tokens[k + 1].kind == T_IDENT:
+            close = self.match[k]
+            if 0 <= close < self.n - 1 and _is_op(tokens[close + 1], ('=>',)):
+                return tokens[k + 1].text
+            return None
+        if tok.kind == T_IDENT and k + 1 < self.n and _is_op(tokens[k + 1], ('=>',)):
+            return tok.text
+        return None
+
+    # ---- taint ----
+
+    def expr_taint(self, a: int, b: int):
+        """
+        tokens[a:b] 식의 taint.
+        -> (대입할 taint (소스, 라인, hop) 또는 None, 소스 직접 사용 여부,
+            (변수, taint 정보) 또는 None)
+        """
+        tokens = self.tokens
+        best = None
+        direct = False
+        hit = None
+        k = a
+        while k < b:
+            if not self._chain_start(k):
+                k += 1
+                continue
+            chain, name, e = self._chain(k)
+            if e < b and _is_op(tokens[e], ('(',)) and chain in _SANITIZERS and self.match[e] > e:
+                # 정화 함수 호출은 인자까지 통째로 건너뛴다.
+                k = self.match[e] + 1
+                continue
+            src = dom_source(chain)
+            if src is None and name in self.message_params and chain.split('.')[1:2] == ['data']:
+                src = JS_MESSAGE_SOURCE
+            if src is not None:
+                direct = True
+                best = (src, tokens[k].line, 0)
+            elif name in self.env:
+                source, line, hops = self.env[name]
+                if hit is None:
+                    hit = (name, {'source': source, 'line': line, 'hops': hops})
+                if hops + 1 <= MAX_HOPS and (best is None or hops + 1 < best[2]):
+                    best = (source, line, hops + 1)
+            k = e
+        return best, direct, hit
+
+    def _add_site(self, line: int, context: str, direct: bool, hit):
+        if not (direct or hit):
+            return
+        prev = self.sites.get(line)
+        # 같은 라인에 여러 싱크가 있으면 직접 소스 > 변수 경유 순으로 하나만 남긴다.
+        if prev is None or (direct and not prev[2]):
+            self.sites[line] = (line, context, direct, hit, _NO_GUARD)
+
+    def _call_sink(self, chain: str):
+        for name, sink in JS_CALL_SINKS.items():
+            if chain == name or chain.endswith('.' + name):
+                return sink
+        return None
+
+    def _assign_sink(self, chain: str):
+        if chain == 'location':
+            return 'url'
+        for name, context in JS_ASSIGN_SINKS.items():
+            if chain == name or chain.endswith('.' + name):
+                return context
+        return None
+
+    def _jsx_html(self, i: int):
+        """dangerouslySetInnerHTML={...} 의 값 범위."""
+        tokens = self.tokens
+        if i + 2 < self.n and _is_op(tokens[i + 1], ('=',)) and _is_op(tokens[i + 2], ('{',)):
+            close = self.match[i + 2]
+            if close > i + 2:
+                return i + 3, close
+        return None
+
+    def run(self):
+        """-> findings_from_sites 용 sites 리스트(라인 순)."""
+        tokens = self.tokens
+        for i in range(self.n):
+            tok = tokens[i]
+            if tok.kind == T_JSX_ATTR and tok.text == 'dangerouslySetInnerHTML':
+                span = self._jsx_html(i)
+                if span:
+                    _, direct, hit = self.expr_taint(*span)
+                    self._add_site(tok.line, 'html', direct, hit)
+                continue
+            if not self._chain_start(i):
+                continue
+            chain, name, e = self._chain(i)
+            if e >= self.n:
+                continue
+            nxt = tokens[e]
+            if _is_op(nxt, ('(',)):
+                sink = self._call_sink(chain)
+                if sink is None or self.match[e] < 0:
+                    continue
+                index, context = sink
+                args = split_call_args(tokens, e, self.match)
+                if index is not None:
+                    args = args[index:index + 1]
+                for a, b in args:
+                    _, direct, hit = self.expr_taint(a, b)
+                    self._add_site(tok.line, context, direct, hit)
+            elif _is_op(nxt, ('=', '+=')):
+                value, direct, hit = self.expr_taint(e + 1, self._expr_end(e + 1))
+                context = self._assign_sink(chain)
+                if context is not None:
+                    self._add_site(tok.line, context, direct, hit)
+                    continue
+                if nxt.text == '=' and '.' not in chain:
+                    # 단순 대입은 덮어쓴다(strong update).
+                    if value is None:
+                        self.env.pop(name, None)
+                    else:
+                        self.env[name] = value
+                elif value is not None:
+                    # += 나 obj.prop = ... 은 기존 taint 를 유지한다(weak update).
+                    self.env.setdefault(name, value)
+        return [self.sites[ln] for ln in sorted(self.sites)]
+
+
+def analyze_js_source(content: str):
+    """JS 소스 문자열 -> sites 리스트."""
+    tokens = [t for t in tokenize_js(content) if t.kind not in JS_TRIVIA_KINDS]
+    return JsAnalyzer(tokens).run()
+
+
+def scan_js_file(file_path: str, policies=None):
+    """
+    .js 파일 하나를 JS 분석기로 스캔해 Finding 리스트를 반환.
+    정책(skip/shallow)과 minified 처리는 scan_file_for_xss 와 같다.
+    """
+    try:
+        policy = resolve_scan_policy(file_path, os.path.getsize(file_path), policies)
+        if policy == 'skip':
+            return []
+        if policy == 'shallow':
+            return scan_file_shallow(file_path)
+
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+
+        if has_long_lines(content):
+            return scan_file_shallow(file_path)
+
+        with stage_timer('js_scan'):
+            sites = analyze_js_source(content)
+        return findings_from_sites(file_path, sites, None, category=JS_CATEGORY)
+    except Exception as e:
+        print(f"Error scanning {file_path}: {e}")
+        return []
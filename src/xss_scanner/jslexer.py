@@ -0,0 +1,256 @@
+"""
+정규식 백트래킹 없이 선형 시간에 동작하는 JavaScript 토크나이저 모듈.
+
+PHP 토크나이저(lexer.tokenize_php)를 .js 에 돌리면 `#` 를 주석으로 보고
+템플릿 리터럴/정규식 리터럴을 망가뜨리므로 JS 전용으로 따로 둔다.
+
+- 한 줄/여러 줄 주석, '...' / "..." 문자열
+- 템플릿 리터럴 `...${ 식 }...` (중첩 포함): 문자열 조각은 TEMPLATE,
+  ${ } 안은 다시 JS 토큰으로 내보낸다.
+- 정규식 리터럴 /.../flags: 앞 토큰이 식을 끝낼 수 없는 위치일 때만
+  정규식으로 보고, 아니면 나눗셈 연산자로 본다.
+- JSX: 식 위치의 `<이름` / `<>` 부터 요소로 보고 태그 이름(JSX_TAG),
+  속성 이름(JSX_ATTR), 텍스트(JSX_TEXT)를 내보낸다. { } 안은 다시 JS.
+
+tokenize_js() 는 lexer.Token(kind, text, start, line) 을 순서대로 내보내는
+제너레이터다. 모드(템플릿/JSX/JS)는 스택으로 관리하고, 각 단계는 앵커가
+걸린 단순 문자 클래스 정규식이나 str.find 만 쓰므로 입력 길이에 비례하는
+시간 안에 끝난다.
+"""
+
+import re
+
+from .lexer import Token, T_COMMENT, T_IDENT, T_NUMBER, T_OP, T_STRING, T_WHITESPACE
+
+T_TEMPLATE = 'TEMPLATE'
+T_REGEX = 'REGEX'
+T_JSX_TAG = 'JSX_TAG'
+T_JSX_ATTR = 'JSX_ATTR'
+T_JSX_TEXT = 'JSX_TEXT'
+
+# 분석 시 건너뛰는 토큰 종류
+JS_TRIVIA_KINDS = frozenset([T_WHITESPACE, T_COMMENT])
+
+# 토크나이저 모드
+_JS = 'js'
+_TEMPLATE = 'template'
+_JSX_TAG = 'jsx_tag'
+_JSX_CHILDREN = 'jsx_children'
+
+_WS_RE = re.compile(r'\s+')
+_IDENT_RE = re.compile(r'[A-Za-z_$\x80-\U0010ffff][A-Za-z0-9_$\x80-\U0010ffff]*')
+_NUMBER_RE = re.compile(r'0[xXoObB][0-9A-Fa-f_]+n?|[0-9_]*\.?[0-9_]+(?:[eE][+-]?[0-9_]+)?n?|[0-9_]+\.')
+_OP_RE = re.compile(
+    r'>>>=|\.\.\.|===|!==|\*\*=|<<=|>>=|>>>|&&=|\|\|=|\?\?='
+    r'|=>|==|!=|<=|>=|&&|\|\||\?\?|\?\.|\+\+|--|\+=|-=|\*=|/=|%=|&=|\|=|\^=|<<|>>|\*\*'
+    r'|[\s\S]'
+)
+_STRING_BODY_RE = {
+    "'": re.compile(r"[^'\\\n]*"),
+    '"': re.compile(r'[^"\\\n]*'),
+}
+_TEMPLATE_BODY_RE = re.compile(r'[^`\\$]*')
+_REGEX_BODY_RE = re.compile(r'[^/\\\[\n]*')
+_REGEX_CLASS_RE = re.compile(r'[^\]\\\n]*')
+_REGEX_FLAGS_RE = re.compile(r'[A-Za-z]*')
+_JSX_START_RE = re.compile(r'[A-Za-z_$>]')
+_JSX_NAME_RE = re.compile(r'[A-Za-z_$][A-Za-z0-9_$.:-]*')
+_JSX_TEXT_RE = re.compile(r'[^<{]*')
+
+# 이 키워드 뒤의 '/' 와 '<' 는 식의 시작(정규식/JSX)이다.
+_EXPR_KEYWORDS = frozenset(
+    ['return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw', 'case', 'do', 'else',
+     'yield', 'await']
+)
+# 이 연산자 뒤에서는 식이 끝난 상태다(뒤의 '/' 는 나눗셈).
+_EXPR_CLOSERS = frozenset([')', ']', '`', '/>', '++', '--'])
+
+
+def _starts_expression(kind: str, text: str) -> bool:
+    """이 토큰 다음에 오는 '/' / '<' 가 식의 시작(정규식/JSX)인지."""
+    if kind == T_OP:
+        return text not in _EXPR_CLOSERS
+    if kind == T_IDENT:
+        return text in _EXPR_KEYWORDS
+    return False
+
+
+class _Tokenizer:
+    """모드 스택을 들고 토큰을 하나씩 만드는 상태 기계."""
+
+    def __init__(self, content: str):
+        self.s = content
+        self.n = len(content)
+        self.pos = 0
+        self.line = 1
+        # [모드, 값] — JS: 열린 '{' 수, JSX_TAG: 태그 이름을 읽었는지, JSX_CHILDREN: 열린 요소 수
+        self.modes = [[_JS, 0]]
+        self.expr_start = True
+
+    def _tok(self, kind: str, end: int) -> Token:
+        text = self.s[self.pos:end]
+        tok = Token(kind, text, self.pos, self.line)
+        self.line += text.count('\n')
+        self.pos = end
+        if kind not in JS_TRIVIA_KINDS:
+            self.expr_start = _starts_expression(kind, text)
+        return tok
+
+    def _scan_string(self, pos: int, quote: str) -> int:
+        body = _STRING_BODY_RE[quote]
+        i = pos + 1
+        while True:
+            i = body.match(self.s, i).end()
+            if i >= self.n or self.s[i] == '\n':
+                return i
+            if self.s[i] == '\\':
+                i += 2
+                continue
+            return i + 1
+
+    def _scan_regex(self, pos: int):
+        """pos 의 '/' 로 시작하는 정규식 리터럴의 끝(줄이 끝나면 None)."""
+        s, i = self.s, pos + 1
+        while True:
+            i = _REGEX_BODY_RE.match(s, i).end()
+            if i >= self.n or s[i] == '\n':
+                return None
+            c = s[i]
+            if c == '\\':
+                i += 2
+            elif c == '[':
+                while True:
+                    i = _REGEX_CLASS_RE.match(s, i + 1).end()
+                    if i < self.n and s[i] == '\\':
+                        continue
+                    break
+                if i >= self.n or s[i] == '\n':
+                    return None
+                i += 1
+            else:
+                return _REGEX_FLAGS_RE.match(s, i + 1).end()
+
+    def _js(self):
+        s, pos = self.s, self.pos
+        mode = self.modes[-1]
+        c = s[pos]
+        if c.isspace():
+            return self._tok(T_WHITESPACE, _WS_RE.match(s, pos).end())
+        if s.startswith('//', pos) or s.startswith('<!--', pos):
+            nl = s.find('\n', pos)
+            return self._tok(T_COMMENT, self.n if nl == -1 else nl)
+        if s.startswith('/*', pos):
+            close = s.find('*/', pos + 2)
+            return self._tok(T_COMMENT, self.n if close == -1 else close + 2)
+        if c in '\'"':
+            return self._tok(T_STRING, self._scan_string(pos, c))
+        if c == '`':
+            self.modes.append([_TEMPLATE, 0])
+            return self._tok(T_OP, pos + 1)
+        if '0' <= c <= '9' or (c == '.' and pos + 1 < self.n and '0' <= s[pos + 1] <= '9'):
+            return self._tok(T_NUMBER, max(pos + 1, _NUMBER_RE.match(s, pos).end()))
+        m = _IDENT_RE.match(s, pos)
+        if m:
+            return self._tok(T_IDENT, m.end())
+        if c == '/' and self.expr_start:
+            end = self._scan_regex(pos)
+            if end is not None:
+                return self._tok(T_REGEX, end)
+        if c == '<' and self.expr_start and _JSX_START_RE.match(s, pos + 1):
+            self.modes.append([_JSX_TAG, 0])
+            return self._tok(T_OP, pos + 1)
+        if c == '{':
+            mode[1] += 1
+        elif c == '}':
+            if mode[1] == 0 and len(self.modes) > 1:
+                # ${ } 또는 JSX { } 의 끝: 바깥 모드로 돌아간다.
+                self.modes.pop()
+                return self._tok(T_OP, pos + 1)
+            mode[1] -= 1
+        return self._tok(T_OP, _OP_RE.match(s, pos).end())
+
+    def _template(self):
+        s, pos = self.s, self.pos
+        end = pos
+        while True:
+            end = _TEMPLATE_BODY_RE.match(s, end).end()
+            if end >= self.n:
+                break
+            c = s[end]
+            if c == '\\':
+                end += 2
+            elif c == '$' and not s.startswith('${', end):
+                end += 1
+            else:
+                break
+        end = min(end, self.n)
+        if end > pos:
+            return self._tok(T_TEMPLATE, end)
+        if s[pos] == '`':
+            self.modes.pop()
+            return self._tok(T_OP, pos + 1)
+        self.modes.append([_JS, 0])
+        return self._tok(T_OP, pos + 2)
+
+    def _jsx_tag(self):
+        s, pos = self.s, self.pos
+        mode = self.modes[-1]
+        c = s[pos]
+        if c.isspace():
+            return self._tok(T_WHITESPACE, _WS_RE.match(s, pos).end())
+        if s.startswith('/>', pos):
+            self.modes.pop()
+            return self._tok(T_OP, pos + 2)
+        if c == '>':
+            self.modes.pop()
+            parent = self.modes[-1]
+            if parent[0] == _JSX_CHILDREN:
+                parent[1] += 1
+            else:
+                self.modes.append([_JSX_CHILDREN, 1])
+            return self._tok(T_OP, pos + 1)
+        if c == '{':
+            self.modes.append([_JS, 0])
+            return self._tok(T_OP, pos + 1)
+        if c in '\'"':
+            close = s.find(c, pos + 1)
+            return self._tok(T_STRING, self.n if close == -1 else close + 1)
+        m = _JSX_NAME_RE.match(s, pos)
+        if m:
+            kind = T_JSX_TAG if mode[1] == 0 else T_JSX_ATTR
+            mode[1] = 1
+            return self._tok(kind, m.end())
+        return self._tok(T_OP, pos + 1)
+
+    def _jsx_children(self):
+        s, pos = self.s, self.pos
+        mode = self.modes[-1]
+        c = s[pos]
+        if c == '{':
+            self.modes.append([_JS, 0])
+            return self._tok(T_OP, pos + 1)
+        if c == '<':
+            if s.startswith('</', pos):
+                close = s.find('>', pos)
+                mode[1] -= 1
+                if mode[1] <= 0:
+                    self.modes.pop()
+                return self._tok(T_JSX_TAG, self.n if close == -1 else close + 1)
+            self.modes.append([_JSX_TAG, 0])
+            return self._tok(T_OP, pos + 1)
+        return self._tok(T_JSX_TEXT, _JSX_TEXT_RE.match(s, pos).end())
+
+    def run(self):
+        handlers = {
+            _JS: self._js,
+            _TEMPLATE: self._template,
+            _JSX_TAG: self._jsx_tag,
+            _JSX_CHILDREN: self._jsx_children,
+        }
+        while self.pos < self.n:
+            yield handlers[self.modes[-1][0]]()
+
+
+def tokenize_js(content: str):
+    """JavaScript(JSX 포함) 소스를 토큰 스트림으로 변환하는 제너레이터."""
+    return _Tokenizer(content).run()
@@ -0,0 +1,287 @@
+"""
+정규식 백트래킹 없이 선형 시간에 동작하는 PHP 토크나이저 모듈.
+
+- inline HTML ( ?> ... <?php ) 영역
+- 한 줄/여러 줄 주석, #[ ... ] attribute
+- '...' / "..." / `...` 문자열, heredoc / nowdoc
+  ("..." 와 heredoc 안의 $var / {$...} 보간은 코드 토큰으로 따로 내보낸다)
+- 변수, 식별자, 숫자, 연산자
+
+tokenize_php() 는 제너레이터로 Token(kind, text, start, line) 을 순서대로
+내보낸다. 각 단계는 앵커가 걸린 단순 문자 클래스 정규식이나 str.find 만
+사용하므로, 어떤 입력에 대해서도 파일 길이에 비례하는 시간 안에 끝난다.
+"""
+
+import re
+from collections import namedtuple
+
+Token = namedtuple('Token', ['kind', 'text', 'start', 'line'])
+
+# 토큰 종류
+T_INLINE_HTML = 'INLINE_HTML'
+T_OPEN_TAG = 'OPEN_TAG'
+T_OPEN_TAG_WITH_ECHO = 'OPEN_TAG_WITH_ECHO'
+T_CLOSE_TAG = 'CLOSE_TAG'
+T_WHITESPACE = 'WHITESPACE'
+T_COMMENT = 'COMMENT'
+T_ATTRIBUTE = 'ATTRIBUTE'
+T_STRING = 'STRING'
+T_HEREDOC = 'HEREDOC'
+T_NOWDOC = 'NOWDOC'
+T_VARIABLE = 'VARIABLE'
+T_IDENT = 'IDENT'
+T_NUMBER = 'NUMBER'
+T_OP = 'OP'
+
+# 분석 시 내용을 보지 않는(마스킹하는) 토큰 종류
+MASKED_KINDS = frozenset(
+    [T_INLINE_HTML, T_COMMENT, T_ATTRIBUTE, T_STRING, T_HEREDOC, T_NOWDOC]
+)
+# 코드 흐름 분석에서 건너뛰는 토큰 종류
+TRIVIA_KINDS = frozenset([T_WHITESPACE, T_COMMENT, T_ATTRIBUTE])
+
+_OPEN_TAG_RE = re.compile(r'<\?(?:php(?=\s)|php\Z|=|(?!xml))', re.IGNORECASE)
+_WS_RE = re.compile(r'\s+')
+_IDENT_RE = re.compile(r'[A-Za-z_\x80-\U0010ffff][A-Za-z0-9_\x80-\U0010ffff]*')
+_NUMBER_RE = re.compile(r'[0-9][A-Za-z0-9_.]*')
+_HEREDOC_START_RE = re.compile(r'<<<[ \t]*(["\']?)([A-Za-z_\x80-\U0010ffff][A-Za-z0-9_\x80-\U0010ffff]*)\1\r?\n')
+_OP_RE = re.compile(
+    r'===|!==|<=>|\*\*=|\.\.\.|<<=|>>=|\?\?=|\?->'
+    r'|==|!=|<>|<=|>=|&&|\|\||\?\?|->|=>|::|\+\+|--'
+    r'|\+=|-=|\*=|/=|\.=|%=|&=|\|=|\^=|<<|>>|\*\*'
+    r'|[\s\S]'
+)
+# 문자열 본문: 종료 따옴표/역슬래시가 아닌 문자의 연속
+_STRING_BODY_RE = {
+    "'": re.compile(r"[^'\\]*"),
+    '"': re.compile(r'[^"\\]*'),
+    '`': re.compile(r'[^`\\]*'),
+}
+_ATTRIBUTE_STOP_RE = re.compile(r'[^\[\]\'"]*')
+# "..." / heredoc 본문의 보간 시작: 이스케이프, {$, $이름
+_INTERP_RE = re.compile(r'\\[\s\S]|\{\$|\$(?=[A-Za-z_\x80-\U0010ffff])')
+# 단순 보간 뒤에 붙는 한 단계 인덱스/프로퍼티: $a[0], $a[key], $a[$i], $a->b
+_INTERP_SUFFIX_RE = re.compile(
+    r'\[(?:-?[0-9]+|\$?[A-Za-z_\x80-\U0010ffff][A-Za-z0-9_\x80-\U0010ffff]*)\]'
+    r'|->[A-Za-z_\x80-\U0010ffff][A-Za-z0-9_\x80-\U0010ffff]*'
+)
+_BRACED_STOP_RE = re.compile(r'[^{}\'"]*')
+
+
+def _scan_quoted(content: str, pos: int, quote: str) -> int:
+    """pos 의 따옴표로 시작하는 문자열의 끝 오프셋(종료 따옴표 다음)."""
+    body = _STRING_BODY_RE[quote]
+    n = len(content)
+    i = pos + 1
+    while True:
+        i = body.match(content, i).end()
+        if i >= n:
+            return n
+        if content[i] == '\\':
+            i += 2
+            continue
+        return i + 1
+
+
+def _scan_attribute(content: str, pos: int) -> int:
+    """#[ ... ] attribute 의 끝 오프셋. 중첩 대괄호와 문자열을 고려한다."""
+    n = len(content)
+    depth = 0
+    i = pos + 1
+    while i < n:
+        i = _ATTRIBUTE_STOP_RE.match(content, i).end()
+        if i >= n:
+            break
+        c = content[i]
+        if c == '[':
+            depth += 1
+            i += 1
+        elif c == ']':
+            depth -= 1
+            i += 1
+            if depth == 0:
+                return i
+        else:
+            i = _scan_quoted(content, i, c)
+    return n
+
+
+def _scan_line_comment(content: str, pos: int) -> int:
+    """//, # 주석의 끝. PHP 처럼 줄 끝 또는 ?> 앞에서 끝난다."""
+    nl = content.find('\n', pos)
+    if nl == -1:
+        nl = len(content)
+    close = content.find('?>', pos, nl)
+    return close if close != -1 else nl
+
+
+def _scan_heredoc(content: str, m):
+    """heredoc/nowdoc 시작 매치 m 이후 (본문 끝, 종료 라벨까지의 끝) 오프셋."""
+    label = m.group(2)
+    end_re = re.compile(
+        r'^[ \t]*' + re.escape(label) + r'(?![A-Za-z0-9_\x80-\U0010ffff])',
+        re.MULTILINE,
+    )
+    em = end_re.search(content, m.end())
+    if not em:
+        return len(content), len(content)
+    return em.start(), em.end()
+
+
+def _scan_braced(content: str, pos: int, limit: int) -> int:
+    """pos 의 { 와 짝이 맞는 } 의 오프셋(없으면 limit). 안쪽 문자열을 고려한다."""
+    depth = 0
+    i = pos
+    while i < limit:
+        i = _BRACED_STOP_RE.match(content, i, limit).end()
+        if i >= limit:
+            break
+        c = content[i]
+        if c == '{':
+            depth += 1
+            i += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+            i += 1
+        else:
+            i = _scan_quoted(content, i, c)
+    return limit
+
+
+def _split_interpolated(content: str, start: int, end: int, body_start: int, body_end: int, kind: str, line: int):
+    """
+    "..." / heredoc 토큰 [start, end) 를 리터럴 조각(kind, 마스킹 대상)과
+    본문 [body_start, body_end) 안의 보간 코드 토큰으로 나눠 내보낸다.
+    {$...} 는 중괄호 안쪽만, $var 는 한 단계 인덱스/프로퍼티까지 코드로 본다.
+    """
+    lit = start
+    i = body_start
+    while True:
+        m = _INTERP_RE.search(content, i, body_end)
+        if not m:
+            break
+        i = m.end()
+        if m.group(0)[0] == '\\':
+            continue
+        if m.group(0) == '{$':
+            code_start = m.start() + 1
+            code_end = _scan_braced(content, m.start(), body_end)
+        else:
+            code_start = m.start()
+            code_end = _IDENT_RE.match(content, code_start + 1).end()
+            sm = _INTERP_SUFFIX_RE.match(content, code_end, body_end)
+            if sm:
+                code_end = sm.end()
+        text = content[lit:code_start]
+        if text:
+            yield Token(kind, text, lit, line)
+            line += text.count('\n')
+        for tok in tokenize_php(content[code_start:code_end], start_in_php=True):
+            yield Token(tok.kind, tok.text, tok.start + code_start, tok.line - 1 + line)
+        line += content.count('\n', code_start, code_end)
+        lit = i = max(code_end, i)
+    if lit < end:
+        yield Token(kind, content[lit:end], lit, line)
+
+
+def tokenize_php(content: str, start_in_php: bool = False):
+    """
+    PHP 소스를 토큰 스트림으로 변환하는 제너레이터.
+
+    start_in_php=True 이면 여는 태그 없이 바로 코드로 간주한다
+    (.js 처럼 PHP 태그가 없는 파일용).
+    """
+    n = len(content)
+    pos = 0
+    line = 1
+    in_php = start_in_php
+
+    while pos < n:
+        if not in_php:
+            m = _OPEN_TAG_RE.search(content, pos)
+            end = m.start() if m else n
+            if end > pos:
+                text = content[pos:end]
+                yield Token(T_INLINE_HTML, text, pos, line)
+                line += text.count('\n')
+            if not m:
+                break
+            text = m.group(0)
+            kind = T_OPEN_TAG_WITH_ECHO if text == '<?=' else T_OPEN_TAG
+            yield Token(kind, text, m.start(), line)
+            pos = m.end()
+            in_php = True
+            continue
+
+        c = content[pos]
+        if c.isspace():
+            end = _WS_RE.match(content, pos).end()
+            kind = T_WHITESPACE
+        elif c == '?' and content.startswith('?>', pos):
+            end = pos + 2
+            # 닫는 태그 바로 뒤의 줄바꿈 하나는 태그에 포함된다.
+            if content.startswith('\r\n', end):
+                end += 2
+            elif content.startswith('\n', end):
+                end += 1
+            kind = T_CLOSE_TAG
+            in_php = False
+        elif c == '#':
+            if content.startswith('#[', pos):
+                end = _scan_attribute(content, pos)
+                kind = T_ATTRIBUTE
+            else:
+                end = _scan_line_comment(content, pos)
+                kind = T_COMMENT
+        elif c == '/' and content.startswith('//', pos):
+            end = _scan_line_comment(content, pos)
+            kind = T_COMMENT
+        elif c == '/' and content.startswith('/*', pos):
+            close = content.find('*/', pos + 2)
+            end = n if close == -1 else close + 2
+            kind = T_COMMENT
+        elif c in '\'"`':
+            end = _scan_quoted(content, pos, c)
+            kind = T_STRING
+            if c == '"' and content.find('$', pos, end) != -1:
+                body_end = end - 1 if end - pos >= 2 and content[end - 1] == '"' else end
+                for tok in _split_interpolated(content, pos, end, pos + 1, body_end, kind, line):
+                    yield tok
+                line += content.count('\n', pos, end)
+                pos = end
+                continue
+        elif c == '<' and content.startswith('<<<', pos):
+            m = _HEREDOC_START_RE.match(content, pos)
+            if m:
+                body_end, end = _scan_heredoc(content, m)
+                kind = T_NOWDOC if m.group(1) == "'" else T_HEREDOC
+                if kind == T_HEREDOC and content.find('$', m.end(), body_end) != -1:
+                    for tok in _split_interpolated(content, pos, end, m.end(), body_end, kind, line):
+                        yield tok
+                    line += content.count('\n', pos, end)
+                    pos = end
+                    continue
+            else:
+                end = pos + 2
+                kind = T_OP
+        elif c == '$' and _IDENT_RE.match(content, pos + 1):
+            end = _IDENT_RE.match(content, pos + 1).end()
+            kind = T_VARIABLE
+        elif '0' <= c <= '9':
+            end = _NUMBER_RE.match(content, pos).end()
+            kind = T_NUMBER
+        else:
+            m = _IDENT_RE.match(content, pos)
+            if m:
+                end = m.end()
+                kind = T_IDENT
+            else:
+                end = _OP_RE.match(content, pos).end()
+                kind = T_OP
+
+        text = content[pos:end]
+        yield Token(kind, text, pos, line)
+        line += text.count('\n')
+        pos = end
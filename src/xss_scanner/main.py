@@ -7,9 +7,27 @@
 """
 
 import argparse
+import os
 
-from .downloader import download_plugins_for_keywords
-from .scanner import scan_downloaded_plugins
+from .astengine import ENGINES, phply_available
+from .asyncdownloader import (
+    DOWNLOAD_CONCURRENCY,
+    DOWNLOAD_ENGINES,
+    DOWNLOAD_PER_HOST,
+    aiohttp_available,
+    download_plugins_async,
+)
+from .downloader import DISCOVERY_MODES, download_plugins_for_keywords
+from .ratelimit import INITIAL_RATE, MAX_RATE
+from .scanner import PROFILES, build_scan_policies, parse_scan_policy, scan_downloaded_plugins
+from .watchdog import DEFAULT_FILE_BUDGET
+
+
+def _policy_arg(spec: str):
+    try:
+        return parse_scan_policy(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
 
 
 def main():
@@ -29,6 +47,52 @@ def main():
         default=None,
         help="다운로드 최대 플러그인 개수",
     )
+    p_download.add_argument(
+        "--discovery",
+        choices=DISCOVERY_MODES,
+        default="api",
+        help="플러그인 검색 방식 (api: WordPress.org plugins info API, 실패하면 html 로 대체 / html: 검색 페이지 스크래핑)",
+    )
+    p_download.add_argument(
+        "--engine",
+        choices=DOWNLOAD_ENGINES,
+        default="threads",
+        help="다운로드 엔진 (async: aiohttp 연결 풀 하나로 동시 다운로드)",
+    )
+    p_download.add_argument(
+        "--concurrency",
+        type=int,
+        default=DOWNLOAD_CONCURRENCY,
+        help=f"--engine async 의 전체 동시 연결 수 (기본: {DOWNLOAD_CONCURRENCY})",
+    )
+    p_download.add_argument(
+        "--per-host",
+        type=int,
+        default=DOWNLOAD_PER_HOST,
+        help=f"--engine async 의 호스트별 동시 연결 수 (기본: {DOWNLOAD_PER_HOST})",
+    )
+    p_download.add_argument(
+        "--rate",
+        type=float,
+        default=INITIAL_RATE,
+        help=f"처음 초당 요청 수. 성공하면 올리고 429/503 이면 줄인다 (기본: {INITIAL_RATE})",
+    )
+    p_download.add_argument(
+        "--max-rate",
+        type=float,
+        default=MAX_RATE,
+        help=f"초당 요청 수 상한 (기본: {MAX_RATE})",
+    )
+    p_download.add_argument(
+        "--update",
+        action="store_true",
+        help="이미 받은 플러그인도 매니페스트(plugins/.manifest.json)의 버전/ETag 와 비교해 바뀐 것만 다시 받는다",
+    )
+    p_download.add_argument(
+        "--changed-out",
+        default=None,
+        help="--update 로 다시 받은 플러그인 slug 목록을 한 줄에 하나씩 쓸 파일",
+    )
 
     # scan 서브커맨드
     p_scan = subparsers.add_parser("scan", help="Scan downloaded plugins for XSS")
@@ -42,13 +106,122 @@ def main():
         default="./reports",
         help="리포트 저장 디렉토리 (기본: ./reports)",
     )
+    p_scan.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="병렬 스캔 프로세스 수 (기본: 1, 0 이면 CPU 코어 수)",
+    )
+    p_scan.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="스캔 캐시를 사용하지 않고 모든 파일을 다시 분석",
+    )
+    p_scan.add_argument(
+        "--cache-path",
+        default=None,
+        help="스캔 캐시 SQLite 파일 경로 (기본: <reports-dir>/.scan_cache.sqlite3)",
+    )
+    p_scan.add_argument(
+        "--jsonl",
+        default=None,
+        help="취약점을 발견 즉시 한 줄씩 기록할 JSONL 파일 경로",
+    )
+
+    p_scan.add_argument(
+        "--size-policy",
+        action="append",
+        type=_policy_arg,
+        default=None,
+        metavar="SUFFIX:MIN_SIZE:POLICY",
+        help="파일 크기/종류별 스캔 정책 추가 (예: .min.js:0:skip, .js:5M:shallow). 여러 번 지정 가능",
+    )
+
+    p_scan.add_argument(
+        "--file-budget",
+        type=float,
+        default=DEFAULT_FILE_BUDGET,
+        metavar="SECONDS",
+        help=f"파일 하나의 분석 시간 예산(초, 기본: {DEFAULT_FILE_BUDGET:g}, 0 이면 제한 없음). "
+             "넘긴 파일은 중단하고 리포트에 시간 초과로 기록",
+    )
+    p_scan.add_argument(
+        "--interprocedural",
+        action="store_true",
+        help="플러그인 단위 함수 요약과 include/require 그래프로 함수/파일 경계를 넘는 taint 흐름 추적 (--profile deep 과 같음)",
+    )
+    p_scan.add_argument(
+        "--profile",
+        choices=PROFILES,
+        default=None,
+        help="스캔 프로필 (fast: 사전 필터+후보/규칙 판정(흐름 분석 없음), standard: 파일 단위 dataflow taint 분석(기본), "
+             "deep: standard+함수 요약/include 그래프)",
+    )
+    p_scan.add_argument(
+        "--promote",
+        action="store_true",
+        help="--profile 로 먼저 훑고 CRITICAL/HIGH 결과가 나온 플러그인만 deep 으로 다시 스캔",
+    )
+    p_scan.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="regex",
+        help="PHP 분석 엔진 (ast: phply AST 기반, 파싱 실패 시 파일 단위로 regex 로 대체)",
+    )
 
     args = parser.parse_args()
 
     if args.command == "download":
-        download_plugins_for_keywords(args.keywords, max_plugins=args.max)
+        if args.rate <= 0 or args.max_rate <= 0:
+            parser.error("--rate / --max-rate 는 0 보다 커야 합니다")
+        if args.changed_out and not args.update:
+            parser.error("--changed-out 은 --update 와 함께 써야 합니다")
+        if args.engine == "async":
+            if not aiohttp_available():
+                parser.error("--engine async 에는 aiohttp 가 필요합니다 (pip install aiohttp)")
+            download_plugins_async(
+                args.keywords,
+                max_plugins=args.max,
+                concurrency=max(args.concurrency, 1),
+                per_host=max(args.per_host, 1),
+                discovery=args.discovery,
+                rate=args.rate,
+                max_rate=args.max_rate,
+                update=args.update,
+                changed_out=args.changed_out,
+            )
+        else:
+            download_plugins_for_keywords(
+                args.keywords,
+                max_plugins=args.max,
+                discovery=args.discovery,
+                rate=args.rate,
+                max_rate=args.max_rate,
+                update=args.update,
+                changed_out=args.changed_out,
+            )
     elif args.command == "scan":
-        scan_downloaded_plugins(plugin_root_dir=args.plugins_dir, report_dir=args.reports_dir)
+        if args.engine == "ast" and not phply_available():
+            parser.error("--engine ast 에는 phply 가 필요합니다 (pip install phply)")
+        profile = args.profile or ("deep" if args.interprocedural else "standard")
+        if args.interprocedural and profile != "deep":
+            parser.error("--interprocedural 은 --profile deep 과 같으므로 다른 프로필과 함께 쓸 수 없습니다")
+        if args.promote and profile == "deep":
+            parser.error("--promote 는 fast/standard 프로필에서만 쓸 수 있습니다")
+        jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+        scan_downloaded_plugins(
+            plugin_root_dir=args.plugins_dir,
+            report_dir=args.reports_dir,
+            jobs=jobs,
+            use_cache=not args.no_cache,
+            cache_path=args.cache_path,
+            jsonl_path=args.jsonl,
+            policies=build_scan_policies(args.size_policy),
+            engine=args.engine,
+            profile=profile,
+            promote=args.promote,
+            budget=max(args.file_budget, 0),
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,209 @@
+"""
+플러그인 다운로드 매니페스트(plugins/.manifest.json) 모듈.
+
+get_existing_folders 는 폴더 이름만 보므로 이미 받은 플러그인은 새 버전이
+나와도 다시 받지 않는다. 매니페스트는 slug 마다
+
+    folder, version, download_link, etag, last_modified, sha256, downloaded_at
+
+을 기록해 두고, download --update 에서
+
+1. 새 버전을 알 수 있으면(API 의 version, 또는 zip 이름의 버전) 기록된
+   버전과 비교해 같으면 요청 없이 건너뛰고,
+2. 모르면 기록된 ETag / Last-Modified 로 조건부 GET 을 보내 304 면
+   건너뛰며,
+3. 받은 zip 의 sha256 이 기록과 같으면 압축을 다시 풀지 않는다.
+
+바뀐 플러그인은 숨김 스테이징 디렉토리에 압축을 푼 뒤 install_directory 로
+기존 디렉토리와 바꿔치기하고, changed 목록에 slug 를 남겨 다시 스캔할
+대상을 알려 준다.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+
+MANIFEST_FILE = ".manifest.json"
+# 압축을 풀 스테이징 / 교체 중 옛 디렉토리 이름 (plugins/ 안의 숨김 디렉토리)
+STAGING_PREFIX = ".staging-"
+RETIRED_PREFIX = ".old-"
+
+
+def plugin_slug(file_name: str) -> str:
+    """zip 파일 이름(slug[.version].zip) -> slug. WordPress.org slug 에는 '.' 이 없다."""
+    return file_name.split('.', 1)[0]
+
+
+def plugin_version(file_name: str):
+    """zip 파일 이름의 버전(slug.1.2.3.zip -> '1.2.3', 버전이 없으면 None)."""
+    stem = file_name[:-4] if file_name.lower().endswith('.zip') else file_name
+    parts = stem.split('.', 1)
+    return parts[1] if len(parts) == 2 and parts[1] else None
+
+
+def _remove_tree(path: str):
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def install_directory(staging_dir: str, dest_dir: str):
+    """
+    압축을 다 푼 staging_dir 을 dest_dir 자리에 놓는다.
+    dest_dir 이 이미 있으면 옆으로 옮긴 뒤 바꿔 넣고 옛 디렉토리를 지운다.
+    (같은 파일시스템 안의 rename 두 번이므로 반쯤 풀린 디렉토리가 보이지 않는다.)
+    """
+    if not os.path.exists(dest_dir):
+        os.rename(staging_dir, dest_dir)
+        return
+    parent, name = os.path.split(dest_dir)
+    retired = os.path.join(parent, f"{RETIRED_PREFIX}{name}-{os.getpid()}-{threading.get_ident()}")
+    os.rename(dest_dir, retired)
+    try:
+        os.rename(staging_dir, dest_dir)
+    except OSError:
+        os.rename(retired, dest_dir)
+        raise
+    _remove_tree(retired)
+
+
+class PluginManifest:
+    """
+    plugins/.manifest.json 을 읽고 쓰는 스레드 안전한 매니페스트.
+
+    update=True 이면 download --update 모드다. 한 실행에서 다시 받은
+    (새로 받았거나 버전이 바뀐) 플러그인의 slug 는 changed 에 모인다.
+    """
+
+    def __init__(self, base_dir: str, update: bool = False):
+        self.base_dir = base_dir
+        self.path = os.path.join(base_dir, MANIFEST_FILE)
+        self.update = update
+        self.changed = []
+        self.unchanged = 0
+        self._lock = threading.Lock()
+        self._claimed = set()
+        self._entries = {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self._entries = data.get('plugins') or {}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"[warn] failed to read manifest {self.path}: {e}")
+
+    def get(self, slug: str):
+        with self._lock:
+            entry = self._entries.get(slug)
+            return dict(entry) if entry else None
+
+    def claim(self, slug: str) -> bool:
+        """이번 실행에서 slug 를 처음 맡으면 True (키워드끼리 겹친 플러그인 중복 방지)."""
+        with self._lock:
+            if slug in self._claimed:
+                return False
+            self._claimed.add(slug)
+            return True
+
+    def release(self, slug: str):
+        with self._lock:
+            self._claimed.discard(slug)
+
+    def installed_folder(self, slug: str, existing_folders):
+        """
+        slug 가 지금 설치된 폴더 이름(없으면 None). 매니페스트에 없으면
+        예전 방식으로 받은 폴더(slug 또는 slug.버전)를 찾는다.
+        """
+        entry = self.get(slug)
+        if entry and entry.get('folder') and os.path.isdir(os.path.join(self.base_dir, entry['folder'])):
+            return entry['folder']
+        for name in sorted(existing_folders):
+            if plugin_slug(name) == slug and os.path.isdir(os.path.join(self.base_dir, name)):
+                return name
+        return None
+
+    def request_headers(self, slug: str, download_link: str) -> dict:
+        """기록된 ETag / Last-Modified 로 만든 조건부 GET 헤더(같은 URL 일 때만)."""
+        entry = self.get(slug)
+        if not entry or entry.get('download_link') != download_link:
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def is_current(self, slug: str, folder_name: str, version, existing_folders) -> bool:
+        """
+        요청 없이 최신이라고 볼 수 있으면 True.
+        - 기록된 버전이 version 과 같다.
+        - 매니페스트 기록은 없지만 같은 이름(slug.버전)의 폴더가 이미 있다.
+          이때는 이 버전으로 기록을 채워 둔다.
+        """
+        installed = self.installed_folder(slug, existing_folders)
+        if installed is None:
+            return False
+        entry = self.get(slug)
+        if entry:
+            return bool(version) and entry.get('version') == version
+        if installed == folder_name:
+            self.record(slug, folder=installed, version=version)
+            return True
+        return False
+
+    def same_content(self, slug: str, sha256: str) -> bool:
+        entry = self.get(slug)
+        return bool(entry) and entry.get('sha256') == sha256
+
+    def record(self, slug: str, **fields):
+        with self._lock:
+            entry = self._entries.setdefault(slug, {})
+            entry.update({k: v for k, v in fields.items() if v is not None})
+
+    def record_download(self, slug: str, folder_name: str, version, download_link: str, headers, sha256: str):
+        """받은 zip 의 정보를 기록한다. headers 는 응답 헤더(대소문자 무시 dict)."""
+        self.record(
+            slug,
+            folder=folder_name,
+            version=version,
+            download_link=download_link,
+            etag=headers.get('ETag'),
+            last_modified=headers.get('Last-Modified'),
+            sha256=sha256,
+            downloaded_at=time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        )
+
+    def mark_changed(self, slug: str):
+        with self._lock:
+            if slug not in self.changed:
+                self.changed.append(slug)
+
+    def mark_unchanged(self):
+        with self._lock:
+            self.unchanged += 1
+
+    def save(self):
+        """매니페스트를 임시 파일에 쓴 뒤 os.replace 로 바꾼다."""
+        with self._lock:
+            data = {'plugins': dict(sorted(self._entries.items()))}
+        tmp = self.path + '.tmp'
+        try:
+            os.makedirs(self.base_dir, exist_ok=True)
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[warn] failed to write manifest {self.path}: {e}")
+
+    def report(self, changed_out: str = None):
+        """--update 결과(바뀐 slug 목록)를 출력하고 changed_out 에 한 줄에 하나씩 쓴다."""
+        changed = sorted(self.changed)
+        print(f"[update] changed={len(changed)}, unchanged={self.unchanged}")
+        for slug in changed:
+            print(f"  {slug}")
+        if changed_out:
+            with open(changed_out, 'w', encoding='utf-8') as f:
+                f.writelines(f"{slug}\n" for slug in changed)
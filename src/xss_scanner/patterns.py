@@ -2,6 +2,10 @@
 XSS 스캐너에서 사용하는 패턴/상수 정의 모듈.
 """
 
+import re
+
+from .ahocorasick import AhoCorasick
+
 # 싱크/소스/가드/컨텍스트 정의 (간결화된 규칙)
 SINK_TOKENS = [r'echo\b', r'print\b', r'printf\b', r'sprintf\b', r'<\?=']
 SINK_FUNCS = ['wp_send_json', 'wp_add_inline_script', 'the_content', 'the_title']
@@ -24,6 +28,24 @@ GUARD_FUNCS = {
     'js': ['esc_js', 'wp_json_encode', 'json_encode'],
 }
 
+# 값을 통째로 정화하는 함수: `$x = f(...)` 형태로 재할당되면 $x 의 taint 를 지운다.
+# (숫자 변환, WordPress sanitize_* 중 안전한 문자 집합만 남기는 것)
+# 어느 출력 컨텍스트에서도 안전한 것만 둔다. GUARD_FUNCS 는 컨텍스트에 따라
+# 안전 여부가 달라서, 감싼 값은 그 가드를 단 채로 tainted 로 남긴다.
+SANITIZER_FUNCS = [
+    'intval',
+    'absint',
+    'floatval',
+    'boolval',
+    'sanitize_key',
+    'sanitize_title',
+    'sanitize_email',
+    'sanitize_hex_color',
+    'sanitize_html_class',
+]
+# `(int) $x` 형태의 캐스트
+SANITIZER_CASTS = ['int', 'integer', 'float', 'double', 'bool', 'boolean']
+
 # context 매핑 규칙(간단한 heuristics)
 ATTR_CONTEXT_HINT = ["href=", "src=", "data-", "value="]
 JS_SINK_HINT = [
@@ -37,5 +59,225 @@ JS_SINK_HINT = [
     'window.location',
 ]
 
+# 분류(classify_vulnerability)용 리터럴
+# DB 관련 API(서버 저장 값) -> Stored XSS 가능성
+DB_READ_APIS = [
+    'get_option',
+    'get_post_meta',
+    'get_user_meta',
+]
+DB_WRITE_APIS = [
+    'update_option',
+    'add_post_meta',
+    'update_post_meta',
+    'add_option',
+]
+DB_API_PATTERNS = DB_READ_APIS + DB_WRITE_APIS
+# DOM 관련 토큰 -> DOM-based XSS
+DOM_TOKENS = [
+    'document.write',
+    'innerhtml',
+    'eval(',
+    'setattribute(',
+    'location.hash',
+    'location.href',
+    'window.location',
+    '.outerhtml',
+]
+# js 컨텍스트에서 DOM-based 로 보는 토큰
+JS_DOM_TOKENS = ['<script', 'document.write', 'innerhtml', 'eval(']
+
+# DOM 입력 소스(클라이언트 측 공격자 제어 값)
+DOM_SOURCES = [
+    'location.hash',
+    'location.search',
+    'location.href',
+    'document.url',
+    'document.documenturi',
+    'document.referrer',
+    'window.name',
+]
+
+# JS 분석기(jsanalyzer)용: JS_SINK_HINT 의 싱크를 호출/대입 형태로 나눈 것
+# 호출 싱크: 멤버 체인 끝(소문자) -> 값이 들어가는 인자 인덱스(None 이면 모든 인자)와 컨텍스트
+JS_CALL_SINKS = {
+    'document.write': (None, 'html'),
+    'document.writeln': (None, 'html'),
+    'eval': (None, 'js'),
+    'setattribute': (1, 'attr'),
+}
+# 대입 싱크: 멤버 체인 끝(소문자) -> 컨텍스트
+JS_ASSIGN_SINKS = {
+    'innerhtml': 'html',
+    'location.href': 'url',
+    'window.location': 'url',
+    'document.location': 'url',
+}
+# postMessage 로 받은 값(message 이벤트 핸들러 인자의 .data)
+JS_MESSAGE_SOURCE = 'postmessage.data'
+# 값을 통째로 정화(인코딩/숫자 변환)하는 JS 함수(멤버 체인, 소문자)
+JS_SANITIZER_FUNCS = [
+    'encodeuricomponent',
+    'encodeuri',
+    'parseint',
+    'parsefloat',
+    'number',
+    'dompurify.sanitize',
+]
+
 # 코드 문맥에 포함할 라인 수
 CONTEXT_LINES = 3
+
+# ---------------------------------------------------------------------------
+# 파일 크기/종류별 스캔 정책
+# ---------------------------------------------------------------------------
+# (파일명 접미사, 최소 크기(bytes), 정책) — 위에서부터 처음 맞는 규칙을 쓴다.
+# 정책: 'full'(전체 분석) / 'shallow'(윈도우 단위 얕은 스캔) / 'skip'(건너뜀)
+SCAN_POLICIES = [
+    ('.min.js', 0, 'shallow'),
+    ('.js', 20 * 1024 * 1024, 'skip'),
+    ('.js', 1024 * 1024, 'shallow'),
+    ('.php', 20 * 1024 * 1024, 'skip'),
+    ('.php', 4 * 1024 * 1024, 'shallow'),
+    ('', 0, 'full'),
+]
+# 이보다 긴 라인이 있으면 minified 로 보고 full 대신 shallow 로 스캔한다.
+MINIFIED_LINE_LENGTH = 5000
+# shallow 스캔 윈도우 크기 / 소스-싱크 근접 거리(문자) / 파일당 최대 결과 수
+SHALLOW_WINDOW = 256 * 1024
+SHALLOW_PROXIMITY = 200
+SHALLOW_MAX_FINDINGS = 50
+
+
+# ---------------------------------------------------------------------------
+# 컴파일된 규칙 테이블
+# ---------------------------------------------------------------------------
+# (그룹 이름, 패턴 목록, 대소문자 무시 여부)
+# 리터럴 목록(SINK_FUNCS 등)은 아래 LITERAL_TABLE 의 Aho-Corasick 오토마톤이
+# 담당한다.
+RULE_TABLE = [
+    ('source', SOURCE_PATTERNS, True),
+    ('sink', SINK_TOKENS, True),
+]
+
+
+def _build_combined_regex(table):
+    parts = []
+    for name, pats, ignore_case in table:
+        body = '|'.join(f'(?:{p})' for p in pats)
+        flags = 'i' if ignore_case else '-i'
+        parts.append(f'(?P<{name}>(?{flags}:{body}))')
+    return re.compile('|'.join(parts))
+
+
+# 파일 전체에 대해 finditer 한 번으로 소스/싱크를 모두 찾기 위한 결합 정규식.
+# m.lastgroup 으로 어떤 규칙에 걸렸는지 알 수 있다.
+COMBINED_RULE_RE = _build_combined_regex(RULE_TABLE)
+SOURCE_RE = re.compile('|'.join(f'(?:{p})' for p in SOURCE_PATTERNS), re.IGNORECASE)
+
+# shallow 스캔용: 마스킹 없이 원문에서 소스/싱크 위치만 찾는다.
+SHALLOW_SOURCE_RE = re.compile(
+    '|'.join([f'(?:{p})' for p in SOURCE_PATTERNS] + [re.escape(d) for d in DOM_SOURCES]),
+    re.IGNORECASE,
+)
+SHALLOW_SINK_RE = re.compile(
+    '|'.join(
+        [f'(?P<js>{"|".join(re.escape(h) for h in JS_SINK_HINT)})']
+        + [f'(?:{p})' for p in SINK_TOKENS]
+        + [f'(?-i:{re.escape(f)})' for f in SINK_FUNCS]
+    ),
+    re.IGNORECASE,
+)
+
+# 디코딩 전 원시 바이트에 쓰는 사전 필터. 소스/싱크 토큰이 하나도 없는
+# 파일은 후보가 나올 수 없으므로 분석하지 않는다. (문자열/주석 마스킹 전이라
+# 실제 분석보다 느슨하게, 즉 안전한 쪽으로 판정한다.)
+PREFILTER_RE = re.compile(
+    '|'.join(
+        [f'(?:{p})' for p in SOURCE_PATTERNS + SINK_TOKENS]
+        + [re.escape(h) for h in JS_SINK_HINT]
+        + [f'(?-i:{re.escape(f)})' for f in SINK_FUNCS]
+    ).encode('ascii'),
+    re.IGNORECASE,
+)
+# .js 파일용 사전 필터. JS 분석기(jsanalyzer)가 보는 DOM 소스, message 이벤트,
+# 호출/대입 싱크(맨 location 대입 포함) 중 하나라도 있어야 결과가 나올 수 있다.
+JS_PREFILTER_RE = re.compile(
+    '|'.join(
+        re.escape(t)
+        for t in DOM_SOURCES + list(JS_CALL_SINKS) + list(JS_ASSIGN_SINKS) + ['location', 'message']
+    ).encode('ascii'),
+    re.IGNORECASE,
+)
+
+
+# ---------------------------------------------------------------------------
+# 가드 인덱스
+# ---------------------------------------------------------------------------
+# 식 안의 모든 함수 호출 이름을 한 번에 뽑는 정규식. 가드 여부는 이름으로
+# GUARD_CONTEXTS 를 조회하므로 가드 목록이 길어져도 매칭 비용은 같다.
+FUNC_CALL_RE = re.compile(r'\b([A-Za-z_][A-Za-z0-9_]*)\s*\(')
+
+
+def _build_guard_index(guard_funcs):
+    contexts = {}
+    rank = {}
+    mismatch = {}
+    order = [(ctx, f) for ctx, funcs in guard_funcs.items() for f in funcs]
+    for ctx, funcs in guard_funcs.items():
+        rank[ctx] = {}
+        for i, f in enumerate(funcs):
+            rank[ctx].setdefault(f, i)
+            contexts.setdefault(f, set()).add(ctx)
+    for ctx in list(guard_funcs) + [None]:
+        table = {}
+        for pos, (other, f) in enumerate(order):
+            if other != ctx and f not in table:
+                table[f] = (pos, other)
+        mismatch[ctx] = table
+    return {f: frozenset(c) for f, c in contexts.items()}, rank, mismatch
+
+
+# GUARD_CONTEXTS: 가드 함수 -> 해당 컨텍스트 집합
+# GUARD_RANK[ctx][f]: ctx 의 가드 목록에서 f 의 순서(앞쪽이 우선)
+# GUARD_MISMATCH[ctx][f]: ctx 가 아닌 다른 컨텍스트용 가드 f 의 (우선순위, 그 컨텍스트)
+#   (GUARD_MISMATCH[None] 은 알 수 없는 컨텍스트용으로 모든 가드를 담는다)
+GUARD_CONTEXTS, GUARD_RANK, GUARD_MISMATCH = _build_guard_index(GUARD_FUNCS)
+
+
+# ---------------------------------------------------------------------------
+# 리터럴 규칙 테이블 (Aho-Corasick)
+# ---------------------------------------------------------------------------
+# (카테고리, 리터럴 목록, 매칭 방식)
+# - 'text': 소문자로 바꾼 원본 텍스트 기준 (문자열/주석 안도 포함)
+# - 'code': 문자열/주석이 아닌 코드에서 원문 그대로(대소문자 포함) 등장
+LITERAL_TABLE = [
+    ('sink_func', SINK_FUNCS, 'code'),
+    ('js_hint', [h.lower() for h in JS_SINK_HINT], 'text'),
+    ('attr_hint', [h.lower() for h in ATTR_CONTEXT_HINT], 'text'),
+    ('db_read', DB_READ_APIS, 'text'),
+    ('db_write', DB_WRITE_APIS, 'text'),
+    ('dom', DOM_TOKENS, 'text'),
+    ('js_dom', JS_DOM_TOKENS, 'text'),
+]
+
+
+def _build_literal_automaton(table):
+    keys = []
+    key_index = {}
+    categories = []
+    for category, literals, mode in table:
+        for lit in literals:
+            key = lit.lower()
+            if key not in key_index:
+                key_index[key] = len(keys)
+                keys.append(key)
+                categories.append([])
+            categories[key_index[key]].append((category, mode, lit))
+    return AhoCorasick(keys), keys, [tuple(c) for c in categories]
+
+
+# 모든 리터럴을 담은 오토마톤. 매치 인덱스 i 에 대해
+# LITERAL_KEYS[i] 는 소문자 리터럴, LITERAL_CATEGORIES[i] 는
+# (카테고리, 매칭 방식, 원문 리터럴) 목록이다.
+LITERAL_AUTOMATON, LITERAL_KEYS, LITERAL_CATEGORIES = _build_literal_automaton(LITERAL_TABLE)
@@ -0,0 +1,158 @@
+"""
+다운로더가 함께 쓰는 적응형(AIMD) 토큰 버킷 속도 제한 모듈.
+
+고정 random sleep 은 서버가 여유로울 때도 시간을 버리고, 서버가 429 를
+돌려줄 때는 너무 공격적이다. AdaptiveRateLimiter 는
+
+- 요청마다 토큰 하나를 쓰고, 토큰은 초당 rate 개씩 (최대 burst 개까지) 찬다.
+- 응답이 성공하면 rate 를 step 만큼 올리고(additive increase, max_rate 까지),
+- 429/503 을 받으면 rate 를 factor 배로 줄이며(multiplicative decrease,
+  min_rate 까지) 모아 둔 토큰을 버린다. Retry-After 가 있으면 그 시간
+  동안은 토큰을 내주지 않는다. 동시에 보낸 요청들이 한꺼번에 받은
+  스로틀 응답으로 rate 가 바닥까지 떨어지지 않도록, 줄이는 것은
+  cooldown 초에 한 번뿐이다.
+
+스레드 엔진(downloader)은 acquire(), asyncio 엔진(asyncdownloader)은
+acquire_async() 로 토큰을 기다린다. 기다리는 쪽은 깰 때마다 그때의
+rate 로 다시 계산하므로, 기다리는 동안 rate 가 올라가면 바로 빨라진다.
+한 엔진의 모든 요청이 인스턴스 하나를 나눠 쓴다.
+"""
+
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# 처음 / 최소 / 최대 초당 요청 수
+INITIAL_RATE = 2.0
+MIN_RATE = 0.2
+MAX_RATE = 20.0
+# 성공 응답마다 더하는 값, 스로틀 응답마다 곱하는 값
+RATE_STEP = 0.25
+RATE_FACTOR = 0.5
+# 한 번에 몰아 보낼 수 있는 요청 수
+RATE_BURST = 4
+# rate 를 줄인 뒤 이 시간(초) 안에 받은 스로틀 응답은 rate 를 다시 줄이지 않는다.
+RATE_COOLDOWN = 1.0
+# 서버가 속도를 줄이라고 알리는 상태 코드
+THROTTLE_STATUSES = (429, 503)
+# 스로틀 응답을 받은 요청을 다시 보내는 최대 횟수
+THROTTLE_RETRIES = 5
+# Retry-After 를 이보다 길게 주면 이 값까지만 기다린다(초).
+MAX_RETRY_AFTER = 300.0
+
+
+def parse_retry_after(value):
+    """Retry-After 헤더(초 또는 HTTP-date) -> 기다릴 초(없거나 해석 못 하면 None)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+class AdaptiveRateLimiter:
+    """스레드 안전한 AIMD 토큰 버킷."""
+
+    def __init__(
+        self,
+        rate: float = INITIAL_RATE,
+        max_rate: float = MAX_RATE,
+        min_rate: float = MIN_RATE,
+        step: float = RATE_STEP,
+        factor: float = RATE_FACTOR,
+        burst: int = RATE_BURST,
+        cooldown: float = RATE_COOLDOWN,
+    ):
+        self._lock = threading.Lock()
+        self.reset(rate, max_rate, min_rate, step, factor, burst, cooldown)
+
+    def reset(
+        self,
+        rate: float = INITIAL_RATE,
+        max_rate: float = MAX_RATE,
+        min_rate: float = MIN_RATE,
+        step: float = RATE_STEP,
+        factor: float = RATE_FACTOR,
+        burst: int = RATE_BURST,
+        cooldown: float = RATE_COOLDOWN,
+    ):
+        """설정을 바꾸고 상태(토큰, 통계)를 처음으로 되돌린다."""
+        with self._lock:
+            self.min_rate = min_rate
+            self.max_rate = max(max_rate, min_rate)
+            self.step = step
+            self.factor = factor
+            self.burst = max(burst, 1)
+            self.cooldown = cooldown
+            self._rate = min(max(rate, self.min_rate), self.max_rate)
+            self._tokens = float(self.burst)
+            # 토큰을 마지막으로 채운 시각. Retry-After 동안은 미래 시각이다.
+            self._stamp = time.monotonic()
+            self._decreased = None
+            self.requests = 0
+            self.throttled = 0
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    def describe(self) -> str:
+        return f"{self._rate:.1f} req/s"
+
+    def try_acquire(self) -> float:
+        """토큰이 있으면 하나 쓰고 0, 없으면 다음 토큰이 찰 때까지 남은 초."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._stamp
+            if elapsed > 0:
+                self._tokens = min(self.burst, self._tokens + elapsed * self._rate)
+                self._stamp = now
+            elif elapsed < 0:
+                # Retry-After 로 멈춘 동안
+                return -elapsed + max(1 - self._tokens, 0.0) / self._rate
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self.requests += 1
+                return 0.0
+            return (1 - self._tokens) / self._rate
+
+    def acquire(self):
+        """토큰을 얻을 때까지 현재 스레드를 재운다."""
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """acquire 의 asyncio 버전."""
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self._rate = min(self._rate + self.step, self.max_rate)
+
+    def on_throttle(self, retry_after=None) -> float:
+        """스로틀 응답: rate 를 줄이고 retry_after 초 동안 토큰을 막는다. -> 새 rate."""
+        with self._lock:
+            now = time.monotonic()
+            self.throttled += 1
+            if self._decreased is None or now - self._decreased >= self.cooldown:
+                self._rate = max(self._rate * self.factor, self.min_rate)
+                self._decreased = now
+            self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                # 토큰은 재개 시각부터 다시 찬다.
+                self._stamp = max(self._stamp, now + retry_after)
+            return self._rate
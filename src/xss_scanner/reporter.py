@@ -82,6 +82,29 @@ def _format_verification_label(v: dict) -> str:
     return ""
 
 
+def _format_timeouts(scan_result: dict) -> str:
+    """시간 예산을 넘겨 분석하지 못한 파일 목록 섹션(없으면 빈 문자열)."""
+    timed_out = scan_result.get("timed_out_files") or []
+    if not timed_out:
+        return ""
+    lines = [
+        "## 분석 시간 초과 파일",
+        "",
+        "아래 파일은 파일당 시간 예산을 넘겨 분석을 중단했습니다. 결과에 포함되지 않았으므로 별도로 검토해야 합니다.",
+        "",
+        "| 파일 | 크기(bytes) | 가장 긴 라인 | 비고 |",
+        "|------|-------------|--------------|------|",
+    ]
+    for t in timed_out:
+        note = "워커 강제 종료" if t.get("killed") else f"예산 {t.get('budget')}s 초과"
+        lines.append(
+            f"| `{t.get('file')}` | {t.get('size')} | {t.get('longest_line')} "
+            f"({t.get('longest_length')} bytes) | {note} |"
+        )
+    lines.append("")
+    return "\n".join(lines) + "\n"
+
+
 def generate_local_report(scan_result: dict, top_n: int = 5) -> str:
     """
     플러그인 하나에 대한 스캔 결과를 Markdown 보안 리포트 형식으로 생성.
@@ -103,6 +126,7 @@ def generate_local_report(scan_result: dict, top_n: int = 5) -> str:
             f"해당 플러그인에 대해 정적 분석을 수행한 결과, XSS 취약점 후보는 발견되지 않았습니다.\n"
             f"다만, 정적 분석 도구의 한계로 인해 모든 취약 가능성을 완전히 배제할 수는 없으므로, "
             f"업데이트 시마다 주기적인 보안 점검을 권장합니다.\n"
+            + ("\n" + _format_timeouts(scan_result) if scan_result.get("timed_out_files") else "")
         )
 
     # --- 통계 계산 ---
@@ -170,6 +194,7 @@ def generate_local_report(scan_result: dict, top_n: int = 5) -> str:
     for idx, v in enumerate(top_vulns, 1):
         file_path = v.get("file", "?")
         line_num = v.get("line_num", "?")
+        column = v.get("column")
         risk = v.get("risk_level", "UNKNOWN")
         conf = v.get("confidence", 0)
         category = _classify_type(v.get("vulnerability_category"))
@@ -187,7 +212,10 @@ def generate_local_report(scan_result: dict, top_n: int = 5) -> str:
             report_lines.append(verification_label + "\n")
 
         report_lines.append(f"- **파일 경로**: `{file_path}`")
-        report_lines.append(f"- **라인 번호**: `{line_num}`")
+        if column is not None:
+            report_lines.append(f"- **라인 번호**: `{line_num}` (column `{column}`, 얕은 스캔)")
+        else:
+            report_lines.append(f"- **라인 번호**: `{line_num}`")
         report_lines.append(f"- **취약점 분류(Category)**: `{category}` / 탐지 타입: `{vtype}`")
         report_lines.append(f"- **Risk Level**: `{risk}`")
         report_lines.append(f"- **Confidence**: `{conf}%`")
@@ -214,6 +242,10 @@ def generate_local_report(scan_result: dict, top_n: int = 5) -> str:
         report_lines.append("---")
         report_lines.append("")
 
+    timeout_section = _format_timeouts(scan_result)
+    if timeout_section:
+        report_lines.append(timeout_section)
+
     # 4. verification 강조 섹션
     verified_items = [v for v in vulns if (v.get("verification") or "").strip().lower() in ("verified", "possibly escaped")]
     if verified_items:
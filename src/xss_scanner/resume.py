@@ -0,0 +1,190 @@
+"""
+이어받기(resume) 가능한 .part 다운로드 모듈.
+
+예전에는 zip 을 받다가 연결이 끊기면 <name>.zip.part 를 지우고 다음 실행에서
+처음부터 다시 받았다. 이제 .part 옆에 메타데이터(<name>.zip.part.json:
+URL, ETag/Last-Modified, 전체 길이)를 남겨 두고, 다음 시도는
+
+    Range: bytes=<받은 크기>-
+    If-Range: <ETag 또는 Last-Modified>
+
+로 나머지만 요청한다. 서버가 206 이면 이어 쓰고, 파일이 바뀌어 200 을
+돌려주면 처음부터 다시 쓴다. 다 받은 파일은 크기와 zip 멤버 CRC 를
+확인하고 sha256 을 계산한 뒤에야 os.replace 로 제자리에 옮긴다.
+"""
+
+import hashlib
+import json
+import os
+import re
+import zipfile
+
+META_SUFFIX = '.json'
+# 한 번의 다운로드에서 끊긴 연결을 이어받는 최대 시도 횟수
+RESUME_ATTEMPTS = 3
+_HASH_CHUNK = 1024 * 1024
+_CONTENT_RANGE_RE = re.compile(r'bytes\s+(\d+)-(\d+)/(\d+|\*)')
+
+
+class IncompleteDownload(Exception):
+    """받은 크기가 전체 길이보다 작다(이어받을 수 있다)."""
+
+
+class CorruptDownload(Exception):
+    """받은 파일이 전체 길이보다 크거나 zip 검사에 실패했다(.part 를 버린다)."""
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class PartFile:
+    """
+    <name>.zip.part 와 그 메타데이터.
+
+    생성할 때 메타데이터가 url 과 맞고 검증자(ETag / Last-Modified)가 있으면
+    받은 크기(offset)부터 이어받고, 아니면 남은 .part 를 버린다.
+    """
+
+    def __init__(self, path: str, url: str):
+        self.path = path
+        self.meta_path = path + META_SUFFIX
+        self.url = url
+        self.meta = {}
+        self.offset = 0
+        meta = self._read_meta()
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if meta.get('url') == url and self._if_range(meta) and 0 < size:
+            length = meta.get('length')
+            if length is None or size <= length:
+                self.meta = meta
+                self.offset = size
+                return
+        self.discard()
+
+    def _read_meta(self) -> dict:
+        try:
+            with open(self.meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            return meta if isinstance(meta, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _if_range(meta: dict):
+        """If-Range 값. 약한 ETag(W/)는 If-Range 에 쓸 수 없어 Last-Modified 를 쓴다."""
+        etag = meta.get('etag')
+        if etag and not etag.startswith('W/'):
+            return etag
+        return meta.get('last_modified')
+
+    @property
+    def length(self):
+        return self.meta.get('length')
+
+    @property
+    def complete(self) -> bool:
+        """이미 전체 길이만큼 받았다(요청 없이 검증만 하면 된다)."""
+        return bool(self.offset) and self.length is not None and self.offset >= self.length
+
+    def request_headers(self) -> dict:
+        """
+        이어받기 요청 헤더. 쓸 수 있는 검증자가 없으면(약한 ETag 뿐) Range 를
+        보내지 않고 처음부터 받는다(200 이면 begin 이 .part 를 덮어쓴다).
+        """
+        validator = self._if_range(self.meta)
+        if not self.offset or not validator:
+            return {}
+        return {'Range': f'bytes={self.offset}-', 'If-Range': validator}
+
+    def validators(self) -> dict:
+        """매니페스트에 남길 응답 검증자(ETag / Last-Modified)."""
+        return {'ETag': self.meta.get('etag'), 'Last-Modified': self.meta.get('last_modified')}
+
+    def begin(self, status: int, headers):
+        """
+        응답 상태/헤더를 보고 이어 쓸지(206) 처음부터 쓸지(200) 정해
+        메타데이터를 기록하고 쓰기용 파일 객체를 연다.
+        """
+        if status == 206:
+            m = _CONTENT_RANGE_RE.match(headers.get('Content-Range') or '')
+            if not m or int(m.group(1)) != self.offset:
+                self.discard()
+                raise IncompleteDownload(f"unexpected Content-Range: {headers.get('Content-Range')}")
+            length = _int(m.group(3))
+            mode = 'ab'
+        else:
+            self.offset = 0
+            length = _int(headers.get('Content-Length'))
+            if headers.get('Content-Encoding') not in (None, '', 'identity'):
+                length = None
+            mode = 'wb'
+        self.meta = {
+            'url': self.url,
+            'etag': headers.get('ETag') or (self.meta.get('etag') if status == 206 else None),
+            'last_modified': headers.get('Last-Modified') or (
+                self.meta.get('last_modified') if status == 206 else None
+            ),
+            'length': length,
+        }
+        tmp = self.meta_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, self.meta_path)
+        return open(self.path, mode)
+
+    def refresh(self) -> int:
+        """받은 크기(offset)를 파일 크기로 다시 맞춘다."""
+        self.offset = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return self.offset
+
+    def check_size(self):
+        """스트림이 끝난 뒤 받은 크기를 확인한다(모자라면 IncompleteDownload)."""
+        size = self.refresh()
+        if self.length is not None and size < self.length:
+            raise IncompleteDownload(f"got {size} of {self.length} bytes")
+
+    def verify(self) -> str:
+        """크기와 zip CRC 를 확인하고 sha256 을 돌려준다. 실패하면 .part 를 버리고 CorruptDownload."""
+        size = os.path.getsize(self.path)
+        length = self.length
+        if length is not None and size != length:
+            self.discard()
+            raise CorruptDownload(f"size mismatch: got {size}, expected {length}")
+        try:
+            with zipfile.ZipFile(self.path) as zf:
+                bad = zf.testzip()
+        except (zipfile.BadZipFile, OSError, EOFError) as e:
+            self.discard()
+            raise CorruptDownload(f"not a valid zip: {e}")
+        if bad is not None:
+            self.discard()
+            raise CorruptDownload(f"CRC mismatch in {bad}")
+        digest = hashlib.sha256()
+        with open(self.path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def finish(self, final_path: str):
+        """검증이 끝난 .part 를 final_path 로 옮기고 메타데이터를 지운다."""
+        os.replace(self.path, final_path)
+        self._remove(self.meta_path)
+
+    def discard(self):
+        self.offset = 0
+        self.meta = {}
+        self._remove(self.path)
+        self._remove(self.meta_path)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"[warn] failed to remove {path}: {e}")
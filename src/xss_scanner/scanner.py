@@ -1,65 +1,799 @@
 """
 플러그인 디렉토리 전체를 돌면서 파일들을 스캔하고,
 리포트를 생성/저장하는 상위 레벨 스캐너 모듈.
+
+스캔은 제너레이터 파이프라인으로 동작한다.
+
+    플러그인 -> 파일 -> 파일별 취약점 -> 플러그인 단위 dedupe -> sink
+
+플러그인 하나가 끝나면 그 결과를 sink(리포트 파일, JSONL 등)로 넘기고
+버리므로, 메모리 사용량은 전체 코퍼스 크기가 아니라 가장 큰 플러그인
+크기에 비례한다.
 """
 
+import concurrent.futures
+import mmap
 import os
+import time
+from collections import OrderedDict, deque
 from datetime import datetime
 
-from .analyzer import scan_file_for_xss
-from .reporter import generate_local_report
+from .analyzer import (
+    scan_file_for_xss,
+    resolve_scan_policy,
+    get_stage_timings,
+    reset_stage_timings,
+    merge_stage_timings,
+)
+from .astengine import (
+    AST_CACHE_DIRNAME,
+    AstEngine,
+    get_parse_stats,
+    merge_parse_stats,
+    phply_available,
+    reset_parse_stats,
+)
+from .cache import CACHE_FILENAME, ScanCache, file_kind, hash_file
+from .findings import FileTimeout
+from .includes import (
+    build_include_graph,
+    entry_fingerprint,
+    include_exports,
+    merge_entry_taint,
+    topological_waves,
+)
+from .interproc import EMPTY_RECORD, build_summary_table, relevant_summaries, summarize_file, summary_fingerprint
+from .jsanalyzer import scan_js_file
+from .patterns import JS_PREFILTER_RE, PREFILTER_RE, SCAN_POLICIES
+from .sinks import JsonlSink, ReportSink
+from .watchdog import DEFAULT_FILE_BUDGET, ScanTimeout, WatchdogExecutor, WorkerTimeout, hard_limit, time_budget
 
 DEFAULT_PLUGIN_DIR = "./plugins"
 DEFAULT_REPORT_DIR = "./reports"
 
+SCAN_EXTENSIONS = ('.php', '.js')
+
+# 플러그인 경계에서 워커가 놀지 않도록 몇 개 플러그인 앞까지 미리 제출할지
+PLUGIN_LOOKAHEAD = 2
+# 실행 중 메모리에 들고 있을 "내용 해시 -> 결과" 항목 수 상한.
+# 넘치는 항목은 디스크 캐시(ScanCache)가 대신한다.
+CONTENT_INDEX_SIZE = 50000
+# 이 크기 이상인 파일은 사전 필터에서 mmap 으로 읽는다.
+PREFILTER_MMAP_THRESHOLD = 1024 * 1024
+
+# 스캔 프로필
+#   fast     : 사전 필터 + 파일 단위 후보/규칙 판정(라인 순 taint, 흐름 분석 없음)
+#   standard : 파일 단위 lexer/dataflow taint 분석(기본)
+#   deep     : standard + 함수 요약/include 그래프(interprocedural)
+PROFILES = ('fast', 'standard', 'deep')
+# 승격(promote) 모드에서 이 위험도의 결과가 나온 플러그인은 deep 으로 다시 스캔한다.
+PROMOTE_RISKS = ('CRITICAL', 'HIGH')
 
-def scan_plugin_directory(plugin_dir: str):
+
+def iter_plugin_dirs(plugin_root_dir: str):
     """
-    플러그인 디렉토리(php/js 파일들)를 모두 스캔하고
-    취약점 리스트를 반환한다.
+    plugins/ 아래 플러그인 디렉토리를 이름 순으로 내보낸다.
+    ('.' 으로 시작하는 다운로더 작업 디렉토리는 뺀다)
     """
-    plugin_name = os.path.basename(os.path.abspath(plugin_dir))
-    all_vulnerabilities = []
-    file_count = 0
+    for d in sorted(os.listdir(plugin_root_dir)):
+        if d.startswith('.'):
+            continue
+        p = os.path.join(plugin_root_dir, d)
+        if os.path.isdir(p):
+            yield p
 
-    print(f"[*] Scanning (improved): {plugin_name}")
 
+def iter_plugin_files(plugin_dir: str):
+    """
+    플러그인 디렉토리 안의 php/js 파일 경로를 정렬된 순서로 내보낸다.
+    (작업 수와 무관하게 결과 순서가 같도록 정렬)
+    """
     for root, dirs, files in os.walk(plugin_dir):
-        for file in files:
-            if file.lower().endswith(('.php', '.js')):
-                file_path = os.path.join(root, file)
-                file_count += 1
-                vulns = scan_file_for_xss(file_path)
-                all_vulnerabilities.extend(vulns)
-
-    # dedupe
+        dirs.sort()
+        for file in sorted(files):
+            if file.lower().endswith(SCAN_EXTENSIONS):
+                yield os.path.join(root, file)
+
+
+_SIZE_UNITS = {'': 1, 'k': 1024, 'm': 1024 * 1024, 'g': 1024 * 1024 * 1024}
+
+
+def parse_scan_policy(spec: str):
+    """
+    'SUFFIX:MIN_SIZE:POLICY' 형식(예: '.min.js:0:skip', '.js:5M:shallow')을
+    (접미사, 최소 크기(bytes), 정책) 으로 바꾼다. 크기에는 K/M/G 단위를 쓸 수 있다.
+    """
+    parts = spec.rsplit(':', 2)
+    if len(parts) != 3:
+        raise ValueError(f"정책 형식 오류: {spec!r} (SUFFIX:MIN_SIZE:POLICY)")
+    suffix, size, policy = parts
+    policy = policy.strip().lower()
+    if policy not in ('full', 'shallow', 'skip'):
+        raise ValueError(f"알 수 없는 정책: {policy!r} (full/shallow/skip)")
+    size = size.strip().lower()
+    unit = size[-1:] if size[-1:] in _SIZE_UNITS else ''
+    number = size[:-1] if unit else size
+    try:
+        min_size = int(float(number or 0) * _SIZE_UNITS[unit])
+    except ValueError:
+        raise ValueError(f"크기 형식 오류: {size!r}")
+    return suffix.strip().lower(), min_size, policy
+
+
+def build_scan_policies(specs=None):
+    """사용자 정책을 기본 정책(SCAN_POLICIES) 앞에 붙인다. 없으면 None(기본값)."""
+    if not specs:
+        return None
+    return [parse_scan_policy(s) if isinstance(s, str) else tuple(s) for s in specs] + list(SCAN_POLICIES)
+
+
+def fast_policies(policies=None):
+    """
+    fast 프로필용 정책: skip/shallow 규칙은 그대로 두고, full 로 분석할 파일은
+    흐름 분석 없이 후보/규칙 판정만 하는 'heuristic' 으로 바꾼다.
+    """
+    return [(suffix, size, 'heuristic' if policy == 'full' else policy)
+            for suffix, size, policy in (policies or SCAN_POLICIES)] + [('', 0, 'heuristic')]
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def file_may_have_candidates(file_path: str) -> bool:
+    """
+    사전 필터: 원시 바이트에서 소스/싱크 토큰을 하나라도 찾으면 True.
+    .js 는 JS 분석기 기준(JS_PREFILTER_RE), 나머지는 PREFILTER_RE 로 본다.
+    큰 파일은 mmap 으로 읽어 디코딩/복사 없이 검사한다.
+    읽을 수 없는 파일은 분석 단계에 맡긴다(True).
+    """
+    pattern = JS_PREFILTER_RE if file_path.lower().endswith('.js') else PREFILTER_RE
+    try:
+        size = os.path.getsize(file_path)
+        if size == 0:
+            return False
+        with open(file_path, 'rb') as f:
+            if size >= PREFILTER_MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return pattern.search(mm) is not None
+            return pattern.search(f.read()) is not None
+    except (OSError, ValueError):
+        return True
+
+
+def make_engine(name: str = 'regex', cache_dir: str = None):
+    """
+    --engine 이름 -> 분석 엔진 객체(정규식 엔진이면 None).
+    ast 인데 phply 가 설치되어 있지 않으면 ValueError.
+    """
+    if name == 'regex':
+        return None
+    if name != 'ast':
+        raise ValueError(f"알 수 없는 엔진: {name}")
+    if not phply_available():
+        raise ValueError("--engine ast 에는 phply 가 필요합니다 (pip install phply)")
+    return AstEngine(cache_dir=cache_dir)
+
+
+def _scan_with(file_path: str, policies=None, summaries=None, entry_taint=None, engine=None):
+    """확장자별로 분석기를 고른다(.js 는 JS 분석기, 나머지는 engine 또는 정규식 엔진)."""
+    if file_path.lower().endswith('.js'):
+        return scan_js_file(file_path, policies)
+    if engine is not None:
+        return engine.scan(file_path, policies, summaries, entry_taint)
+    return scan_file_for_xss(file_path, policies, summaries, entry_taint)
+
+
+def _scan_budgeted(file_path: str, policies=None, summaries=None, entry_taint=None, engine=None, budget=0):
+    """budget 초 안에 끝나지 않으면 분석을 멈추고 FileTimeout 을 돌려준다."""
+    try:
+        with time_budget(budget):
+            return _scan_with(file_path, policies, summaries, entry_taint, engine)
+    except ScanTimeout:
+        return FileTimeout.for_path(file_path, budget)
+
+
+def _scan_file_task(file_path: str, policies=None, summaries=None, entry_taint=None, engine=None, budget=0):
+    """
+    워커 프로세스에서 실행되는 파일 단위 작업.
+    취약점 리스트(시간 초과면 FileTimeout)와 이 파일에서 측정한 단계별 시간,
+    파싱 캐시 통계를 돌려준다.
+    """
+    reset_stage_timings()
+    reset_parse_stats()
+    vulns = _scan_budgeted(file_path, policies, summaries, entry_taint, engine, budget)
+    return file_path, vulns, get_stage_timings(), get_parse_stats()
+
+
+def _scan_file_inline(file_path: str, policies=None, summaries=None, entry_taint=None, engine=None, budget=0):
+    """같은 프로세스에서 실행할 때용(단계별 시간/파싱 통계는 그대로 누적된다)."""
+    return file_path, _scan_budgeted(file_path, policies, summaries, entry_taint, engine, budget), {}, {}
+
+
+def _summarize_budgeted(file_path: str, budget=0):
+    """함수 지역 요약(시간 초과면 None)."""
+    try:
+        with time_budget(budget):
+            return summarize_file(file_path)
+    except ScanTimeout:
+        print(f"[timeout] {file_path}: 함수 요약 시간 초과 ({budget}s)")
+        return None
+
+
+def _summarize_file_task(file_path: str, budget=0):
+    """워커에서 실행되는 함수 지역 요약 작업: (요약 레코드, 단계별 시간)."""
+    reset_stage_timings()
+    record = _summarize_budgeted(file_path, budget)
+    return record, get_stage_timings()
+
+
+def _summarize_file_inline(file_path: str, budget=0):
+    return _summarize_budgeted(file_path, budget), {}
+
+
+def _exports_budgeted(file_path: str, lines, entry_taint=None, summaries=None, budget=0):
+    """include 지점별 taint(시간 초과면 None)."""
+    try:
+        with time_budget(budget):
+            return include_exports(file_path, lines, entry_taint, summaries)
+    except ScanTimeout:
+        print(f"[timeout] {file_path}: include taint 계산 시간 초과 ({budget}s)")
+        return None
+
+
+def _export_file_task(file_path: str, lines, entry_taint=None, summaries=None, budget=0):
+    """워커에서 실행되는 include 지점별 taint 계산: (결과, 단계별 시간)."""
+    reset_stage_timings()
+    exports = _exports_budgeted(file_path, lines, entry_taint, summaries, budget)
+    return exports, get_stage_timings()
+
+
+def _export_file_inline(file_path: str, lines, entry_taint=None, summaries=None, budget=0):
+    return _exports_budgeted(file_path, lines, entry_taint, summaries, budget), {}
+
+
+class _InlineExecutor:
+    """jobs=1 일 때 쓰는, 제출 즉시 실행하는 executor."""
+
+    def submit(self, fn, *args):
+        f = concurrent.futures.Future()
+        f.set_result(fn(*args))
+        return f
+
+    def shutdown(self, wait=True):
+        pass
+
+
+class ContentIndex:
+    """실행 중 분석한 파일 내용 키 -> Finding 리스트 (LRU)."""
+
+    def __init__(self, max_entries: int = CONTENT_INDEX_SIZE):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key):
+        vulns = self._items.get(key)
+        if vulns is not None:
+            self._items.move_to_end(key)
+        return vulns
+
+    def put(self, key, vulns):
+        self._items[key] = vulns
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+
+
+def _budgeted_result(fut, file_path: str, on_kill):
+    """Future 결과. 감시 스레드가 워커를 죽였으면 on_kill() 을 돌려준다."""
+    try:
+        return fut.result()
+    except WorkerTimeout as e:
+        print(f"[timeout] {file_path}: 워커 강제 종료 ({e.elapsed:.1f}s)")
+        return on_kill()
+
+
+class ScanPipeline:
+    """
+    파일 -> 취약점 단계.
+
+    - 내용이 같은 파일(플러그인마다 들어있는 jQuery, vendor/ 패키지 등)은
+      실행 전체에서 한 번만 분석하고, 결과를 모든 경로로 복사한다.
+      결과 키는 (내용 해시, 확장자:스캔 정책)이라 x.js 와 x.min.js 처럼
+      정책이 다른 파일끼리는 결과를 나누지 않는다.
+    - cache 가 주어지면 지난 실행에서 분석한 내용은 캐시된 결과를 쓴다.
+    - 사전 필터(file_may_have_candidates)에 걸리지 않는 파일은 분석하지 않는다.
+    - jobs > 1 이면 프로세스 풀에서 파일 단위로 병렬 실행하며,
+      플러그인마다 큰 파일부터 먼저 제출한다.
+    - policies 는 파일 크기/종류별 스캔 정책(None 이면 SCAN_POLICIES).
+    - interprocedural 이면 플러그인마다 먼저 모든 PHP 파일의 함수 요약을
+      만들어(내용 해시로 메모이즈) 합친 뒤, 파일마다 호출하는 함수의 요약을
+      함께 넘겨 분석한다. 이때 결과 키에는 그 요약의 해시가 붙는다.
+      또한 include/require 의존 그래프를 위상 순서대로 훑어 파일마다
+      include 하는 쪽에서 넘어오는 진입 taint 를 모으고, 그 진입 taint 로
+      분석한다(결과 키에는 진입 taint 의 해시가 붙는다).
+    - engine 이 주어지면(AstEngine) PHP 파일을 그 엔진으로 분석한다.
+    - tier 가 주어지면(예: 'fast') 결과 키에 붙여, 같은 캐시를 쓰는 다른
+      프로필의 결과와 섞이지 않게 한다.
+    - executor 가 주어지면 그 풀을 함께 쓴다(닫지 않는다). 승격 모드에서
+      fast/deep 두 파이프라인이 워커를 나눠 쓸 때 쓴다.
+    - budget 은 파일 하나의 시간 예산(초, 0 이면 없음)이다. 워커 안에서
+      SIGALRM 으로 걸고, jobs > 1 이면 WatchdogExecutor 가 예산이 듣지 않는
+      작업의 워커를 죽이고 풀을 다시 띄운다. 예산을 넘긴 파일은 FileTimeout
+      으로 내보내며 캐시에 저장하지 않는다.
+    stats['seconds'] 에는 이 파이프라인의 plan/collect 에 걸린 시간을 누적한다.
+    """
+
+    def __init__(self, jobs: int = 1, cache: ScanCache = None, stats: dict = None, policies=None,
+                 interprocedural: bool = False, engine=None, tier: str = None, executor=None,
+                 budget: float = 0):
+        self.own_executor = executor is None
+        if jobs > 1:
+            if executor is None:
+                executor = (WatchdogExecutor(jobs, hard_limit(budget)) if budget
+                            else concurrent.futures.ProcessPoolExecutor(max_workers=jobs))
+            self.executor = executor
+            self._task = _scan_file_task
+            self._summary_task = _summarize_file_task
+            self._export_task = _export_file_task
+        else:
+            self.executor = executor or _InlineExecutor()
+            self._task = _scan_file_inline
+            self._summary_task = _summarize_file_inline
+            self._export_task = _export_file_inline
+        self.cache = cache
+        self.policies = policies
+        self.interprocedural = interprocedural
+        self.engine = engine
+        self.tier = tier
+        self.budget = budget
+        self.index = ContentIndex()
+        self.summary_index = ContentIndex()  # 내용 해시 -> 함수 지역 요약 레코드
+        self.export_index = ContentIndex()  # (내용 해시, 진입 키) -> include 지점별 taint
+        self.inflight = {}  # 내용 키 -> Future
+        self.stats = stats if stats is not None else {}
+        for k in ('files', 'dedup_files', 'dedup_bytes', 'prefiltered', 'seconds'):
+            self.stats.setdefault(k, 0)
+        if interprocedural:
+            for k in ('summarized', 'summary_reused', 'functions',
+                      'include_edges', 'include_analyzed', 'include_reused'):
+                self.stats.setdefault(k, 0)
+
+    def _content_key(self, fp: str):
+        try:
+            digest = self.cache.digest_for(fp) if self.cache is not None else hash_file(fp)
+        except OSError:
+            digest = 'path:' + fp
+        return digest, file_kind(fp)
+
+    def _plugin_summaries(self, files):
+        """
+        플러그인의 (경로, 내용 키) 목록 ->
+        ({경로: 그 파일이 호출하는 함수 요약}, {경로: 지역 요약 레코드}).
+        지역 요약은 실행 중 메모리/디스크 캐시에서 재사용하고, 없는 것만
+        워커에서 만든다.
+        """
+        records = {}   # 내용 해시 -> 지역 요약 레코드
+        pending = {}   # 내용 해시 -> Future
+        php_files = [(fp, key[0]) for fp, key in files if key[1] == '.php']
+        for fp, digest in php_files:
+            if digest in records or digest in pending:
+                continue
+            memo = not digest.startswith('path:')
+            rec = self.summary_index.get(digest) if memo else None
+            if rec is None and memo and self.cache is not None:
+                rec = self.cache.get_summary(digest)
+                if rec is not None:
+                    self.summary_index.put(digest, rec)
+            if rec is not None:
+                self.stats['summary_reused'] += 1
+                records[digest] = rec
+            else:
+                pending[digest] = (fp, self.executor.submit(self._summary_task, fp, self.budget))
+
+        for digest, (fp, fut) in pending.items():
+            rec, timings = _budgeted_result(fut, fp, lambda: (None, {}))
+            merge_stage_timings(timings)
+            self.stats['summarized'] += 1
+            if rec is None:
+                # 시간 초과: 요약 없이 진행하고 캐시하지 않는다.
+                records[digest] = EMPTY_RECORD
+                continue
+            records[digest] = rec
+            if not digest.startswith('path:'):
+                self.summary_index.put(digest, rec)
+                if self.cache is not None:
+                    self.cache.put_summary(digest, rec)
+
+        table = build_summary_table(records.values())
+        self.stats['functions'] += len(table)
+        callees = {fp: relevant_summaries(table, records[digest]['calls']) for fp, digest in php_files}
+        return callees, {fp: records[digest] for fp, digest in php_files}
+
+    def _plugin_entry_taint(self, plugin_dir: str, files, records: dict, callees_by_file: dict) -> dict:
+        """
+        include 그래프를 위상 순서(include 하는 파일 먼저)로 훑어 파일마다
+        진입 taint 를 모은다. -> {경로: {변수: [소스, 라인, hop]}}
+        include 하는 파일만 한 번씩 분석하며, 결과는 (내용 해시, 진입 taint,
+        호출 함수 요약) 으로 메모이즈한다.
+        """
+        graph = build_include_graph(records)
+        digests = {fp: key[0] for fp, key in files}
+        entries = {fp: {} for fp in graph}
+        for wave in topological_waves(graph):
+            exports, pending = {}, {}
+            for fp in wave:
+                edges = graph[fp]
+                if not edges:
+                    continue
+                self.stats['include_edges'] += len(edges)
+                entry = entries[fp] or None
+                callees = callees_by_file.get(fp) or None
+                digest = digests[fp]
+                memo = (digest, entry_fingerprint({'entry': entry, 'callees': callees}))
+                cached = None
+                if not digest.startswith('path:'):
+                    cached = self.export_index.get(memo)
+                    if cached is None and self.cache is not None:
+                        cached = self.cache.get_export(*memo)
+                if cached is not None:
+                    self.stats['include_reused'] += 1
+                    exports[fp] = cached
+                else:
+                    lines = [line for line, _ in edges]
+                    pending[fp] = (memo, self.executor.submit(self._export_task, fp, lines, entry, callees,
+                                                              self.budget))
+            for fp, (memo, fut) in pending.items():
+                result, timings = _budgeted_result(fut, fp, lambda: (None, {}))
+                merge_stage_timings(timings)
+                self.stats['include_analyzed'] += 1
+                if result is None:
+                    exports[fp] = {}
+                    continue
+                exports[fp] = result
+                if not memo[0].startswith('path:'):
+                    self.export_index.put(memo, result)
+                    if self.cache is not None:
+                        self.cache.put_export(*memo, result)
+            for fp, result in exports.items():
+                origin = os.path.relpath(fp, plugin_dir).replace(os.sep, '/')
+                for line, target in graph[fp]:
+                    merge_entry_taint(entries[target], result.get(str(line), {}), origin)
+        return {fp: entry for fp, entry in entries.items() if entry}
+
+    def plan(self, plugin_dir: str):
+        """
+        플러그인 하나의 파일 목록을 만들고, 새로 분석해야 하는 내용만
+        워커에 제출한다. collect() 에 넘길 작업 정보를 돌려준다.
+        """
+        started = time.perf_counter()
+        files = [(fp, self._content_key(fp)) for fp in iter_plugin_files(plugin_dir)]
+        callees_by_file, entry_by_file = {}, {}
+        if self.interprocedural:
+            callees_by_file, records = self._plugin_summaries(files)
+            entry_by_file = self._plugin_entry_taint(plugin_dir, files, records, callees_by_file)
+
+        entries = []
+        new_keys = {}
+        for fp, key in files:
+            callees = callees_by_file.get(fp) or None
+            entry = entry_by_file.get(fp)
+            # 같은 내용이라도 이름/크기에 따라 정책(x.js: full, x.min.js: shallow)이 다르다.
+            kind = f"{key[1]}:{resolve_scan_policy(fp, _file_size(fp), self.policies)}"
+            if callees:
+                kind += f"+{summary_fingerprint(callees)}"
+            if entry:
+                kind += f"@{entry_fingerprint(entry)}"
+            if self.tier:
+                kind += f"!{self.tier}"
+            key = (key[0], kind)
+            entries.append((fp, key, callees, entry))
+            self.stats['files'] += 1
+            if key in new_keys or key in self.inflight or key in self.index:
+                self.stats['dedup_files'] += 1
+                self.stats['dedup_bytes'] += _file_size(fp)
+                continue
+            if self.cache is not None and not key[0].startswith('path:'):
+                cached = self.cache.get(key[0], key[1], fp)
+                if cached is not None:
+                    self.index.put(key, cached)
+                    continue
+            # 싱크로 이어지는 함수를 부르거나 진입 taint 가 있는 파일은
+            # 소스/싱크 토큰이 없어도 분석한다.
+            if not callees and not entry and not file_may_have_candidates(fp):
+                self.stats['prefiltered'] += 1
+                self._store(key, [])
+                continue
+            new_keys[key] = (fp, callees, entry)
+
+        for key, (fp, callees, entry) in sorted(new_keys.items(), key=lambda kv: (-_file_size(kv[1][0]), kv[1][0])):
+            self.inflight[key] = self.executor.submit(self._task, fp, self.policies, callees, entry, self.engine,
+                                                      self.budget)
+        self.stats['seconds'] += time.perf_counter() - started
+        return plugin_dir, entries
+
+    def _store(self, key, vulns):
+        if isinstance(vulns, FileTimeout):
+            # 시간 초과는 예산에 따라 달라지므로 이번 실행 안에서만 재사용한다.
+            self.index.put(key, vulns)
+            return
+        if self.cache is not None and not key[0].startswith('path:'):
+            self.cache.put(key[0], key[1], vulns)
+        self.index.put(key, vulns)
+
+    def _resolve(self, fp: str, key, callees=None, entry=None):
+        fut = self.inflight.pop(key, None)
+        if fut is not None:
+            _, vulns, timings, parse_stats = _budgeted_result(
+                fut, fp, lambda: (fp, FileTimeout.for_path(fp, self.budget, killed=True), {}, {}))
+            merge_stage_timings(timings)
+            merge_parse_stats(parse_stats)
+            self._store(key, vulns)
+            return vulns
+        vulns = self.index.get(key)
+        if vulns is None:
+            # LRU 에서 밀려난 경우: 직접 다시 분석
+            vulns = _scan_budgeted(fp, self.policies, callees, entry, self.engine, self.budget)
+            self.index.put(key, vulns)
+        return vulns
+
+    def collect(self, job):
+        """plan() 결과의 파일별 (경로, Finding 리스트) 를 파일 순서대로 내보낸다."""
+        _, entries = job
+        for fp, key, callees, entry in entries:
+            started = time.perf_counter()
+            vulns = self._resolve(fp, key, callees, entry)
+            self.stats['seconds'] += time.perf_counter() - started
+            if isinstance(vulns, FileTimeout):
+                yield fp, vulns if vulns.file == fp else vulns.with_file(fp)
+                continue
+            yield fp, [v if v.file == fp else v.with_file(fp) for v in vulns]
+        if self.cache is not None:
+            self.cache.commit()
+
+    def close(self):
+        if self.own_executor:
+            self.executor.shutdown(wait=True)
+            self.stats['worker_restarts'] = getattr(self.executor, 'restarts', 0)
+        if self.cache is not None:
+            self.cache.commit()
+
+
+def _has_promotable(file_results) -> bool:
+    return any(
+        v.risk_level in PROMOTE_RISKS
+        for _, vulns in file_results if not isinstance(vulns, FileTimeout)
+        for v in vulns
+    )
+
+
+def scan_plugins(plugin_dirs, jobs: int = 1, cache: ScanCache = None, stats: dict = None,
+                 lookahead: int = PLUGIN_LOOKAHEAD, policies=None, interprocedural: bool = False,
+                 engine=None, profile: str = 'standard', promote: bool = False, budget: float = 0):
+    """
+    플러그인들을 순서대로 스캔하며 (plugin_dir, 파일 결과 제너레이터) 를 내보낸다.
+    파일 결과 제너레이터는 다음 플러그인으로 넘어가기 전에 소비해야 한다.
+
+    lookahead 개 플러그인까지는 미리 작업을 제출해 둔다.
+
+    profile 은 PROFILES 중 하나다(interprocedural=True 는 'deep' 과 같다).
+    promote 이면 profile 로 먼저 훑고, PROMOTE_RISKS 결과가 나온 플러그인만
+    deep 으로 다시 스캔해 그 결과를 내보낸다. 이때 stats['tiers'] 에
+    티어별 {'files', 'plugins', 'seconds'} 를 남긴다.
+
+    budget 은 파일 하나의 시간 예산(초, ScanPipeline 참고)이다.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"알 수 없는 프로필: {profile}")
+    if interprocedural:
+        profile = 'deep'
+    stats = stats if stats is not None else {}
+    fast = profile == 'fast'
+    pipeline = ScanPipeline(jobs=jobs, cache=cache, stats=stats,
+                            policies=fast_policies(policies) if fast else policies,
+                            interprocedural=profile == 'deep', engine=None if fast else engine,
+                            tier='fast' if fast else None, budget=budget)
+    deep = None
+    tiers = {profile: {'files': 0, 'plugins': 0, 'seconds': 0.0}}
+    if promote and profile != 'deep':
+        deep = ScanPipeline(jobs=jobs, cache=cache, stats={}, policies=policies,
+                            interprocedural=True, engine=engine, executor=pipeline.executor, budget=budget)
+        tiers['deep'] = {'files': 0, 'plugins': 0, 'seconds': 0.0}
+    stats['tiers'] = tiers
+
+    def _emit(job):
+        tiers[profile]['plugins'] += 1
+        if deep is None:
+            return job[0], pipeline.collect(job)
+        file_results = list(pipeline.collect(job))
+        if not _has_promotable(file_results):
+            return job[0], iter(file_results)
+        tiers['deep']['plugins'] += 1
+        return job[0], deep.collect(deep.plan(job[0]))
+
+    try:
+        window = deque()
+        for pd in plugin_dirs:
+            window.append(pipeline.plan(pd))
+            if len(window) > lookahead:
+                yield _emit(window.popleft())
+        while window:
+            yield _emit(window.popleft())
+    finally:
+        if deep is not None:
+            deep.close()
+            # 파일 수/중복 제거 통계는 첫 티어 기준, 요약/include 통계는 deep 에서 합친다.
+            for k, v in deep.stats.items():
+                if k not in ('files', 'dedup_files', 'dedup_bytes', 'prefiltered', 'seconds', 'worker_restarts'):
+                    stats[k] = stats.get(k, 0) + v
+            tiers['deep']['files'] = deep.stats['files']
+            tiers['deep']['seconds'] = deep.stats['seconds']
+        pipeline.close()
+        tiers[profile]['files'] = stats['files']
+        tiers[profile]['seconds'] = stats['seconds']
+
+
+def dedupe_findings(file_results, counter: dict = None):
+    """
+    플러그인 하나의 파일 결과에서 (파일, 라인, column, tainted 변수) 가 같은 취약점을
+    걸러 내보낸다. seen 집합은 이 플러그인이 끝나면 버려진다.
+    counter 가 주어지면 파일 수를 'files' 에, 시간 예산을 넘긴 파일(FileTimeout)을
+    'timed_out' 에 모은다.
+    """
     seen = set()
+    for fp, vulns in file_results:
+        if counter is not None:
+            counter['files'] = counter.get('files', 0) + 1
+        if isinstance(vulns, FileTimeout):
+            if counter is not None:
+                counter.setdefault('timed_out', []).append(vulns)
+            continue
+        for v in vulns:
+            key = (v['file'], v['line_num'], v.get('column'), v.get('tainted_var'))
+            if key not in seen:
+                seen.add(key)
+                yield v
+
+
+def _consume_plugin(plugin_dir: str, file_results, sinks=()) -> dict:
+    """
+    플러그인 하나의 결과를 dedupe 하면서 sink 로 흘려보내고,
+    신뢰도 순으로 정렬한 플러그인 결과 dict 를 만든다.
+    """
+    plugin_name = os.path.basename(os.path.abspath(plugin_dir))
+    counter = {}
     unique = []
-    for v in all_vulnerabilities:
-        key = (v['file'], v['line_num'], v.get('tainted_var'))
-        if key not in seen:
-            seen.add(key)
-            unique.append(v)
+    for v in dedupe_findings(file_results, counter):
+        unique.append(v)
+        for sink in sinks:
+            sink.on_finding(plugin_name, v)
 
     unique.sort(key=lambda x: x.get('confidence', 0), reverse=True)
+    file_count = counter.get('files', 0)
+    timed_out = counter.get('timed_out', [])
     print(f"[+] {plugin_name}: {file_count} files, {len(unique)} unique vulns (improved)")
+    for t in timed_out:
+        print(
+            f"[timeout] {t.file}: {t.size} bytes, longest line {t.longest_line} "
+            f"({t.longest_length} bytes)" + (", worker killed" if t.killed else "")
+        )
 
     return {
         'plugin_name': plugin_name,
         'plugin_dir': plugin_dir,
         'total_files_scanned': file_count,
         'vulnerabilities': unique,
+        'timed_out_files': [t.to_dict() for t in timed_out],
         'scan_time': datetime.now().isoformat(),
     }
 
 
+def _print_timings(timings: dict):
+    if timings:
+        print('[timing] ' + ', '.join(f"{k}={v:.3f}s" for k, v in sorted(timings.items())))
+
+
+def _print_parse_stats(stats: dict):
+    """--engine ast 의 파싱 캐시 적중률과 정규식 엔진으로 되돌아간 파일 수."""
+    lookups = stats.get('hits', 0) + stats.get('misses', 0)
+    rate = 100.0 * stats.get('hits', 0) / lookups if lookups else 0.0
+    print(
+        f"[ast] parse cache hits={stats.get('hits', 0)}/{lookups} ({rate:.1f}%), "
+        f"parsed={stats.get('parsed', 0)}, failed={stats.get('failed', 0)}, "
+        f"timeouts={stats.get('timeouts', 0)}, regex fallback={stats.get('fallback', 0)}"
+    )
+
+
+def _print_tiers(tiers: dict):
+    """프로필 티어별 파일 수와 시간(승격 모드면 deep 으로 다시 스캔한 플러그인 수 포함)."""
+    parts = []
+    for name in PROFILES:
+        t = tiers.get(name)
+        if t is None:
+            continue
+        text = f"{name}: {t['files']} files in {t['seconds']:.3f}s"
+        if name == 'deep' and len(tiers) > 1:
+            text += f" ({t['plugins']} plugins promoted)"
+        parts.append(text)
+    print('[tiers] ' + ', '.join(parts))
+
+
+def _cache_options(policies=None, engine: str = 'regex'):
+    """결과 캐시 키(findings 의 종류)에 반영할 스캔 옵션. 모두 기본값이면 None."""
+    options = {}
+    if policies:
+        options['policies'] = policies
+    if engine != 'regex':
+        options['engine'] = engine
+    return options or None
+
+
+def scan_plugin_directory(plugin_dir: str, jobs: int = 1, policies=None, interprocedural: bool = False,
+                          engine: str = 'regex', profile: str = 'standard', promote: bool = False,
+                          budget: float = DEFAULT_FILE_BUDGET):
+    """
+    플러그인 디렉토리(php/js 파일들)를 모두 스캔하고
+    취약점 리스트를 반환한다.
+    """
+    plugin_name = os.path.basename(os.path.abspath(plugin_dir))
+    print(f"[*] Scanning (improved): {plugin_name}")
+    reset_stage_timings()
+    reset_parse_stats()
+
+    res = None
+    for pd, file_results in scan_plugins([plugin_dir], jobs=jobs, policies=policies,
+                                          interprocedural=interprocedural, engine=make_engine(engine),
+                                          profile=profile, promote=promote, budget=budget):
+        res = _consume_plugin(pd, file_results)
+
+    timings = get_stage_timings()
+    _print_timings(timings)
+    if engine == 'ast':
+        _print_parse_stats(get_parse_stats())
+    res['stage_timings'] = timings
+    return res
+
+
 def scan_downloaded_plugins(
     plugin_root_dir: str = DEFAULT_PLUGIN_DIR,
     report_dir: str = DEFAULT_REPORT_DIR,
+    jobs: int = 1,
+    use_cache: bool = True,
+    cache_path: str = None,
+    jsonl_path: str = None,
+    policies=None,
+    interprocedural: bool = False,
+    engine: str = 'regex',
+    profile: str = 'standard',
+    promote: bool = False,
+    budget: float = DEFAULT_FILE_BUDGET,
 ):
     """
     plugins/ 아래에 있는 플러그인 디렉토리를 모두 순회하며
     스캔을 수행하고, reports/에 리포트를 저장한다.
+
+    - jobs > 1 이면 프로세스 풀에서 파일 단위로 병렬 스캔한다.
+    - use_cache 이면 reports/ 아래(또는 cache_path)의 스캔 캐시를 사용해
+      지난 실행과 내용이 같은 파일은 다시 분석하지 않는다.
+    - jsonl_path 가 주어지면 취약점을 발견 즉시 JSONL 로 기록한다.
+    - policies 는 파일 크기/종류별 스캔 정책(build_scan_policies 결과).
+    - interprocedural 이면 플러그인 단위 함수 요약으로 함수/파일 경계를
+      넘는 taint 흐름도 추적한다.
+    - engine='ast' 이면 PHP 파일을 phply AST 로 분석한다. use_cache 이면
+      파싱한 AST 를 reports/.ast_cache 에 캐시한다.
+    - profile 은 fast/standard/deep(PROFILES). interprocedural=True 는 deep 과 같다.
+    - promote 이면 profile 로 훑은 뒤 CRITICAL/HIGH 결과가 나온 플러그인만
+      deep 으로 다시 스캔한다.
+    - budget 은 파일 하나의 시간 예산(초, 0 이면 없음). 넘긴 파일은 분석을
+      멈추고 리포트/JSONL 에 경로, 크기, 가장 긴 라인과 함께 기록한다.
+
+    플러그인별 결과는 sink 로 넘긴 뒤 버리고, 전체 요약(dict)만 반환한다.
     """
     print('\n' + '=' * 50)
     print('XSS 취약점 스캔 시작')
@@ -69,31 +803,89 @@ def scan_downloaded_plugins(
         print(f"플러그인 디렉터리 없음: {plugin_root_dir}")
         return
 
-    plugin_dirs = [
-        os.path.join(plugin_root_dir, d)
-        for d in os.listdir(plugin_root_dir)
-        if os.path.isdir(os.path.join(plugin_root_dir, d))
-    ]
-    if not plugin_dirs:
+    plugin_dirs = iter_plugin_dirs(plugin_root_dir)
+    first = next(plugin_dirs, None)
+    if first is None:
         print('스캔할 플러그인 없음')
         return
 
+    def _all_plugins():
+        yield first
+        yield from plugin_dirs
+
     os.makedirs(report_dir, exist_ok=True)
+    reset_stage_timings()
+    reset_parse_stats()
+    if interprocedural:
+        profile = 'deep'
+    promote = promote and profile != 'deep'
+    print(f"[*] jobs={jobs}, engine={engine}, profile={profile}" + (" (promote to deep)" if promote else ""))
+    ast_engine = make_engine(engine, os.path.join(report_dir, AST_CACHE_DIRNAME) if use_cache else None)
+
+    sinks = [ReportSink(report_dir)]
+    if jsonl_path:
+        sinks.append(JsonlSink(jsonl_path))
+
+    cache = None
+    if use_cache:
+        cache = ScanCache(
+            cache_path or os.path.join(report_dir, CACHE_FILENAME),
+            options=_cache_options(policies, engine),
+        )
 
-    all_scan_results = []
-    for pd in plugin_dirs:
-        res = scan_plugin_directory(pd)
-        all_scan_results.append(res)
+    summary = {'plugins': 0, 'vulnerabilities': 0, 'timed_out': 0}
+    stats = {}
+    try:
+        for pd, file_results in scan_plugins(_all_plugins(), jobs=jobs, cache=cache, stats=stats,
+                                          policies=policies, engine=ast_engine,
+                                          profile=profile, promote=promote, budget=budget):
+            res = _consume_plugin(pd, file_results, sinks)
+            for sink in sinks:
+                sink.on_plugin(res)
+            summary['plugins'] += 1
+            summary['vulnerabilities'] += len(res['vulnerabilities'])
+            summary['timed_out'] += len(res['timed_out_files'])
+    finally:
+        for sink in sinks:
+            sink.close()
+        if cache is not None:
+            cache.close()
+            print(f"[cache] {cache.summary()}")
 
-        report_text = generate_local_report(res)
-        ts = datetime.now().strftime('%Y%m%d_%H%M%S')
-        fname = os.path.join(report_dir, f"{res['plugin_name']}_improved_{ts}.txt")
-        with open(fname, 'w', encoding='utf-8') as f:
-            f.write(report_text)
-        print(f"[저장] {fname}")
+    summary.update(stats)
+    print(
+        f"[*] {summary['plugins']} plugins, {stats.get('files', 0)} files, "
+        f"{summary['vulnerabilities']} unique vulns"
+    )
+    print(
+        f"[dedup] {stats.get('dedup_files', 0)} duplicate files "
+        f"({stats.get('dedup_bytes', 0)} bytes) reused from identical content"
+    )
+    print(f"[prefilter] {stats.get('prefiltered', 0)} files skipped (no source/sink token)")
+    if summary['timed_out'] or stats.get('worker_restarts'):
+        print(
+            f"[budget] {summary['timed_out']} files timed out (budget={budget}s), "
+            f"{stats.get('worker_restarts', 0)} worker pool restarts"
+        )
+    if profile == 'deep' or promote:
+        print(
+            f"[interproc] {stats.get('functions', 0)} function summaries "
+            f"({stats.get('summarized', 0)} files summarized, {stats.get('summary_reused', 0)} reused)"
+        )
+        print(
+            f"[includes] {stats.get('include_edges', 0)} include edges, "
+            f"{stats.get('include_analyzed', 0)} includers analyzed, {stats.get('include_reused', 0)} reused"
+        )
+    if engine == 'ast':
+        _print_parse_stats(get_parse_stats())
+    if profile != 'standard' or promote:
+        _print_tiers(stats.get('tiers', {}))
+    if jsonl_path:
+        print(f"[jsonl] {jsonl_path}")
+    _print_timings(get_stage_timings())
 
     print('\n' + '=' * 50)
     print('모든 플러그인 스캔 완료')
     print('=' * 50)
 
-    return all_scan_results
+    return summary
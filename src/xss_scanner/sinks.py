@@ -0,0 +1,71 @@
+"""
+스캐너 파이프라인의 출력(sink) 모듈.
+
+- ReportSink : 플러그인 하나가 끝날 때마다 Markdown 리포트 파일을 저장
+- JsonlSink  : 취약점이 나오는 즉시 한 줄에 하나씩 JSON 으로 기록
+
+sink 는 다음 메서드를 가진다(필요 없는 것은 비워 둔다).
+    on_finding(plugin_name, finding)
+    on_plugin(result)
+    close()
+"""
+
+import json
+import os
+from datetime import datetime
+
+from .reporter import generate_local_report
+
+
+class ReportSink:
+    """플러그인 결과마다 reports/ 아래에 Markdown 리포트를 저장한다."""
+
+    def __init__(self, report_dir: str):
+        self.report_dir = report_dir
+        os.makedirs(report_dir, exist_ok=True)
+
+    def on_finding(self, plugin_name: str, finding):
+        pass
+
+    def on_plugin(self, result: dict):
+        report_text = generate_local_report(result)
+        ts = datetime.now().strftime('%Y%m%d_%H%M%S')
+        fname = os.path.join(self.report_dir, f"{result['plugin_name']}_improved_{ts}.txt")
+        with open(fname, 'w', encoding='utf-8') as f:
+            f.write(report_text)
+        print(f"[저장] {fname}")
+
+    def close(self):
+        pass
+
+
+class JsonlSink:
+    """
+    취약점을 발견 순서대로 JSONL 파일에 기록한다.
+    각 줄: {"plugin": ..., <Finding.to_dict() 필드>}
+    시간 예산을 넘긴 파일은 플러그인이 끝날 때
+    {"plugin": ..., "status": "timed_out", <FileTimeout.to_dict() 필드>} 로 기록한다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        self._f = open(path, 'w', encoding='utf-8')
+        self.count = 0
+
+    def on_finding(self, plugin_name: str, finding):
+        record = {'plugin': plugin_name}
+        record.update(finding.to_dict() if hasattr(finding, 'to_dict') else finding)
+        self._f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.count += 1
+
+    def on_plugin(self, result: dict):
+        for t in result.get('timed_out_files', []):
+            record = {'plugin': result['plugin_name'], 'status': 'timed_out'}
+            record.update(t)
+            self._f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._f.flush()
+
+    def close(self):
+        self._f.close()
@@ -0,0 +1,184 @@
+"""
+파일 단위 시간 예산과 워커 감시(watchdog) 모듈.
+
+병적인 입력(아주 긴 라인, 깊게 중첩된 따옴표 등) 하나가 분석을 몇 분씩
+붙잡아도 배치 전체가 멈추지 않도록 두 단계로 막는다.
+
+- time_budget : 워커 안에서 SIGALRM 으로 거는 소프트 예산. 파이썬 코드가
+                돌고 있으면 예외로 바로 중단된다.
+- WatchdogExecutor : 부모 프로세스의 감시 스레드가 실행 중인 작업 시간을
+                재고, 소프트 예산이 듣지 않는 경우(C 레벨 정규식 등)
+                하드 한도를 넘긴 작업의 워커 풀을 죽인 뒤 새 풀에서 나머지
+                작업을 다시 제출한다. 죽인 작업의 Future 는 WorkerTimeout 으로
+                끝난다.
+
+ScanTimeout 은 BaseException 을 상속한다. 분석 코드 곳곳의
+`except Exception` 에 삼켜지지 않고 작업 함수까지 올라와야 하기 때문이다.
+"""
+
+import concurrent.futures
+import signal
+import threading
+import time
+from contextlib import contextmanager
+
+# 파일 하나의 기본 시간 예산(초). 0 이면 예산 없이 실행한다.
+DEFAULT_FILE_BUDGET = 60.0
+# 하드 한도 = 예산 * WATCHDOG_FACTOR + WATCHDOG_GRACE.
+# 풀의 호출 큐에 먼저 들어가 "실행 중" 으로 보이는 작업이 앞 작업을 기다리는
+# 시간까지 감안한 값이다.
+WATCHDOG_FACTOR = 2.0
+WATCHDOG_GRACE = 5.0
+# 감시 스레드의 확인 주기(초)
+WATCHDOG_POLL = 0.5
+
+
+class ScanTimeout(BaseException):
+    """time_budget 의 기본 예외(파일 하나의 시간 예산 초과)."""
+
+
+class WorkerTimeout(Exception):
+    """감시 스레드가 하드 한도를 넘긴 작업의 워커를 죽였다."""
+
+    def __init__(self, args, elapsed: float):
+        super().__init__(f"worker killed after {elapsed:.1f}s")
+        self.task_args = args
+        self.elapsed = elapsed
+
+
+@contextmanager
+def time_budget(seconds: float, exc=ScanTimeout):
+    """
+    with 블록이 seconds 초를 넘기면 exc 를 일으킨다.
+    SIGALRM 이 없거나(Windows) 메인 스레드가 아니면 예산 없이 실행한다.
+
+    중첩할 수 있다. 바깥 예산이 먼저 끝나면 바깥 예산만 두고, 안쪽
+    예산이 끝나면 바깥 타이머를 남은 시간으로 되돌린다.
+    """
+    if not seconds or not hasattr(signal, 'setitimer') or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    outer = signal.getitimer(signal.ITIMER_REAL)[0]
+    if outer and outer <= seconds:
+        yield
+        return
+
+    def _expired(signum, frame):
+        raise exc()
+
+    started = time.monotonic()
+    previous = signal.signal(signal.SIGALRM, _expired)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+        if outer:
+            # 바깥 예산이 그 사이 지났으면 곧바로 울리게 한다.
+            signal.setitimer(signal.ITIMER_REAL, max(outer - (time.monotonic() - started), 1e-3))
+
+
+def hard_limit(budget: float) -> float:
+    """소프트 예산 -> 감시 스레드가 워커를 죽이는 하드 한도(0 이면 감시 안 함)."""
+    return budget * WATCHDOG_FACTOR + WATCHDOG_GRACE if budget else 0
+
+
+class WatchdogExecutor:
+    """
+    ProcessPoolExecutor 를 감싸, 하드 한도를 넘긴 작업이 있으면 풀을 죽이고
+    새로 띄우는 executor.
+
+    submit() 은 풀을 다시 띄워도 유지되는 바깥 Future 를 돌려준다. 풀을
+    다시 띄울 때 끝나지 않은 나머지 작업은 새 풀에 그대로 다시 제출한다.
+    """
+
+    def __init__(self, max_workers: int, limit: float, poll: float = WATCHDOG_POLL):
+        self.max_workers = max_workers
+        self.limit = limit
+        self.poll = poll
+        self.restarts = 0
+        self._lock = threading.RLock()
+        self._tasks = {}  # 안쪽 Future -> [fn, args, 바깥 Future, 실행 시작 시각]
+        self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+        self._stop = threading.Event()
+        self._thread = None
+        if limit:
+            self._thread = threading.Thread(target=self._watch, name='scan-watchdog', daemon=True)
+            self._thread.start()
+
+    def submit(self, fn, *args):
+        outer = concurrent.futures.Future()
+        with self._lock:
+            self._submit(fn, args, outer)
+        return outer
+
+    def _submit(self, fn, args, outer):
+        inner = self._pool.submit(fn, *args)
+        self._tasks[inner] = [fn, args, outer, None]
+        inner.add_done_callback(self._done)
+
+    def _done(self, inner):
+        with self._lock:
+            task = self._tasks.pop(inner, None)
+        if task is None:
+            # 풀을 다시 띄우면서 버린 작업
+            return
+        outer = task[2]
+        if inner.cancelled():
+            outer.cancel()
+            return
+        exc = inner.exception()
+        if exc is not None:
+            outer.set_exception(exc)
+        else:
+            outer.set_result(inner.result())
+
+    def _watch(self):
+        while not self._stop.wait(self.poll):
+            now = time.monotonic()
+            with self._lock:
+                culprit = None
+                for inner, task in self._tasks.items():
+                    if task[3] is None:
+                        if inner.running():
+                            task[3] = now
+                    elif now - task[3] > self.limit:
+                        culprit = inner
+                        break
+                if culprit is None:
+                    continue
+                old = self._respawn(culprit, now)
+            _kill_pool(old)
+
+    def _respawn(self, culprit, now: float):
+        """culprit 을 WorkerTimeout 으로 끝내고 새 풀에 나머지를 다시 제출한다. -> 옛 풀."""
+        tasks, self._tasks = self._tasks, {}
+        old, self._pool = self._pool, concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers)
+        self.restarts += 1
+        fn, args, outer, started = tasks.pop(culprit)
+        for f, a, o, _ in tasks.values():
+            self._submit(f, a, o)
+        outer.set_exception(WorkerTimeout(args, now - started))
+        return old
+
+    def shutdown(self, wait=True):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._pool.shutdown(wait=wait)
+
+
+def _kill_pool(pool):
+    """실행 중인 워커까지 강제로 끝낸다(Python 3.14+ 는 terminate_workers 사용)."""
+    terminate = getattr(pool, 'terminate_workers', None)
+    if terminate is not None:
+        terminate()
+        return
+    for proc in list((getattr(pool, '_processes', None) or {}).values()):
+        try:
+            proc.kill()
+        except Exception:
+            pass
+    pool.shutdown(wait=False, cancel_futures=True)
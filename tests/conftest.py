@@ -0,0 +1,65 @@
+import os
+import sys
+
+import pytest
+
+# src/ 를 import 경로에 추가 (scripts/ 와 같은 방식)
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from tests.httpfixture import FixtureServer  # noqa: E402
+
+# 테스트에서는 속도 제한기가 기다리지 않도록 충분히 빠르게 둔다.
+TEST_RATE = 200.0
+
+
+@pytest.fixture
+def server():
+    srv = FixtureServer().start()
+    try:
+        yield srv
+    finally:
+        srv.stop()
+
+
+@pytest.fixture
+def thread_engine(monkeypatch, tmp_path, server):
+    """
+    스레드 엔진(downloader)을 fixture 서버로 돌리는 함수.
+    run(keywords, **kwargs) -> 받은 디렉토리(tmp_path).
+    """
+    from xss_scanner import downloader
+
+    monkeypatch.setattr(downloader, 'save_dir', str(tmp_path))
+    monkeypatch.setattr(downloader, 'API_URL', server.url + '/api')
+    monkeypatch.setattr(downloader, 'SEARCH_URL', server.url + '/search/{target}/page/{page}')
+
+    def run(keywords, **kwargs):
+        kwargs.setdefault('rate', TEST_RATE)
+        kwargs.setdefault('max_rate', TEST_RATE)
+        downloader.download_plugins_for_keywords(keywords, **kwargs)
+        return tmp_path
+
+    return run
+
+
+@pytest.fixture
+def async_engine(tmp_path, server):
+    """
+    asyncio 엔진(asyncdownloader)을 fixture 서버로 돌리는 함수.
+    run(keywords, **kwargs) -> 다운로드 통계.
+    """
+    pytest.importorskip('aiohttp')
+    from xss_scanner import asyncdownloader
+
+    def run(keywords, **kwargs):
+        kwargs.setdefault('dest_dir', str(tmp_path))
+        kwargs.setdefault('api_url', server.url + '/api')
+        kwargs.setdefault('search_url', server.url + '/search/{target}/page/{page}')
+        kwargs.setdefault('rate', TEST_RATE)
+        kwargs.setdefault('max_rate', TEST_RATE)
+        return asyncdownloader.download_plugins_async(keywords, **kwargs)
+
+    return run
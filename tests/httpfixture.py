@@ -0,0 +1,180 @@
+"""
+다운로더 테스트용 로컬 HTTP 서버(표준 라이브러리 http.server).
+
+FixtureServer 는 127.0.0.1 의 빈 포트에서 스레드로 돌고, 경로의 첫
+요소(예: /search/..., /plugin/..., /zip/..., /api)마다 등록한 route
+함수로 응답한다. 받은 요청(경로, 쿼리, 헤더)과 동시에 처리 중인 요청 수의
+최댓값을 남겨 테스트에서 확인할 수 있게 한다.
+"""
+
+import io
+import random
+import socket
+import threading
+import time
+import urllib.parse
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_zip(slug: str, size: int = 64 * 1024, seed: str = '') -> bytes:
+    """slug/slug.php 하나를 압축 없이(ZIP_STORED) 담은 zip. size 만큼 무작위 바이트를 덧붙인다."""
+    rnd = random.Random(slug + seed)
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_STORED) as zf:
+        info = zipfile.ZipInfo(f'{slug}/{slug}.php', (2020, 1, 1, 0, 0, 0))
+        zf.writestr(info, b'<?php echo $_GET["x"]; /*' + rnd.randbytes(size) + b'*/')
+    return buf.getvalue()
+
+
+class Request:
+    """route 함수가 받는 요청 하나."""
+
+    def __init__(self, handler):
+        self.handler = handler
+        path, _, query = handler.path.partition('?')
+        self.path = path
+        self.parts = [p for p in path.split('/') if p]
+        self.query = dict(urllib.parse.parse_qsl(query))
+        self.headers = handler.headers
+
+    def send(self, status: int, body: bytes = b'', content_type: str = 'text/html', headers=None,
+             drop_after: int = None, stall: float = 0):
+        """
+        응답을 보낸다. Content-Length 는 body 길이(headers 로 바꿀 수 있다).
+        drop_after 가 주어지면 본문을 그 바이트까지만 쓰고(stall 초 동안 멈춘 뒤)
+        연결을 끊는다.
+        """
+        h = self.handler
+        h.send_response(status)
+        h.send_header('Content-Type', content_type)
+        out = {'Content-Length': str(len(body))}
+        out.update(headers or {})
+        for k, v in out.items():
+            h.send_header(k, v)
+        h.end_headers()
+        if drop_after is None:
+            h.wfile.write(body)
+            return
+        h.wfile.write(body[:drop_after])
+        h.wfile.flush()
+        if stall:
+            time.sleep(stall)
+        h.close_connection = True
+        h.connection.shutdown(socket.SHUT_RDWR)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server.fixture
+        request = Request(self)
+        server.begin(request)
+        try:
+            if server.delay:
+                time.sleep(server.delay)
+            route = server.routes.get(request.parts[0] if request.parts else '')
+            if route is None:
+                request.send(404)
+            else:
+                route(request)
+        finally:
+            server.end()
+
+
+class FixtureServer:
+    """
+    routes: 경로 첫 요소 -> route(Request) 함수.
+    requests: 받은 요청 목록(Request), delay: 응답마다 기다릴 초.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self.delay = 0
+        self.inflight = 0
+        self.max_inflight = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.fixture = self
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self._httpd.server_address[1]}'
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def begin(self, request):
+        with self._lock:
+            self.requests.append(request)
+            self.inflight += 1
+            self.max_inflight = max(self.max_inflight, self.inflight)
+
+    def end(self):
+        with self._lock:
+            self.inflight -= 1
+
+    def hits(self, name: str) -> list:
+        """경로 첫 요소가 name 인 요청 목록."""
+        return [r for r in self.requests if r.parts and r.parts[0] == name]
+
+    # 자주 쓰는 route 들
+
+    def serve_zips(self, zips: dict, etag: bool = True):
+        """/zip/<파일 이름> -> zips[파일 이름]. Range/If-Range 를 따른다."""
+
+        def route(request):
+            body = zips.get(request.parts[-1])
+            if body is None:
+                return request.send(404)
+            tag = f'"{request.parts[-1]}"'
+            headers = {'ETag': tag} if etag else {}
+            rng = request.headers.get('Range')
+            if rng and request.headers.get('If-Range') == tag:
+                start = int(rng.split('=', 1)[1].rstrip('-'))
+                headers['Content-Range'] = f'bytes {start}-{len(body) - 1}/{len(body)}'
+                return request.send(206, body[start:], 'application/zip', headers)
+            return request.send(200, body, 'application/zip', headers)
+
+        self.routes['zip'] = route
+        return route
+
+    def serve_html_search(self, keyword: str, slugs, per_page: int = 10):
+        """
+        /search/<키워드>/page/<n> -> /plugin/<slug>/ -> /zip/<slug>.1.0.zip.
+        검색 결과는 페이지마다 per_page 개이고, 다 보여 준 뒤의 페이지는 비어 있다.
+        """
+        slugs = list(slugs)
+        zips = {f'{slug}.1.0.zip': make_zip(slug) for slug in slugs}
+
+        def search(request):
+            kw, page = request.parts[1], int(request.parts[3])
+            chunk = slugs[(page - 1) * per_page:page * per_page] if kw == keyword else []
+            body = ''.join(
+                f'<h3 class="entry-title"><a href="{self.url}/plugin/{slug}/">{slug}</a></h3>' for slug in chunk
+            )
+            request.send(200, f'<html><body>{body}</body></html>'.encode())
+
+        def plugin(request):
+            slug = request.parts[1]
+            request.send(200, (
+                f'<a class="plugin-download button download-button button-large" '
+                f'href="{self.url}/zip/{slug}.1.0.zip">Download</a>'
+            ).encode())
+
+        self.routes['search'] = search
+        self.routes['plugin'] = plugin
+        self.serve_zips(zips)
+        return zips
@@ -0,0 +1,22 @@
+"""파일 단위 정적 분석(analyzer.scan_file_for_xss)을 확인한다."""
+
+import pytest
+
+from xss_scanner.analyzer import scan_file_for_xss
+
+
+@pytest.mark.parametrize('header', [
+    'while ($a)',
+    'foreach ($a as $b)',
+    'for (;;)',
+    'if ($a) { while ($a) }',
+    'while ($a):',
+])
+def test_unterminated_control_header_keeps_findings(tmp_path, header):
+    # 본문 없이 파일이 끝난 제어 구조 헤더 때문에 앞의 결과를 잃지 않는다.
+    path = tmp_path / 'cut.php'
+    path.write_text(f'<?php\n$a = $_GET["a"];\necho $a;\n{header}')
+
+    found = [(v.line_num, v.risk_level, v.tainted_var) for v in scan_file_for_xss(str(path))]
+
+    assert found == [(3, 'HIGH', '$a')]
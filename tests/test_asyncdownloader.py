@@ -0,0 +1,77 @@
+"""asyncio 다운로드 엔진(asyncdownloader)을 로컬 fixture 서버로 확인한다."""
+
+import asyncio
+import os
+
+import pytest
+
+from tests.conftest import TEST_RATE
+from tests.httpfixture import make_zip
+
+
+def test_search_detail_download_extract(server, async_engine, tmp_path):
+    slugs = [f'alpha{i}' for i in range(12)]
+    server.serve_html_search('kw', slugs)
+
+    stats = async_engine(['kw'], discovery='html')
+
+    assert stats['downloaded'] == 12
+    assert stats['failed'] == 0
+    # 검색 페이지는 빈 페이지(3)가 나올 때까지 넘긴다.
+    assert [r.parts[3] for r in server.hits('search')] == ['1', '2', '3']
+    assert sorted(r.parts[1] for r in server.hits('plugin')) == sorted(slugs)
+    for slug in slugs:
+        assert os.path.isfile(tmp_path / f'{slug}.1.0' / slug / f'{slug}.php')
+        assert not os.path.exists(tmp_path / f'{slug}.1.0.zip')
+        assert not os.path.exists(tmp_path / f'{slug}.1.0.zip.part')
+
+
+def test_per_host_limit(server, async_engine):
+    slugs = [f'beta{i}' for i in range(8)]
+    server.serve_html_search('kw', slugs)
+    server.delay = 0.1
+
+    stats = async_engine(['kw'], discovery='html', concurrency=16, per_host=2)
+
+    assert stats['downloaded'] == 8
+    assert server.max_inflight == 2
+
+
+def test_skips_existing_folders(server, async_engine, tmp_path):
+    slugs = ['gamma', 'delta']
+    server.serve_html_search('kw', slugs)
+    os.makedirs(tmp_path / 'gamma.1.0')
+
+    stats = async_engine(['kw'], discovery='html')
+
+    assert stats['downloaded'] == 1
+    assert stats['skipped'] == 1
+    assert [r.parts[1] for r in server.hits('zip')] == ['delta.1.0.zip']
+    assert os.listdir(tmp_path / 'gamma.1.0') == []
+
+
+def test_failed_extract_releases_folder(server, tmp_path, monkeypatch):
+    # 압축해제에 실패한 폴더는 같은 실행의 다음 다운로드가 다시 받을 수 있어야 한다.
+    aiohttp = pytest.importorskip('aiohttp')
+    from xss_scanner import asyncdownloader
+
+    server.serve_zips({'eps.1.0.zip': make_zip('eps')})
+    calls = []
+    real_finish = asyncdownloader.finish_zip
+
+    def flaky_finish(final_path, extract_dir):
+        calls.append(extract_dir)
+        return False if len(calls) == 1 else real_finish(final_path, extract_dir)
+
+    monkeypatch.setattr(asyncdownloader, 'finish_zip', flaky_finish)
+    dl = asyncdownloader.AsyncDownloader(str(tmp_path), rate=TEST_RATE, max_rate=TEST_RATE)
+    link = f'{server.url}/zip/eps.1.0.zip'
+
+    async def run():
+        async with aiohttp.ClientSession() as session:
+            return [await dl.download_zip(session, link), await dl.download_zip(session, link)]
+
+    assert asyncio.run(run()) == [0, 1]
+    assert dl.stats['skipped'] == 0
+    assert len(server.hits('zip')) == 2
+    assert os.path.isfile(tmp_path / 'eps.1.0' / 'eps' / 'eps.php')
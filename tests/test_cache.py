@@ -0,0 +1,40 @@
+"""영구 스캔 결과 캐시(cache.ScanCache)를 확인한다."""
+
+from xss_scanner.cache import ScanCache
+from xss_scanner.findings import Finding
+
+
+def _finding(line: int) -> Finding:
+    return Finding('a.php', line, risk_level='HIGH', context='html')
+
+
+def test_options_do_not_evict_each_other(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    regex = ScanCache(path)
+    regex.put('d1', '.php', [_finding(1)])
+    regex.close()
+
+    ast = ScanCache(path, options={'engine': 'ast'})
+    assert ast.get('d1', '.php', 'a.php') is None
+    ast.put('d1', '.php', [_finding(2)])
+    ast.close()
+
+    regex = ScanCache(path)
+    assert [v.line_num for v in regex.get('d1', '.php', 'b.php')] == [1]
+    regex.close()
+    ast = ScanCache(path, options={'engine': 'ast'})
+    assert [v.line_num for v in ast.get('d1', '.php', 'b.php')] == [2]
+    ast.close()
+
+
+def test_stale_rules_version_is_pruned(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    old = ScanCache(path, rules_version='old')
+    old.put('d1', '.php', [_finding(1)])
+    old.put_summary('d1', {'functions': {}})
+    old.close()
+
+    new = ScanCache(path, rules_version='new')
+    assert new.conn.execute('SELECT COUNT(*) FROM findings').fetchone()[0] == 0
+    assert new.conn.execute('SELECT COUNT(*) FROM summaries').fetchone()[0] == 0
+    new.close()
@@ -0,0 +1,95 @@
+"""plugins info API 검색(discovery='api')을 두 다운로드 엔진에서 확인한다."""
+
+import json
+import os
+
+import pytest
+
+from tests.httpfixture import make_zip
+
+ENGINES = ('thread_engine', 'async_engine')
+
+
+@pytest.fixture(params=ENGINES)
+def engine(request):
+    return request.getfixturevalue(request.param)
+
+
+def serve_api(server, pages: int, per_page: int = 2, extra: dict = None):
+    """
+    /api -> 페이지마다 per_page 개 플러그인(info.pages = pages).
+    extra 는 {페이지: [추가 플러그인 dict]}.
+    """
+    zips = {}
+
+    def api(request):
+        page = int(request.query['request[page]'])
+        plugins = []
+        for i in range(per_page):
+            slug = f'p{page}x{i}'
+            zips[f'{slug}.1.0.zip'] = make_zip(slug, 1024)
+            plugins.append({'slug': slug, 'version': '1.0', 'download_link': f'{server.url}/zip/{slug}.1.0.zip'})
+        plugins += (extra or {}).get(page, [])
+        body = {'info': {'page': page, 'pages': pages, 'results': pages * per_page}, 'plugins': plugins}
+        request.send(200, json.dumps(body).encode(), 'application/json')
+
+    server.routes['api'] = api
+    server.serve_zips(zips)
+    return zips
+
+
+def installed(dest) -> list:
+    return sorted(name for name in os.listdir(dest) if not name.startswith('.'))
+
+
+def test_api_pagination(server, engine, tmp_path):
+    serve_api(server, pages=3)
+
+    engine(['kw'])
+
+    assert [r.query['request[page]'] for r in server.hits('api')] == ['1', '2', '3']
+    assert installed(tmp_path) == [f'p{page}x{i}.1.0' for page in (1, 2, 3) for i in (0, 1)]
+    # 상세 페이지/검색 페이지는 열지 않는다.
+    assert not server.hits('plugin') and not server.hits('search')
+
+
+def test_api_max_plugins(server, engine, tmp_path):
+    serve_api(server, pages=3, per_page=5)
+
+    engine(['kw'], max_plugins=3)
+
+    hits = server.hits('api')
+    assert [r.query['request[page]'] for r in hits] == ['1']
+    assert hits[0].query['request[per_page]'] == '3'
+    assert len(server.hits('zip')) == 3
+    assert installed(tmp_path) == ['p1x0.1.0', 'p1x1.1.0', 'p1x2.1.0']
+
+
+def test_api_empty_download_link(server, engine, tmp_path):
+    serve_api(server, pages=1, extra={1: [{'slug': 'closed', 'version': '1.0', 'download_link': ''}]})
+
+    engine(['kw'])
+
+    assert installed(tmp_path) == ['p1x0.1.0', 'p1x1.1.0']
+    assert len(server.hits('zip')) == 2
+
+
+@pytest.mark.parametrize('failure', ['http-error', 'api-error', 'non-json'])
+def test_html_fallback_when_api_page1_fails(server, engine, tmp_path, failure):
+    server.serve_html_search('kw', ['html1', 'html2'])
+
+    def api(request):
+        if failure == 'http-error':
+            request.send(404, b'not found')
+        elif failure == 'api-error':
+            request.send(200, b'{"error": "Invalid request"}', 'application/json')
+        else:
+            request.send(200, b'<html>maintenance</html>', 'application/json')
+
+    server.routes['api'] = api
+
+    engine(['kw'])
+
+    assert len(server.hits('api')) == 1
+    assert [r.parts[3] for r in server.hits('search')] == ['1', '2']
+    assert installed(tmp_path) == ['html1.1.0', 'html2.1.0']
@@ -0,0 +1,203 @@
+"""끊긴 zip 다운로드 이어받기(resume.PartFile)를 두 다운로드 엔진에서 확인한다."""
+
+import json
+import os
+
+import pytest
+
+from tests.httpfixture import make_zip
+
+ENGINES = ('thread_engine', 'async_engine')
+# 스레드 엔진이 iter_content 로 읽는 청크 크기. 끊기면 마지막 청크까지는 잃을 수 있다.
+THREAD_CHUNK = 256 * 1024
+SLUG = 'big'
+FILE_NAME = f'{SLUG}.1.0.zip'
+BODY = make_zip(SLUG, 2 * 1024 * 1024)
+# 청크 경계에 맞지 않는 위치에서 끊는다.
+CUT = 1024 * 1024 + 12345
+
+
+@pytest.fixture(params=ENGINES)
+def engine(request):
+    return request.getfixturevalue(request.param)
+
+
+def serve(server, zip_route):
+    """/api -> 플러그인 하나(/zip/big.1.0.zip), /zip -> zip_route(요청, 몇 번째 요청인지)."""
+
+    def api(request):
+        plugin = {'slug': SLUG, 'version': '1.0', 'download_link': f'{server.url}/zip/{FILE_NAME}'}
+        request.send(200, json.dumps({'info': {'pages': 1}, 'plugins': [plugin]}).encode(), 'application/json')
+
+    def route(request):
+        zip_route(request, len(server.hits('zip')))
+
+    server.routes['api'] = api
+    server.routes['zip'] = route
+
+
+def seed_part(server, dest, data: bytes, etag: str = f'"{FILE_NAME}"'):
+    """지난 실행에서 끊긴 것처럼 .part 와 메타데이터를 남겨 둔다."""
+    path = os.path.join(dest, FILE_NAME + '.part')
+    with open(path, 'wb') as f:
+        f.write(data)
+    meta = {'url': f'{server.url}/zip/{FILE_NAME}', 'etag': etag, 'last_modified': None, 'length': len(BODY)}
+    with open(path + '.json', 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+
+def range_start(request):
+    rng = request.headers.get('Range')
+    return int(rng.split('=', 1)[1].rstrip('-')) if rng else None
+
+
+def assert_installed(dest):
+    with open(os.path.join(dest, f'{SLUG}.1.0', SLUG, f'{SLUG}.php'), 'rb') as f:
+        assert f.read().startswith(b'<?php echo $_GET["x"];')
+    assert sorted(os.listdir(dest)) == ['.manifest.json', f'{SLUG}.1.0']
+
+
+def assert_discarded(dest):
+    assert sorted(os.listdir(dest)) == ['.manifest.json']
+
+
+def test_resume_after_connection_drop(server, engine, request, tmp_path):
+    def route(req, n):
+        if n == 1:
+            return req.send(200, BODY, 'application/zip', {'ETag': f'"{FILE_NAME}"'}, drop_after=CUT)
+        start = range_start(req)
+        assert req.headers.get('If-Range') == f'"{FILE_NAME}"'
+        req.send(206, BODY[start:], 'application/zip', {
+            'ETag': f'"{FILE_NAME}"', 'Content-Range': f'bytes {start}-{len(BODY) - 1}/{len(BODY)}',
+        })
+
+    serve(server, route)
+
+    engine(['kw'])
+
+    hits = server.hits('zip')
+    assert len(hits) == 2
+    assert range_start(hits[0]) is None
+    start = range_start(hits[1])
+    if request.node.callspec.params['engine'] == 'async_engine':
+        # 받은 바이트를 모두 .part 에 쓰고 정확히 그 위치부터 이어받는다.
+        assert start == CUT
+    else:
+        assert CUT - THREAD_CHUNK < start <= CUT
+    assert_installed(tmp_path)
+
+
+@pytest.mark.parametrize('stall', [0, 2])
+def test_resume_after_206_interrupted(server, engine, request, tmp_path, monkeypatch, stall):
+    # 이미 이어받던 .part 의 206 응답이 본문 중간에서 끊기거나(stall=0) 멈춘다(stall 초).
+    if stall:
+        from xss_scanner import asyncdownloader, downloader
+        monkeypatch.setattr(asyncdownloader, 'READ_TIMEOUT', 1)
+        monkeypatch.setattr(downloader, 'ZIP_TIMEOUT', 1)
+    seed_part(server, tmp_path, BODY[:5000])
+
+    def route(req, n):
+        start = range_start(req)
+        headers = {'ETag': f'"{FILE_NAME}"', 'Content-Range': f'bytes {start}-{len(BODY) - 1}/{len(BODY)}'}
+        if n == 1:
+            return req.send(206, BODY[start:], 'application/zip', headers, drop_after=1024 * 1024, stall=stall)
+        req.send(206, BODY[start:], 'application/zip', headers)
+
+    serve(server, route)
+
+    engine(['kw'])
+
+    hits = server.hits('zip')
+    assert len(hits) == 2
+    assert range_start(hits[0]) == 5000
+    cut = 5000 + 1024 * 1024
+    if request.node.callspec.params['engine'] == 'async_engine':
+        assert range_start(hits[1]) == cut
+    else:
+        assert cut - THREAD_CHUNK < range_start(hits[1]) <= cut
+    assert_installed(tmp_path)
+
+
+def test_416_restarts_from_scratch(server, engine, tmp_path):
+    seed_part(server, tmp_path, BODY[:5000])
+
+    def route(req, n):
+        if req.headers.get('Range'):
+            return req.send(416, headers={'Content-Range': f'bytes */{len(BODY)}'})
+        req.send(200, BODY, 'application/zip', {'ETag': f'"{FILE_NAME}"'})
+
+    serve(server, route)
+
+    engine(['kw'])
+
+    hits = server.hits('zip')
+    assert [range_start(r) for r in hits] == [5000, None]
+    assert_installed(tmp_path)
+
+
+def test_200_to_range_request_rewrites_part(server, engine, tmp_path):
+    # .part 앞부분이 서버 파일과 다르다: 200 으로 전체를 받으면 덮어써야 한다.
+    seed_part(server, tmp_path, b'x' * 5000)
+
+    def route(req, n):
+        req.send(200, BODY, 'application/zip', {'ETag': f'"{FILE_NAME}"'})
+
+    serve(server, route)
+
+    engine(['kw'])
+
+    hits = server.hits('zip')
+    assert [range_start(r) for r in hits] == [5000]
+    assert_installed(tmp_path)
+
+
+def test_weak_etag_is_not_used_for_if_range(server, engine, tmp_path):
+    def route(req, n):
+        # 약한 ETag 만 있고 Last-Modified 는 없다: 이어받을 검증자가 없다.
+        drop = CUT if n == 1 else None
+        req.send(200, BODY, 'application/zip', {'ETag': 'W/"weak"'}, drop_after=drop)
+
+    serve(server, route)
+
+    engine(['kw'])
+
+    hits = server.hits('zip')
+    assert len(hits) == 2
+    assert [r.headers.get('Range') for r in hits] == [None, None]
+    assert [r.headers.get('If-Range') for r in hits] == [None, None]
+    assert_installed(tmp_path)
+
+
+def test_crc_mismatch_discards_part(server, engine, tmp_path, capsys):
+    corrupt = bytearray(BODY)
+    corrupt[len(BODY) // 2] ^= 0xFF
+
+    def route(req, n):
+        req.send(200, bytes(corrupt), 'application/zip', {'ETag': f'"{FILE_NAME}"'})
+
+    serve(server, route)
+
+    engine(['kw'])
+
+    assert len(server.hits('zip')) == 1
+    assert 'CRC mismatch' in capsys.readouterr().out
+    assert_discarded(tmp_path)
+
+
+def test_size_mismatch_discards_part(server, engine, tmp_path, capsys):
+    def route(req, n):
+        if n == 1:
+            return req.send(200, BODY, 'application/zip', {'ETag': f'"{FILE_NAME}"'}, drop_after=CUT)
+        # Content-Range 는 이어받을 위치를 말하지만 본문은 그보다 100 바이트 앞에서 시작한다.
+        start = range_start(req)
+        req.send(206, BODY[start - 100:], 'application/zip', {
+            'ETag': f'"{FILE_NAME}"', 'Content-Range': f'bytes {start}-{len(BODY) - 1}/{len(BODY)}',
+        })
+
+    serve(server, route)
+
+    engine(['kw'])
+
+    assert len(server.hits('zip')) == 2
+    assert f'size mismatch: got {len(BODY) + 100}, expected {len(BODY)}' in capsys.readouterr().out
+    assert_discarded(tmp_path)
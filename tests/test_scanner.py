@@ -0,0 +1,28 @@
+"""스캔 파이프라인(scanner.ScanPipeline)을 확인한다."""
+
+from xss_scanner.scanner import ScanPipeline
+
+# 같은 내용의 DOM XSS: app.js 는 JS 분석기(full), app.min.js 는 얕은 스캔(shallow)이 본다.
+JS = 'var pad = 1;\n' + 'document.body.innerHTML = location.hash;\n'
+
+
+def test_same_content_with_different_policy_is_not_shared(tmp_path):
+    plugin = tmp_path / 'p'
+    plugin.mkdir()
+    (plugin / 'app.js').write_text(JS)
+    (plugin / 'app.min.js').write_text(JS)
+
+    pipeline = ScanPipeline()
+    try:
+        results = dict(pipeline.collect(pipeline.plan(str(plugin))))
+    finally:
+        pipeline.close()
+
+    full = results[str(plugin / 'app.js')]
+    shallow = results[str(plugin / 'app.min.js')]
+    assert pipeline.stats['dedup_files'] == 0
+    assert [v.line_num for v in full] == [2]
+    assert [v.line_num for v in shallow] == [2]
+    # 얕은 스캔만 라인 안 column 을 남긴다.
+    assert full[0].column is None
+    assert shallow[0].column == len('document.body.')